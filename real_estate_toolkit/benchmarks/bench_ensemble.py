@@ -0,0 +1,86 @@
+"""
+Core scaling benchmark: times Ensemble.run on one synthetic market shaped like files/train.csv
+with 1, 2, 4, ... workers, up to the number of cores.
+
+    python benchmarks/bench_ensemble.py [--replicas N] [--market N] [--population N]
+                                        [--max-workers N] [--output results.json]
+
+Speedup is the one-worker time over the time with n workers and efficiency the speedup over n,
+so near-linear scaling shows as efficiencies close to 1. The replicas are checked to give the
+same results for every number of workers.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import replace
+from typing import List, Optional
+import numpy as np
+from real_estate_toolkit.agent_based_model.ensemble import Ensemble, Scenario
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE
+
+SCENARIO = Scenario(
+    consumers_number=0, years=5,
+    annual_income=AnnualIncomeStatistics(minimum=30000.0, average=60000.0, standard_deviation=20000.0,
+                                         maximum=150000.0),
+    children_range=ChildrenRange(minimum=0, maximum=5),
+    cleaning_market_mechanism=CleaningMarketMechanism.RANDOM,
+)
+
+def worker_counts(max_workers: int) -> List[int]:
+    counts = [2 ** exponent for exponent in range(max_workers.bit_length()) if 2 ** exponent <= max_workers]
+    return counts if counts[-1] == max_workers else counts + [max_workers]
+
+def run_benchmarks(replicas: int, market_size: int, population_size: int, max_workers: int,
+                   repeat: int) -> List[dict]:
+    market = AMES_SHAPE.generate(market_size, seed=0)
+    scenario = replace(SCENARIO, consumers_number=population_size)
+    results, expected = [], None
+    for workers in worker_counts(max_workers):
+        ensemble = Ensemble(market, scenario, seed=0)
+        seconds = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = ensemble.run(replicas, workers=workers)
+            seconds = min(seconds, time.perf_counter() - start)
+        rates = np.column_stack([result.owners_population_rate, result.houses_availability_rate])
+        if expected is None:
+            expected = rates
+        elif not np.array_equal(rates, expected):
+            raise RuntimeError(f"{workers} workers gave other results than 1 worker")
+        speedup = results[0]["seconds"] / seconds if results else 1.0
+        results.append({"workers": workers, "seconds": seconds, "speedup": speedup, "efficiency": speedup / workers})
+        print(f"workers {workers:>3} {seconds:8.2f}s speedup {speedup:5.2f}", file=sys.stderr)
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--replicas", type=int, default=64)
+    parser.add_argument("--market", type=int, default=10_000)
+    parser.add_argument("--population", type=int, default=100_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report here instead of standard output.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                        "cpu_count": os.cpu_count()},
+        "replicas": args.replicas, "market_size": args.market, "population_size": args.population,
+        "results": run_benchmarks(args.replicas, args.market, args.population, args.max_workers, args.repeat),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Instrumentation overhead benchmark: times whole simulation runs with instrumentation disabled
+(the default NULL_INSTRUMENTATION) and enabled, on synthetic markets shaped like files/train.csv.
+
+    python benchmarks/bench_instrumentation.py [--market N] [--max-population N] [--output results.json]
+
+The disabled overhead is measured directly: a run counts the calls it makes to the disabled
+hooks, and that count times the cost of one disabled call is reported as a fraction of the
+disabled run time (`disabled_overhead`).
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, List, Optional
+import numpy as np
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.instrumentation import (
+    NULL_INSTRUMENTATION, Instrumentation, NullInstrumentation
+)
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE
+
+POPULATION_SIZES = [10 ** exponent for exponent in range(3, 8)]
+ANNUAL_INCOME = AnnualIncomeStatistics(minimum=30000.0, average=60000.0, standard_deviation=20000.0, maximum=150000.0)
+CHILDREN_RANGE = ChildrenRange(minimum=0, maximum=5)
+HOOK_CALLS = 1_000_000
+
+class CallCounter(NullInstrumentation):
+    """Disabled instrumentation that only counts the calls made to it."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def phase(self, name: str):
+        self.calls += 1
+        return super().phase(name)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.calls += 1
+
+def run(market: HousingMarket, population_size: int, instrumentation: Instrumentation) -> float:
+    """Seconds of one run: consumers, savings and clearing on a fresh copy of the market."""
+    simulation = Simulation(
+        housing_market_data=[], consumers_number=population_size, years=5, annual_income=ANNUAL_INCOME,
+        children_range=CHILDREN_RANGE, cleaning_market_mechanism=CleaningMarketMechanism.RANDOM, seed=0,
+        instrumentation=instrumentation,
+    )
+    simulation.housing_market = market.with_availability()
+    start = time.perf_counter()
+    simulation.create_consumers()
+    simulation.compute_consumers_savings()
+    simulation.clean_the_market()
+    return time.perf_counter() - start
+
+def per_call(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    for _ in range(HOOK_CALLS):
+        function()
+    return (time.perf_counter() - start) / HOOK_CALLS
+
+def hook_calls(market: HousingMarket, population_size: int) -> int:
+    """Calls a disabled run makes to its instrumentation, the simulation's and the market's."""
+    counter = CallCounter()
+    previous = HousingMarket.instrumentation
+    HousingMarket.instrumentation = counter
+    try:
+        run(market, population_size, counter)
+    finally:
+        HousingMarket.instrumentation = previous
+    return counter.calls
+
+def run_benchmarks(market_size: int, max_population: int, repeat: int) -> List[dict]:
+    market = AMES_SHAPE.generate(market_size, seed=0)
+    market.with_availability().index  # Warm up
+    hook_seconds = max(per_call(lambda: NULL_INSTRUMENTATION.count('clearing.queries')),
+                       per_call(lambda: NULL_INSTRUMENTATION.phase('clearing')))
+    results = []
+    for population_size in [size for size in POPULATION_SIZES if size <= max_population]:
+        disabled = min(run(market, population_size, NULL_INSTRUMENTATION) for _ in range(repeat))
+        enabled = min(run(market, population_size, Instrumentation()) for _ in range(repeat))
+        calls = hook_calls(market, population_size)
+        results.append({
+            "market_size": market_size, "population_size": population_size,
+            "disabled_seconds": disabled, "enabled_seconds": enabled,
+            "enabled_overhead": enabled / disabled - 1,
+            "disabled_hook_calls": calls, "disabled_overhead": calls * hook_seconds / disabled,
+        })
+        print(f"population {population_size:>11,} done", file=sys.stderr)
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--market", type=int, default=100_000)
+    parser.add_argument("--max-population", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON report here instead of standard output.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "environment": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()},
+        "results": run_benchmarks(args.market, args.max_population, args.repeat),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Scaling benchmark: times HousingMarket queries, Consumer.buy_a_house, Simulation.clean_the_market
+and the whole simulation on synthetic markets shaped like files/train.csv.
+
+    python benchmarks/bench_simulation.py [--max-market N] [--max-population N] [--full]
+                                          [--output results.json] [--baseline old.json --threshold 1.5]
+
+Markets go from 10^3 to 10^6 houses and populations from 10^3 to 10^7 consumers, up to the
+given maxima. With a baseline, a case slower than `threshold` times its baseline time, or a
+benchmark whose log-log scaling slope grew by more than `slope_tolerance`, is a regression
+and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from real_estate_toolkit.agent_based_model.consumers import Segment
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.population import PopulationGenerator
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE
+
+MARKET_SIZES = [10 ** exponent for exponent in range(3, 7)]
+POPULATION_SIZES = [10 ** exponent for exponent in range(3, 8)]
+ANNUAL_INCOME = AnnualIncomeStatistics(minimum=30000.0, average=60000.0, standard_deviation=20000.0, maximum=150000.0)
+CHILDREN_RANGE = ChildrenRange(minimum=0, maximum=5)
+QUERY_CALLS = 1000
+BUYERS = 1000
+
+def best_of(repeat: int, run: Callable[[], float]) -> float:
+    """Smallest of `repeat` timings; `run` returns the seconds of the part it measures."""
+    return min(run() for _ in range(repeat))
+
+def timed(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def simulation(market: HousingMarket, population_size: int) -> Simulation:
+    simulation = Simulation(
+        housing_market_data=[], consumers_number=population_size, years=5, annual_income=ANNUAL_INCOME,
+        children_range=CHILDREN_RANGE, cleaning_market_mechanism=CleaningMarketMechanism.RANDOM, seed=0,
+    )
+    simulation.housing_market = market.with_availability()
+    return simulation
+
+def query_cases(market: HousingMarket, repeat: int) -> Dict[str, float]:
+    """Seconds per call of each market query (the index is built beforehand and timed apart)."""
+    rng = np.random.default_rng(1)
+    ids = rng.integers(0, len(market), QUERY_CALLS).tolist()
+    median_price = float(np.median(market.prices))
+    queries: Dict[str, Callable[[], object]] = {
+        "query.average_price": lambda: [market.calculate_average_price(3) for _ in range(QUERY_CALLS)],
+        "query.house_by_id": lambda: [market.get_house_by_id(house_id) for house_id in ids],
+        "query.meet_requirements": lambda: [market.get_houses_that_meet_requirements(median_price, 3)
+                                            for _ in range(10)],
+        **{f"query.find_house.{segment.name}": (lambda segment=segment: [market.find_house(segment, 3)
+                                                                       for _ in range(QUERY_CALLS)])
+           for segment in Segment},
+    }
+    results = {"query.index_build": best_of(repeat, lambda: timed(lambda: market.with_availability().index))}
+    market.index  # Built once for the queries
+    for name, query in queries.items():
+        calls = 10 if name == "query.meet_requirements" else QUERY_CALLS
+        results[name] = best_of(repeat, lambda: timed(query)) / calls
+    return results
+
+def buy_a_house_case(market: HousingMarket, repeat: int) -> float:
+    """Seconds per Consumer.buy_a_house call, for a queue of consumers on a fresh market."""
+    population = PopulationGenerator(0).generate(BUYERS, ANNUAL_INCOME, CHILDREN_RANGE)
+    population.savings[:] = population.annual_income * 1.5
+
+    def run() -> float:
+        fresh = market.with_availability()
+        fresh.index
+        consumers = population.to_consumers()
+        return timed(lambda: [consumer.buy_a_house(fresh) for consumer in consumers])
+
+    return best_of(repeat, run) / BUYERS
+
+def clearing_cases(market: HousingMarket, population_size: int, repeat: int) -> Dict[str, float]:
+    """Seconds of clean_the_market alone and of a whole run (consumers, savings, clearing, rates)."""
+
+    def clean() -> float:
+        run = simulation(market, population_size)
+        run.create_consumers()
+        run.compute_consumers_savings()
+        return timed(run.clean_the_market)
+
+    def whole() -> float:
+        run = simulation(market, population_size)
+        return timed(lambda: (run.create_consumers(), run.compute_consumers_savings(), run.clean_the_market(),
+                              run.compute_owners_population_rate(), run.compute_houses_availability_rate()))
+
+    return {"clean_the_market": best_of(repeat, clean), "simulation": best_of(repeat, whole)}
+
+def run_benchmarks(max_market: int, max_population: int, repeat: int) -> List[dict]:
+    results = []
+    for market_size in [size for size in MARKET_SIZES if size <= max_market]:
+        market = AMES_SHAPE.generate(market_size, seed=0)
+        for name, seconds in query_cases(market, repeat).items():
+            results.append({"benchmark": name, "market_size": market_size, "population_size": 0, "seconds": seconds})
+        results.append({"benchmark": "buy_a_house", "market_size": market_size, "population_size": BUYERS,
+                        "seconds": buy_a_house_case(market, repeat)})
+        for population_size in [size for size in POPULATION_SIZES if size <= max_population]:
+            for name, seconds in clearing_cases(market, population_size, repeat).items():
+                results.append({"benchmark": name, "market_size": market_size,
+                                "population_size": population_size, "seconds": seconds})
+            print(f"market {market_size:>9,} population {population_size:>11,} done", file=sys.stderr)
+    return results
+
+def scaling_slopes(results: List[dict]) -> Dict[str, float]:
+    """
+    Log-log slope of time against size for every benchmark: against the market size for the
+    queries and buy_a_house, against the population size (largest market) for the clearing runs.
+    1 means linear scaling, 0 constant time.
+    """
+    series: Dict[str, List[Tuple[float, float]]] = {}
+    largest_market = max((result["market_size"] for result in results), default=0)
+    for result in results:
+        if result["benchmark"] in ("clean_the_market", "simulation"):
+            if result["market_size"] != largest_market:
+                continue
+            size = result["population_size"]
+        else:
+            size = result["market_size"]
+        series.setdefault(result["benchmark"], []).append((size, result["seconds"]))
+    slopes = {}
+    for name, points in series.items():
+        if len(points) > 1:
+            sizes, seconds = np.log(np.array(points)).T
+            slopes[name] = float(np.polyfit(sizes, seconds, 1)[0])
+    return slopes
+
+def regressions(report: dict, baseline: dict, threshold: float, slope_tolerance: float) -> List[str]:
+    def key(result: dict) -> Tuple[str, int, int]:
+        return result["benchmark"], result["market_size"], result["population_size"]
+
+    found = []
+    previous = {key(result): result["seconds"] for result in baseline["results"]}
+    for result in report["results"]:
+        before = previous.get(key(result))
+        if before and result["seconds"] > threshold * before:
+            found.append(f"{key(result)}: {result['seconds']:.3g}s vs {before:.3g}s")
+    for name, slope in report["slopes"].items():
+        before = baseline.get("slopes", {}).get(name)
+        if before is not None and slope > before + slope_tolerance:
+            found.append(f"{name}: scaling slope {slope:.2f} vs {before:.2f}")
+    return found
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-market", type=int, default=100_000)
+    parser.add_argument("--max-population", type=int, default=1_000_000)
+    parser.add_argument("--full", action="store_true", help="Every size: markets up to 10^6, populations up to 10^7.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON report here instead of standard output.")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.5)
+    parser.add_argument("--slope-tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    max_market = MARKET_SIZES[-1] if args.full else args.max_market
+    max_population = POPULATION_SIZES[-1] if args.full else args.max_population
+
+    results = run_benchmarks(max_market, max_population, args.repeat)
+    report = {
+        "environment": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine()},
+        "results": results,
+        "slopes": scaling_slopes(results),
+    }
+    found = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            found = regressions(report, json.load(file), args.threshold, args.slope_tolerance)
+        report["regressions"] = found
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+    for regression in found:
+        print(f"regression: {regression}", file=sys.stderr)
+    return 1 if found else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
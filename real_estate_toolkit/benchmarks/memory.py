@@ -0,0 +1,99 @@
+"""
+Memory benchmark: bytes per agent for houses and consumers stored as the former dict-backed
+dataclasses, as slotted dataclasses, and as rows of the market/population arrays behind views.
+
+    python benchmarks/memory.py [--agents N]
+"""
+import argparse
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+import numpy as np
+from real_estate_toolkit.agent_based_model.consumers import Consumer, Segment
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.houses import House, QualityScore
+from real_estate_toolkit.agent_based_model.population import PopulationGenerator
+from real_estate_toolkit.agent_based_model.simulation import AnnualIncomeStatistics, ChildrenRange
+
+@dataclass
+class DictHouse:
+    """House as it was before slots: one __dict__ per instance."""
+    id: int
+    price: float
+    area: float
+    bedrooms: int
+    year_built: int
+    quality_score: Optional[QualityScore] = None
+    available: bool = True
+
+@dataclass
+class DictConsumer:
+    """Consumer as it was before slots, holding a reference to its house."""
+    ID: int
+    annual_income: float
+    children_number: int
+    segment: Segment
+    house: Optional[Any] = None
+    savings: float = 0.0
+    saving_rate: float = 0.3
+    interest_rate: float = 0.05
+
+def measure(build: Callable[[], Any], agents: int) -> float:
+    """Bytes allocated per agent by `build` (the result is kept alive while measuring)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return (after - before) / agents
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--agents", type=int, default=200_000)
+    args = parser.parse_args()
+    count = args.agents
+    rng = np.random.default_rng(0)
+    prices = rng.uniform(5e4, 5e5, count).tolist()
+    areas = rng.uniform(500, 4000, count).tolist()
+    bedrooms = rng.integers(0, 6, count).tolist()
+    years = rng.integers(1900, 2024, count).tolist()
+    quality = [QualityScore(value) for value in rng.integers(1, 6, count).tolist()]
+    incomes = rng.uniform(3e4, 1.5e5, count).tolist()
+
+    def houses(cls):
+        return [cls(id=index, price=prices[index], area=areas[index], bedrooms=bedrooms[index],
+                    year_built=years[index], quality_score=quality[index]) for index in range(count)]
+
+    def consumers(cls):
+        return [cls(ID=index, annual_income=incomes[index], children_number=index % 5, segment=Segment.AVERAGE,
+                    savings=incomes[index] * 1.5) for index in range(count)]
+
+    def market():
+        return HousingMarket.from_arrays(ids=np.arange(count), prices=prices, areas=areas, bedrooms=bedrooms,
+                                         year_built=years, quality=[score.value for score in quality])
+
+    def population():
+        generator = PopulationGenerator(0)
+        return generator.generate(count, AnnualIncomeStatistics(3e4, 6e4, 2e4, 1.5e5), ChildrenRange(0, 5))
+
+    report = {
+        "agents": count,
+        "house_bytes": {
+            "dict_dataclass": measure(lambda: houses(DictHouse), count),
+            "slotted_dataclass": measure(lambda: houses(House), count),
+            "market_arrays": measure(market, count),
+        },
+        "consumer_bytes": {
+            "dict_dataclass": measure(lambda: consumers(DictConsumer), count),
+            "slotted_dataclass": measure(lambda: consumers(Consumer), count),
+            "population_arrays": measure(population, count),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
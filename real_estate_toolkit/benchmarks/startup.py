@@ -0,0 +1,66 @@
+"""
+Startup-time benchmark: times `real-estate-toolkit simulate` and `import real_estate_toolkit.main`
+in fresh interpreters and fails if the simulate run imported scikit-learn or plotly.
+
+    python benchmarks/startup.py [path/to/train.csv] [--repeat N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = ("sklearn", "plotly", "scipy", "pandas", "polars")
+FORBIDDEN_FOR_SIMULATE = ("sklearn", "plotly")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules],
+                  "error": globals().get("error")}}))
+"""
+
+def run_probe(body: str) -> dict:
+    code = PROBE.format(body=body, heavy=HEAVY_MODULES)
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", nargs="?", default=str(Path(__file__).resolve().parents[1] / "files" / "train.csv"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    probes = {
+        # Only the imports matter here, so a failing run is reported rather than aborting the probe
+        "simulate": "import contextlib, io\n"
+                    "from real_estate_toolkit.cli import main\n"
+                    "error = None\n"
+                    "try:\n"
+                    "    with contextlib.redirect_stdout(io.StringIO()):\n"
+                    f"        main(['simulate', {args.path!r}])\n"
+                    "except Exception as exception:\n"
+                    "    error = repr(exception)",
+        "import_cli": "import real_estate_toolkit.cli",
+        "import_main": "import real_estate_toolkit.main",
+    }
+    report = {}
+    for name, body in probes.items():
+        runs = [run_probe(body) for _ in range(args.repeat)]
+        report[name] = {
+            "median_seconds": statistics.median(run["seconds"] for run in runs),
+            "loaded": runs[-1]["loaded"],
+            "error": runs[-1]["error"],
+        }
+    print(json.dumps(report, indent=2))
+    leaked = [module for module in FORBIDDEN_FOR_SIMULATE if module in report["simulate"]["loaded"]]
+    if leaked:
+        print(f"simulate imported {leaked}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
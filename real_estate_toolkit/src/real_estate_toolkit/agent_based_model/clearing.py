@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+import numpy as np
+from .consumers import Consumer, Segment
+from .house_market import HousingMarket
+from .population import SEGMENTS, Population
+
+@dataclass
+class ClearingEngine:
+    """
+    Batch market clearing. Consumers are served in queue order with the same greedy rule as
+    Consumer.buy_a_house (the cheapest available house of their segment with enough bedrooms,
+    if they can afford its down payment), but every choice is a query on the market indexes:
+    O(log H) per consumer after an O(H log H) build, instead of a scan of the whole market.
+    Consumers who cannot afford the cheapest available house, or who need more bedrooms than
+    any available house has, are skipped without a query.
+    """
+    market: HousingMarket
+    down_payment_percentage: float = 0.2
+
+    def assign(self, segments: Sequence[Segment], min_bedrooms: np.ndarray, savings: np.ndarray) -> np.ndarray:
+        """
+        Clear the market for a queue of consumers given as arrays. `savings` is updated in place
+        with the down payments; returns the market row bought by each consumer, or -1.
+        """
+        market = self.market
+        prices = market.prices
+        price_index = market.index.by_price
+        down_payment = self.down_payment_percentage
+        bought = np.full(len(segments), -1, dtype=np.int64)
+        floor_row = price_index.cheapest()  # Cheapest available house, the lowest possible down payment
+        queries = 0
+        for position, (segment, bedrooms, budget) in enumerate(zip(segments, min_bedrooms.tolist(),
+                                                                   savings.tolist())):
+            if floor_row is None:
+                break  # Sold out
+            if budget < prices[floor_row] * down_payment or bedrooms > price_index.tree.tree[1]:
+                continue
+            row = market.find_house(segment, bedrooms)
+            queries += 1
+            if row is None or budget < prices[row] * down_payment:
+                continue
+            savings[position] = budget - prices[row] * down_payment
+            market.sell(row)
+            bought[position] = row
+            if row == floor_row:
+                floor_row = price_index.cheapest()
+        instrumentation = market.instrumentation
+        if instrumentation.enabled:
+            instrumentation.count('clearing.queries', queries)
+            instrumentation.count('clearing.skipped', len(segments) - queries)
+            for segment, row in zip(segments, bought.tolist()):
+                instrumentation.count(f"purchase.{'success' if row >= 0 else 'failure'}.{segment.name}")
+        return bought
+
+    def clear_population(self, population: Population, order: Optional[np.ndarray] = None) -> None:
+        """
+        Let the consumers of a population buy houses in `order` (row order by default),
+        updating its savings and house ids in place.
+        """
+        order = np.arange(len(population)) if order is None else np.asarray(order)
+        population.writable('savings', 'house_id')
+        savings = population.savings[order]
+        bought = self.assign(
+            [SEGMENTS[code] for code in population.segment[order].tolist()],
+            population.children_number[order].astype(np.int64) + 1,
+            savings,
+        )
+        population.savings[order] = savings
+        buyers = bought >= 0
+        population.house_id[order[buyers]] = self.market.ids[bought[buyers]]
+        population.market = self.market
+
+    def clear(self, consumers: List[Consumer]) -> None:
+        """
+        Let each consumer, in list order, buy a house; updates their house and savings.
+        """
+        savings = np.array([consumer.savings for consumer in consumers], dtype=np.float64)
+        bought = self.assign(
+            [consumer.segment for consumer in consumers],
+            np.array([consumer.children_number + 1 for consumer in consumers], dtype=np.int64),
+            savings,
+        )
+        for consumer, row, remaining in zip(consumers, bought.tolist(), savings.tolist()):
+            if row >= 0:
+                consumer.house = self.market.house(row)
+                consumer.savings = remaining
@@ -1,6 +1,7 @@
 from enum import Enum, auto
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Union
+import numpy as np
 from .houses import House
 from .house_market import HousingMarket
 
@@ -9,7 +10,33 @@ class Segment(Enum):
     OPTIMIZER = auto()  # Looks for best price per square foot value
     AVERAGE = auto()  # Looks for prices below the average market price
 
-@dataclass
+def accumulated_savings(savings, annual_income, saving_rate, interest_rate,
+                        years: Union[int, np.ndarray], income_growth=0.0) -> np.ndarray:
+    """
+    Savings after `years` of Consumer.compute_savings for whole arrays of consumers at once.
+    Each year the yearly savings are added and the total earns interest, which is an annuity due:
+        savings * g**n + yearly * g * (g**n - 1) / r,   with g = 1 + r
+    (yearly * n when r is 0). With `income_growth` h - 1, the yearly savings grow by h after
+    each year, which makes it a growing annuity: yearly * g**n * (q**n - 1) / (q - 1), q = h / g.
+    Every argument may be a scalar or a per-consumer array.
+    """
+    savings, yearly, rate, years, growth = np.broadcast_arrays(
+        np.asarray(savings, dtype=np.float64),
+        np.asarray(annual_income, dtype=np.float64) * np.asarray(saving_rate, dtype=np.float64),
+        np.asarray(interest_rate, dtype=np.float64),
+        np.asarray(years, dtype=np.float64),
+        np.asarray(income_growth, dtype=np.float64),
+    )
+    growth_minus_one = np.expm1(years * np.log1p(rate))  # g**n - 1, accurate for small rates
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(rate == 0, years, (1 + rate) * growth_minus_one / rate)
+        if np.any(growth != 0):
+            ratio = (growth - rate) / (1 + rate)  # q - 1
+            geometric = np.where(ratio == 0, years, np.expm1(years * np.log1p(ratio)) / ratio)
+            annuity = np.where(growth == 0, annuity, (1 + growth_minus_one) * geometric)
+    return savings * (1 + growth_minus_one) + yearly * annuity
+
+@dataclass(slots=True)
 class Consumer:
     ID: int
     annual_income: float
@@ -19,6 +46,7 @@ class Consumer:
     savings: float = 0.0
     saving_rate: float = 0.3
     interest_rate: float = 0.05
+    neighborhood: Optional[int] = None  # Preferred neighborhood, as a shard of a ShardedMarket; None for any
 
     def compute_savings(self, years: int) -> None:
         """
@@ -29,29 +57,21 @@ class Consumer:
             self.savings += yearly_savings
             self.savings *= (1 + self.interest_rate)  # Compound interest
 
-    def buy_a_house(self, housing_market: HousingMarket) -> None:
+    def buy_a_house(self, housing_market: HousingMarket, down_payment_percentage: float = 0.2) -> None:
         """
         Attempt to purchase a suitable house based on consumer preferences and financial capability.
+        The cheapest available house that fits the segment, the family size and the down payment is bought.
         """
-        available_houses = housing_market.houses
-        potential_houses = []
-
-        if self.segment == Segment.FANCY:
-            potential_houses = [house for house in available_houses if house.is_new_construction() and house.quality_score == QualityScore.EXCELLENT]
-        elif self.segment == Segment.OPTIMIZER:
-            average_price_per_sqft = housing_market.calculate_average_price_per_sqft()
-            potential_houses = [house for house in available_houses if house.calculate_price_per_square_foot() < average_price_per_sqft]
-        elif self.segment == Segment.AVERAGE:
-            average_price = housing_market.calculate_average_price()
-            potential_houses = [house for house in available_houses if house.price < average_price]
-
-        # Sort potential houses by price to prefer cheaper options
-        potential_houses.sort(key=lambda house: house.price)
+        index = housing_market.find_house(self.segment, self.children_number + 1)  # Fitting family size
 
-        # Check if there are houses within budget and fitting family size
-        for house in potential_houses:
-            if house.bedrooms >= self.children_number + 1 and self.savings >= house.price * 0.2:  # Assuming a 20% down payment
-                self.house = house
-                self.savings -= house.price * 0.2
-                house.sell_house()
-                break
+        # Candidates are taken cheapest first, so only the cheapest one needs checking against the budget
+        bought = index is not None and self.savings >= housing_market.prices[index] * down_payment_percentage
+        if bought:
+            self.house = housing_market.house(index)
+            self.savings -= self.house.price * down_payment_percentage
+            self.house.sell_house()
+        instrumentation = housing_market.instrumentation
+        if instrumentation.enabled:
+            instrumentation.count('buy_a_house.calls')
+            instrumentation.count('buy_a_house.candidates', index is not None)
+            instrumentation.count(f"purchase.{'success' if bought else 'failure'}.{self.segment.name}")
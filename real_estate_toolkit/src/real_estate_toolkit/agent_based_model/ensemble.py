@@ -0,0 +1,155 @@
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from ..data.parallel import SharedArray
+from .house_market import HousingMarket
+from .population import Population
+from .simulation import MARKET_ARRAYS, AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+
+@dataclass(frozen=True)
+class Scenario:
+    """Parameters of a Simulation apart from its market and seed."""
+    consumers_number: int
+    years: int
+    annual_income: AnnualIncomeStatistics
+    children_range: ChildrenRange
+    cleaning_market_mechanism: CleaningMarketMechanism
+    down_payment_percentage: float = 0.2
+    saving_rate: float = 0.3
+    interest_rate: float = 0.05
+
+    def simulation(self, market: HousingMarket, seed: Union[int, np.random.SeedSequence, None] = None) -> Simulation:
+        """A simulation of this scenario on an already built market."""
+        simulation = Simulation(housing_market_data=[], seed=seed,
+                                **{field.name: getattr(self, field.name) for field in fields(self)})
+        simulation.housing_market = market
+        return simulation
+
+    def run(self, market: HousingMarket, seed: Union[int, np.random.SeedSequence, None] = None,
+            population: Optional[Population] = None) -> Tuple[float, float]:
+        """
+        Owners population rate and houses availability rate of one run on `market` (which is
+        changed). A `population` given in place of the generated one must come from the same seed.
+        """
+        simulation = self.simulation(market, seed)
+        if population is None:
+            simulation.create_consumers()
+        else:
+            simulation.population, simulation.consumers = population, population.views()
+        simulation.compute_consumers_savings()
+        simulation.clean_the_market()
+        return simulation.compute_owners_population_rate(), simulation.compute_houses_availability_rate()
+
+@dataclass(frozen=True)
+class SharedMarket:
+    """Picklable handle to the arrays of a HousingMarket copied into shared memory."""
+    arrays: Dict[str, SharedArray]
+
+    @classmethod
+    def create(cls, market: HousingMarket, blocks: List[shared_memory.SharedMemory]) -> "SharedMarket":
+        return cls({name: SharedArray.create(getattr(market, name), blocks) for name in MARKET_ARRAYS})
+
+    def attach(self) -> HousingMarket:
+        """
+        Market over the shared arrays, attached once per process and kept for its lifetime.
+        The arrays are read-only; use with_availability for a market that can be cleared.
+        """
+        key = self.arrays['ids'].name
+        if key not in _ATTACHED:
+            blocks = {name: handle.attach() for name, handle in self.arrays.items()}
+            arrays = {}
+            for name, handle in self.arrays.items():
+                arrays[name] = handle.view(blocks[name])
+                arrays[name].flags.writeable = False
+            _ATTACHED[key] = (HousingMarket.from_arrays(**arrays), blocks)
+        return _ATTACHED[key][0]
+
+# Markets attached by this process, with their blocks: views of a block must outlive it
+_ATTACHED: Dict[str, Tuple[HousingMarket, Dict[str, shared_memory.SharedMemory]]] = {}
+
+def _run_replicas(market: Union[HousingMarket, SharedMarket], scenario: Scenario, entropy: int,
+                  replicas: range) -> np.ndarray:
+    """Worker task: (owners rate, availability rate) rows of some replicas."""
+    base = market.attach() if isinstance(market, SharedMarket) else market
+    results = np.empty((len(replicas), 2), dtype=np.float64)
+    for position, replica in enumerate(replicas):
+        seed = np.random.SeedSequence(entropy, spawn_key=(replica,))
+        results[position] = scenario.run(base.with_availability(), seed)
+    return results
+
+@dataclass
+class EnsembleResult:
+    """Per-replica outcomes of an ensemble, in replica order."""
+    owners_population_rate: np.ndarray
+    houses_availability_rate: np.ndarray
+    entropy: int  # Seed reproducing the ensemble
+
+    METRICS = ('owners_population_rate', 'houses_availability_rate')
+
+    def __len__(self) -> int:
+        return self.owners_population_rate.shape[0]
+
+    def summary(self, confidence: float = 0.95,
+                quantiles: Tuple[float, ...] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> Dict[str, Dict[str, float]]:
+        """
+        Mean, standard deviation, quantiles and a normal confidence interval of the mean of
+        every metric.
+        """
+        z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+        summary = {}
+        for name in self.METRICS:
+            values = getattr(self, name)
+            mean = float(values.mean()) if values.size else 0.0
+            std = float(values.std(ddof=1)) if values.size > 1 else 0.0
+            margin = z * std / float(np.sqrt(values.size)) if values.size else 0.0
+            summary[name] = {
+                'mean': mean,
+                'std': std,
+                'ci_low': mean - margin,
+                'ci_high': mean + margin,
+                **{f"q{round(q * 100)}": float(np.quantile(values, q)) if values.size else 0.0 for q in quantiles},
+            }
+        return summary
+
+class Ensemble:
+    """
+    Monte Carlo replications of a scenario on one market. Replica i draws everything from the
+    substream (seed, i), so results do not depend on the number of workers or the batching.
+    The market arrays are copied once into shared memory and attached read-only by every
+    worker; each replica only gets its own availability and indexes.
+    """
+
+    def __init__(self, market: HousingMarket, scenario: Scenario, seed: Optional[int] = None):
+        self.market = market
+        self.scenario = scenario
+        self.seed_sequence = np.random.SeedSequence(seed)
+
+    def run(self, replicas: int, workers: Optional[int] = None, batch_size: Optional[int] = None) -> EnsembleResult:
+        """
+        Run `replicas` replications on `workers` processes (all cores by default; 1 runs in this
+        process), in tasks of `batch_size` replicas.
+        """
+        workers = workers or os.cpu_count() or 1
+        batch_size = batch_size or max(1, -(-replicas // (4 * workers)))  # A few tasks per worker to balance
+        batches = [range(start, min(start + batch_size, replicas)) for start in range(0, replicas, batch_size)]
+        entropy = self.seed_sequence.entropy
+        if workers == 1:
+            parts = [_run_replicas(self.market, self.scenario, entropy, batch) for batch in batches]
+        else:
+            blocks: List[shared_memory.SharedMemory] = []
+            try:
+                shared = SharedMarket.create(self.market, blocks)
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    tasks = [pool.submit(_run_replicas, shared, self.scenario, entropy, batch) for batch in batches]
+                    parts = [task.result() for task in tasks]
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+        results = np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.float64)
+        return EnsembleResult(owners_population_rate=results[:, 0], houses_availability_rate=results[:, 1],
+                              entropy=entropy)
@@ -0,0 +1,74 @@
+from collections.abc import MutableSequence
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Union, overload
+
+class Handles(MutableSequence):
+    """
+    Sequence of agent views over array-backed storage. A view is created on each access from
+    its owner and row, so the sequence itself costs one row number per agent (nothing at all
+    when `rows` is a range).
+
+    It is mutable like a list of its views: items may be set, deleted, appended or inserted,
+    and the sequence sorted, reversed or shuffled (random.shuffle). Only the order of the rows
+    changes, the agents' data stays in the owner's arrays, so the items stored must be views
+    onto the same owner; any other object raises TypeError (copy it into a list first).
+    The first change copies `rows` into a list of its own.
+    """
+
+    def __init__(self, view: Callable[[Any, int], Any], owner: Any, rows: Sequence[int]):
+        self.view = view
+        self.owner = owner
+        self.rows = rows
+        self._owns_rows = False
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @overload
+    def __getitem__(self, position: int) -> Any: ...
+
+    @overload
+    def __getitem__(self, position: slice) -> "Handles": ...
+
+    def __getitem__(self, position: Union[int, slice]):
+        if isinstance(position, slice):
+            return Handles(self.view, self.owner, self.rows[position])
+        return self.view(self.owner, int(self.rows[position]))
+
+    def __setitem__(self, position: Union[int, slice], value: Any) -> None:
+        rows = self._mutable_rows()
+        if isinstance(position, slice):
+            rows[position] = [self._row(item) for item in value]
+        else:
+            rows[position] = self._row(value)
+
+    def __delitem__(self, position: Union[int, slice]) -> None:
+        del self._mutable_rows()[position]
+
+    def insert(self, position: int, value: Any) -> None:
+        self._mutable_rows().insert(position, self._row(value))
+
+    def sort(self, key: Optional[Callable[[Any], Any]] = None, reverse: bool = False) -> None:
+        """Sort the views in place, as list.sort."""
+        self.rows = [self._row(item) for item in sorted(self, key=key, reverse=reverse)]
+        self._owns_rows = True
+
+    def reverse(self) -> None:
+        self._mutable_rows().reverse()
+
+    def extend(self, values: Iterable[Any]) -> None:
+        self._mutable_rows().extend([self._row(item) for item in values])
+
+    def _mutable_rows(self) -> List[int]:
+        if not self._owns_rows:
+            self.rows = [int(row) for row in self.rows]
+            self._owns_rows = True
+        return self.rows
+
+    def _row(self, item: Any) -> int:
+        if not isinstance(item, self.view) or item._owner is not self.owner:
+            raise TypeError(f"Handles only hold {getattr(self.view, '__name__', self.view)} views onto their owner, "
+                            f"not {type(item).__name__}")
+        return item._index
+
+    def __repr__(self) -> str:
+        return f"Handles({len(self)} x {getattr(self.view, '__name__', self.view)})"
@@ -1,37 +1,319 @@
-from typing import List, Optional
-from statistics import mean
-from .houses import House
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import numpy as np
+from .handles import Handles
+from .houses import House, QualityScore
+from .instrumentation import NULL_INSTRUMENTATION, Instrumentation
+from .market_index import MarketIndex
+
+def _column_property(array: str, cast: Callable[[Any], Any], field: Optional[str] = None) -> property:
+    """
+    Property reading and writing one element of a market array. Fields that feed the
+    market aggregates are written through HousingMarket.update_house.
+    """
+
+    def getter(self):
+        return cast(getattr(self._market, array)[self._index])
+
+    def setter(self, value):
+        if field is None:
+            self._market._writable(array)
+            getattr(self._market, array)[self._index] = value
+        else:
+            self._market.update_house(self._index, **{field: value})
+
+    return property(getter, setter)
+
+@dataclass
+class RunningTotals:
+    """Count and sums of the available houses of one group, kept up to date on every sale."""
+    count: int = 0
+    price: float = 0.0
+    price_per_sqft: float = 0.0
+
+    def add(self, price: float, price_per_sqft: float, sign: int = 1) -> None:
+        self.count += sign
+        self.price += sign * price
+        self.price_per_sqft += sign * price_per_sqft
+
+    def average(self, total: float) -> float:
+        return round(total / self.count, 2) if self.count > 0 else 0.0
+
+class HouseView(House):
+    """
+    A House backed by one row of a HousingMarket's arrays. Views hold no data of their own,
+    so reading a field reads the market and writing one (e.g. sell_house) updates it.
+    """
+    __slots__ = ('_market', '_index')
+
+    def __init__(self, market: "HousingMarket", index: int):
+        self._market = market
+        self._index = index
+
+    @property
+    def _owner(self) -> "HousingMarket":
+        return self._market
+
+    id = _column_property('ids', int)
+    price = _column_property('prices', float, 'price')
+    area = _column_property('areas', float, 'area')
+    bedrooms = _column_property('bedrooms', int, 'bedrooms')
+    year_built = _column_property('year_built', int, 'year_built')
+
+    @property
+    def quality_score(self) -> Optional[QualityScore]:
+        code = int(self._market.quality[self._index])
+        return QualityScore(code) if code else None
+
+    @quality_score.setter
+    def quality_score(self, value: Optional[QualityScore]) -> None:
+        self._market.update_house(self._index, quality=value.value if value is not None else 0)
+
+    @property
+    def available(self) -> bool:
+        return bool(self._market.available[self._index])
+
+    @available.setter
+    def available(self, value: bool) -> None:
+        self._market.set_available(self._index, value)
 
 class HousingMarket:
+    """
+    Market of houses stored as parallel NumPy arrays (struct of arrays), so filters and
+    aggregates are vectorized mask operations. Quality scores are stored as their values,
+    with 0 for a missing score; `houses` gives House views onto the rows.
+    Counts and sums of the available prices and prices per square foot are maintained,
+    overall and per number of bedrooms, so the average queries run in constant time.
+    Id and price lookups go through a MarketIndex built on first use.
+    """
+    HOUSE_ARRAYS = ('ids', 'prices', 'areas', 'bedrooms', 'year_built', 'quality', 'price_per_sqft')
+    instrumentation: Instrumentation = NULL_INSTRUMENTATION  # Set on a market to record its counters
+
     def __init__(self, houses: List[House]):
-        self.houses: List[House] = houses
+        """
+        Copy the houses into the market arrays.
+        """
+        self._set_arrays(
+            ids=[house.id for house in houses],
+            prices=[house.price for house in houses],
+            areas=[house.area for house in houses],
+            bedrooms=[house.bedrooms for house in houses],
+            year_built=[house.year_built for house in houses],
+            quality=[house.quality_score.value if house.quality_score else 0 for house in houses],
+            available=[house.available for house in houses],
+        )
+
+    @classmethod
+    def from_arrays(cls, ids, prices, areas, bedrooms, year_built, quality=None, available=None) -> "HousingMarket":
+        """
+        Build a market straight from columns (quality as QualityScore values, 0 when missing).
+        """
+        market = cls.__new__(cls)
+        size = len(ids)
+        market._set_arrays(
+            ids=ids, prices=prices, areas=areas, bedrooms=bedrooms, year_built=year_built,
+            quality=np.zeros(size, dtype=np.int8) if quality is None else quality,
+            available=np.ones(size, dtype=bool) if available is None else available,
+        )
+        return market
+
+    def with_availability(self, available=None) -> "HousingMarket":
+        """
+        A market sharing this market's house arrays, with its own copy of the availability (this
+        market's by default). The new market gets read-only views of the arrays and copies them
+        on its first update_house that changes them; this market keeps its arrays as they are
+        and copies them on its own next update_house, so neither market sees the other's updates.
+        """
+        market = self.__class__.__new__(self.__class__)
+        market.__dict__.update(self.__dict__)
+        for name in self.HOUSE_ARRAYS:
+            view = getattr(self, name).view()
+            view.flags.writeable = False
+            setattr(market, name, view)
+        self._shared = set(self.HOUSE_ARRAYS)
+        market._shared = set()
+        market.available = np.array(self.available if available is None else available, dtype=bool)
+        market._index = None
+        market._rebuild_totals()
+        return market
+
+    def _writable(self, *names: str) -> None:
+        """Copy the named house arrays that are read-only or shared with another market before writing to them."""
+        for name in names:
+            array = getattr(self, name)
+            if not array.flags.writeable or name in self._shared:
+                setattr(self, name, array.copy())
+                self._shared.discard(name)
+
+    def _set_arrays(self, ids, prices, areas, bedrooms, year_built, quality, available) -> None:
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.areas = np.asarray(areas, dtype=np.float64)
+        self.bedrooms = np.asarray(bedrooms, dtype=np.int64)
+        self.year_built = np.asarray(year_built, dtype=np.int64)
+        self.quality = np.asarray(quality, dtype=np.int8)
+        self.available = np.array(available, dtype=bool)  # Copied: the market owns its availability
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Rounded as House.calculate_price_per_square_foot
+            self.price_per_sqft = np.where(self.areas == 0, 0.0, np.round(self.prices / self.areas, 2))
+        self._shared = set()  # House arrays shared with markets made by with_availability
+        self._index: Optional[MarketIndex] = None
+        self._rebuild_totals()
+
+    def _rebuild_totals(self) -> None:
+        """Recompute the running totals of the available houses from the arrays."""
+        self.instrumentation.count('totals.rebuilds')
+        available = self.available
+        self.totals = RunningTotals(
+            int(np.count_nonzero(available)),
+            float(self.prices[available].sum()),
+            float(self.price_per_sqft[available].sum()),
+        )
+        self.bedroom_totals: Dict[int, RunningTotals] = {}
+        bedrooms, groups = np.unique(self.bedrooms[available], return_inverse=True)
+        counts = np.bincount(groups, minlength=bedrooms.size)
+        prices = np.bincount(groups, weights=self.prices[available], minlength=bedrooms.size)
+        per_sqft = np.bincount(groups, weights=self.price_per_sqft[available], minlength=bedrooms.size)
+        for bedroom, count, price, price_per_sqft in zip(bedrooms.tolist(), counts.tolist(),
+                                                         prices.tolist(), per_sqft.tolist()):
+            self.bedroom_totals[bedroom] = RunningTotals(count, price, price_per_sqft)
+
+    def _count_house(self, index: int, sign: int) -> None:
+        """Add (sign 1) or remove (sign -1) an available house from the running totals."""
+        price, price_per_sqft = float(self.prices[index]), float(self.price_per_sqft[index])
+        self.totals.add(price, price_per_sqft, sign)
+        bedrooms = int(self.bedrooms[index])
+        self.bedroom_totals.setdefault(bedrooms, RunningTotals()).add(price, price_per_sqft, sign)
+
+    def __len__(self) -> int:
+        return self.ids.shape[0]
+
+    @property
+    def houses(self) -> Sequence[House]:
+        """
+        House views onto every row of the market, created on access.
+        """
+        return Handles(HouseView, self, range(len(self)))
+
+    @property
+    def index(self) -> MarketIndex:
+        """
+        Id and price indexes of the market, built on first use.
+        """
+        if self._index is None:
+            with self.instrumentation.phase('index_build'):
+                self._index = MarketIndex(self)
+            self.instrumentation.count('index.builds')
+            self.instrumentation.count('index.rows_sorted', len(self))
+        return self._index
+
+    def house(self, index: int) -> House:
+        """
+        House view of the row at `index`.
+        """
+        return HouseView(self, index)
+
+    def set_available(self, index: int, available: bool) -> None:
+        """
+        Mark the house at row `index` as available or sold, updating the running totals.
+        """
+        if bool(self.available[index]) == bool(available):
+            return
+        self.available[index] = available
+        self._count_house(index, 1 if available else -1)
+        if self._index is not None:
+            self._index.set_available(index, available)
+
+    def update_house(self, index: int, **values: Any) -> None:
+        """
+        Change fields (price, area, bedrooms, year_built, quality) of the house at row `index`,
+        updating the running totals.
+        """
+        available = bool(self.available[index])
+        if available:
+            self._count_house(index, -1)
+        arrays = {'price': 'prices', 'area': 'areas', 'bedrooms': 'bedrooms', 'year_built': 'year_built',
+                  'quality': 'quality'}
+        self._writable('price_per_sqft', *(arrays[name] for name in values))
+        for name, value in values.items():
+            getattr(self, arrays[name])[index] = value
+        area = self.areas[index]
+        self.price_per_sqft[index] = 0.0 if area == 0 else round(float(self.prices[index] / area), 2)
+        if available:
+            self._count_house(index, 1)
+        self._index = None  # The price order or the subsets may have changed, rebuild on next use
+
+    def sell(self, index: int) -> None:
+        """
+        Mark the house at row `index` as sold.
+        """
+        self.set_available(index, False)
+
+    def new_construction(self, current_year: int = 2024) -> np.ndarray:
+        """
+        Mask of houses less than 5 years old, as House.is_new_construction.
+        """
+        return current_year - self.year_built < 5
 
     def get_house_by_id(self, house_id: int) -> Optional[House]:
         """
         Retrieve a specific house by ID.
         """
-        for house in self.houses:
-            if house.id == house_id:
-                return house
-        return None  # Return None if no house matches the ID
+        row = self.index.row_of(house_id)
+        if row is None:
+            return None  # Return None if no house matches the ID
+        return self.house(row)
 
     def calculate_average_price(self, bedrooms: Optional[int] = None) -> float:
         """
         Calculate average house price, optionally filtered by bedrooms.
+        Returns 0 if no available house meets the criteria.
         """
-        if bedrooms is not None:
-            houses_filtered = [house for house in self.houses if house.bedrooms == bedrooms and house.available]
-        else:
-            houses_filtered = [house for house in self.houses if house.available]
+        self.instrumentation.count('average_price.queries')
+        totals = self.totals if bedrooms is None else self.bedroom_totals.get(bedrooms, RunningTotals())
+        return totals.average(totals.price)
 
-        if not houses_filtered:
-            return 0.0  # Return 0 if no houses meet the criteria
+    def calculate_average_price_per_sqft(self, bedrooms: Optional[int] = None) -> float:
+        """
+        Calculate average price per square foot of the available houses, optionally filtered by bedrooms.
+        Returns 0 if no available house meets the criteria.
+        """
+        self.instrumentation.count('average_price.queries')
+        totals = self.totals if bedrooms is None else self.bedroom_totals.get(bedrooms, RunningTotals())
+        return totals.average(totals.price_per_sqft)
 
-        return round(mean(house.price for house in houses_filtered), 2)
+    def segment_mask(self, segment) -> np.ndarray:
+        """
+        Mask of the houses a consumer segment looks at (see consumers.Segment).
+        """
+        if segment.name == 'FANCY':
+            return self.new_construction() & (self.quality == QualityScore.EXCELLENT.value)
+        if segment.name == 'OPTIMIZER':
+            return self.price_per_sqft < self.calculate_average_price_per_sqft()
+        return self.prices < self.calculate_average_price()
+
+    def find_house(self, segment, min_bedrooms: int = 0) -> Optional[int]:
+        """
+        Row of the cheapest available house a consumer segment looks at with at least
+        `min_bedrooms` bedrooms (the first one on ties), or None. Served from the indexes.
+        """
+        if segment.name == 'FANCY':
+            return self.index.cheapest(min_bedrooms, quality=QualityScore.EXCELLENT.value, new_construction=True)
+        if segment.name == 'OPTIMIZER':
+            return self.index.by_price_per_sqft.cheapest_below(self.calculate_average_price_per_sqft(), min_bedrooms)
+        row = self.index.cheapest(min_bedrooms)
+        if row is None or not self.prices[row] < self.calculate_average_price():
+            return None  # The cheapest house is already above average, so every other one is too
+        return row
 
-    def get_houses_that_meet_requirements(self, max_price: int, min_bedrooms: int) -> List[House]:
+    def get_houses_that_meet_requirements(self, max_price: int, min_bedrooms: int = 0, segment=None) -> List[House]:
         """
-        Filter houses based on buyer requirements such as maximum price and minimum number of bedrooms.
+        Filter houses based on buyer requirements such as maximum price and minimum number of bedrooms,
+        and optionally the houses a consumer segment looks at. Houses are returned in market order.
         """
-        filtered_houses = [house for house in self.houses if house.price <= max_price and house.bedrooms >= min_bedrooms and house.available]
+        rows = self.index.by_price.rows_up_to(max_price)
+        rows = rows[self.available[rows] & (self.bedrooms[rows] >= min_bedrooms)]
+        if segment is not None:
+            rows = rows[self.segment_mask(segment)[rows]]
+        filtered_houses = [self.house(index) for index in np.sort(rows).tolist()]
         return filtered_houses if filtered_houses else None
@@ -9,7 +9,7 @@ class QualityScore(Enum):
     FAIR = 2
     POOR = 1
 
-@dataclass
+@dataclass(slots=True)
 class House:
     id: int
     price: float
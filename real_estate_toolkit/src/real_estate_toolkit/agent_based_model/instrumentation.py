@@ -0,0 +1,88 @@
+import csv
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, Union
+
+@dataclass
+class PhaseTimer:
+    """Wall clock and process CPU seconds spent in a phase over all its calls."""
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+
+class Instrumentation:
+    """
+    Opt-in timers and counters of the simulation hot paths. Phases (market_creation,
+    population_generation, savings, clearing, index_build) record wall and CPU time; phases
+    may nest (index_build runs inside clearing). Counters include:
+        buy_a_house.calls, buy_a_house.candidates  houses a Consumer.buy_a_house call looked at
+        clearing.queries                           index queries of the clearing engine
+        clearing.skipped                           consumers skipped without a query
+        index.builds, index.rows_sorted            market index builds and the rows they sorted
+        purchase.success.<SEGMENT>, purchase.failure.<SEGMENT>
+        average_price.queries, totals.rebuilds     O(1) average queries and full recomputations
+    The default NULL_INSTRUMENTATION records nothing.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.phases: Dict[str, PhaseTimer] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time one call of a phase."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timer = self.phases.setdefault(name, PhaseTimer())
+            timer.calls += 1
+            timer.wall_seconds += time.perf_counter() - wall
+            timer.cpu_seconds += time.process_time() - cpu
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        self.phases.clear()
+        self.counters.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'phases': {name: vars(timer).copy() for name, timer in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+
+    def to_json(self, path: Union[str, Path, None] = None) -> str:
+        """The timers and counters as JSON, also written to `path` if given."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            Path(path).write_text(text)
+        return text
+
+    def to_csv(self, path: Union[str, Path]) -> None:
+        """Write one row per phase and per counter."""
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['kind', 'name', 'calls', 'wall_seconds', 'cpu_seconds', 'count'])
+            for name, timer in self.phases.items():
+                writer.writerow(['phase', name, timer.calls, timer.wall_seconds, timer.cpu_seconds, ''])
+            for name, value in self.counters.items():
+                writer.writerow(['counter', name, '', '', '', value])
+
+class NullInstrumentation(Instrumentation):
+    """Instrumentation that records nothing; hot loops check `enabled` before counting."""
+    enabled = False
+    _NULL_CONTEXT = nullcontext()
+
+    def phase(self, name: str) -> ContextManager[None]:
+        return self._NULL_CONTEXT
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+NULL_INSTRUMENTATION = NullInstrumentation()
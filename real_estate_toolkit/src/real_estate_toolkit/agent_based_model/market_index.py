@@ -0,0 +1,214 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+class MaxSegmentTree:
+    """Array segment tree over integer values answering 'leftmost value >= t' in O(log n)."""
+
+    EMPTY = -1
+
+    def __init__(self, values: np.ndarray):
+        self.size = 1 << max(0, int(len(values) - 1).bit_length())
+        tree = np.full(2 * self.size, self.EMPTY, dtype=np.int64)
+        tree[self.size:self.size + len(values)] = values
+        level = self.size
+        while level > 1:
+            level //= 2
+            tree[level:2 * level] = np.maximum(tree[2 * level:4 * level:2], tree[2 * level + 1:4 * level:2])
+        self.tree: List[int] = tree.tolist()  # Python list: cheaper than NumPy scalar access in the loops below
+
+    def update(self, position: int, value: int) -> None:
+        tree = self.tree
+        node = position + self.size
+        tree[node] = value
+        node //= 2
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            best = left if left > right else right
+            if tree[node] == best:
+                break  # Ancestors are unchanged as well
+            tree[node] = best
+            node //= 2
+
+    def first_at_least(self, threshold: int) -> Optional[int]:
+        """Leftmost position holding a value >= threshold, or None."""
+        tree = self.tree
+        if tree[1] < threshold:
+            return None
+        node = 1
+        while node < self.size:
+            node *= 2
+            if tree[node] < threshold:
+                node += 1
+        return node - self.size
+
+class MinSegmentTree:
+    """Array segment tree over integer values answering prefix minimum queries in O(log n)."""
+
+    EMPTY = 1 << 62
+
+    def __init__(self, values: np.ndarray):
+        self.size = 1 << max(0, int(len(values) - 1).bit_length())
+        tree = np.full(2 * self.size, self.EMPTY, dtype=np.int64)
+        tree[self.size:self.size + len(values)] = values
+        level = self.size
+        while level > 1:
+            level //= 2
+            tree[level:2 * level] = np.minimum(tree[2 * level:4 * level:2], tree[2 * level + 1:4 * level:2])
+        self.tree: List[int] = tree.tolist()
+
+    def update(self, position: int, value: int) -> None:
+        tree = self.tree
+        node = position + self.size
+        tree[node] = value
+        node //= 2
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            best = left if left < right else right
+            if tree[node] == best:
+                break
+            tree[node] = best
+            node //= 2
+
+    def prefix_min(self, stop: int) -> int:
+        """Minimum of positions 0 .. stop-1 (EMPTY when there are none)."""
+        tree = self.tree
+        best = self.EMPTY
+        low, high = self.size, self.size + stop
+        while low < high:
+            if low & 1:
+                if tree[low] < best:
+                    best = tree[low]
+                low += 1
+            if high & 1:
+                high -= 1
+                if tree[high] < best:
+                    best = tree[high]
+            low //= 2
+            high //= 2
+        return best
+
+class PriceIndex:
+    """
+    Rows of a subset of the market in (price, row) order, with a max segment tree holding the
+    bedrooms of each available house (-1 when sold), so the cheapest available house with at
+    least N bedrooms is one tree descent.
+    """
+
+    def __init__(self, rows: np.ndarray, prices: np.ndarray, bedrooms: np.ndarray, available: np.ndarray,
+                 market_size: int):
+        order = np.lexsort((rows, prices[rows]))  # Ties go to the lower row, as a stable sort by price
+        self.rows = rows[order]
+        self.prices = prices[self.rows]
+        self.bedrooms = bedrooms[self.rows]
+        self.positions = np.full(market_size, -1, dtype=np.int64)
+        self.positions[self.rows] = np.arange(self.rows.size)
+        self.tree = MaxSegmentTree(np.where(available[self.rows], self.bedrooms, MaxSegmentTree.EMPTY))
+
+    def set_available(self, row: int, available: bool) -> None:
+        position = int(self.positions[row])
+        if position >= 0:
+            self.tree.update(position, int(self.bedrooms[position]) if available else MaxSegmentTree.EMPTY)
+
+    def cheapest(self, min_bedrooms: int = 0) -> Optional[int]:
+        """Row of the cheapest available house with at least `min_bedrooms` bedrooms, or None."""
+        position = self.tree.first_at_least(max(min_bedrooms, 0))
+        return None if position is None else int(self.rows[position])
+
+    def rows_up_to(self, max_price: float) -> np.ndarray:
+        """Rows priced at most `max_price`, cheapest first (sold houses included)."""
+        return self.rows[:np.searchsorted(self.prices, max_price, side='right')]
+
+class PricePerSqftIndex:
+    """
+    Houses of each bedroom count in price per square foot order, with min segment trees of
+    their price ranks (in a PriceIndex) while available. The cheapest available house under a
+    price per square foot threshold with at least N bedrooms is one prefix query per bedroom count.
+    """
+
+    def __init__(self, price_index: PriceIndex, price_per_sqft: np.ndarray, bedrooms: np.ndarray,
+                 available: np.ndarray):
+        self.price_index = price_index
+        rows = np.arange(price_per_sqft.size)
+        self.buckets: List[Tuple[int, np.ndarray, MinSegmentTree]] = []  # (bedrooms, sorted ppsf, tree)
+        self.bucket_of = np.zeros(price_per_sqft.size, dtype=np.int64)
+        self.positions = np.zeros(price_per_sqft.size, dtype=np.int64)
+        for bucket, count in enumerate(np.unique(bedrooms).tolist()):
+            members = rows[bedrooms == count]
+            members = members[np.lexsort((members, price_per_sqft[members]))]
+            self.bucket_of[members] = bucket
+            self.positions[members] = np.arange(members.size)
+            ranks = np.where(available[members], price_index.positions[members], MinSegmentTree.EMPTY)
+            self.buckets.append((count, price_per_sqft[members], MinSegmentTree(ranks)))
+
+    def set_available(self, row: int, available: bool) -> None:
+        _, _, tree = self.buckets[int(self.bucket_of[row])]
+        rank = int(self.price_index.positions[row])
+        tree.update(int(self.positions[row]), rank if available else MinSegmentTree.EMPTY)
+
+    def cheapest_below(self, threshold: float, min_bedrooms: int = 0) -> Optional[int]:
+        """Row of the cheapest available house with a price per square foot below `threshold`, or None."""
+        best = MinSegmentTree.EMPTY
+        for count, price_per_sqft, tree in self.buckets:
+            if count >= min_bedrooms:
+                best = min(best, tree.prefix_min(int(np.searchsorted(price_per_sqft, threshold, side='left'))))
+        return None if best == MinSegmentTree.EMPTY else int(self.price_index.rows[best])
+
+class MarketIndex:
+    """
+    Lookup structures of a HousingMarket: an id -> row hash index, a price index of every house,
+    and price indexes of (quality, new construction) subsets and a price per square foot index,
+    built on first use. The market
+    reports every availability change so the indexes stay current without rebuilding.
+    """
+
+    def __init__(self, market, current_year: int = 2024):
+        self.market = market
+        self.current_year = current_year
+        ids = market.ids.tolist()
+        self.rows_by_id: Dict[int, int] = {}
+        for row, house_id in enumerate(ids):
+            self.rows_by_id.setdefault(house_id, row)  # The first house wins, as a linear scan would
+        self.by_price = self._build(np.arange(len(market)))
+        self.subsets: Dict[Tuple[Optional[int], Optional[bool]], PriceIndex] = {}
+        self._by_price_per_sqft: Optional[PricePerSqftIndex] = None
+
+    def _build(self, rows: np.ndarray) -> PriceIndex:
+        market = self.market
+        return PriceIndex(rows, market.prices, market.bedrooms, market.available, len(market))
+
+    @property
+    def by_price_per_sqft(self) -> PricePerSqftIndex:
+        if self._by_price_per_sqft is None:
+            market = self.market
+            self._by_price_per_sqft = PricePerSqftIndex(self.by_price, market.price_per_sqft,
+                                                         market.bedrooms, market.available)
+        return self._by_price_per_sqft
+
+    def row_of(self, house_id: int) -> Optional[int]:
+        return self.rows_by_id.get(house_id)
+
+    def subset(self, quality: Optional[int] = None, new_construction: Optional[bool] = None) -> PriceIndex:
+        """Price index of the houses with the given quality code and/or new construction status."""
+        if quality is None and new_construction is None:
+            return self.by_price
+        key = (quality, new_construction)
+        if key not in self.subsets:
+            mask = np.ones(len(self.market), dtype=bool)
+            if quality is not None:
+                mask &= self.market.quality == quality
+            if new_construction is not None:
+                mask &= self.market.new_construction(self.current_year) == new_construction
+            self.subsets[key] = self._build(np.flatnonzero(mask))
+        return self.subsets[key]
+
+    def cheapest(self, min_bedrooms: int = 0, quality: Optional[int] = None,
+                 new_construction: Optional[bool] = None) -> Optional[int]:
+        """Row of the cheapest available house with at least `min_bedrooms` bedrooms in a subset, or None."""
+        return self.subset(quality, new_construction).cheapest(min_bedrooms)
+
+    def set_available(self, row: int, available: bool) -> None:
+        self.by_price.set_available(row, available)
+        if self._by_price_per_sqft is not None:
+            self._by_price_per_sqft.set_available(row, available)
+        for index in self.subsets.values():
+            index.set_available(row, available)
@@ -0,0 +1,225 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from scipy import special, stats
+from .consumers import Consumer, Segment
+from .handles import Handles
+from .house_market import HousingMarket
+from .houses import House
+
+SEGMENTS = list(Segment)  # Segment of each code in Population.segment
+
+@dataclass
+class Population:
+    """
+    Consumers stored as parallel arrays; `segment` holds indexes into SEGMENTS, `house_id`
+    the id of the house in `market` each consumer owns (-1 for none) and `neighborhood` the
+    shard of the preferred neighborhood in a ShardedMarket (-1 for none, the default).
+    """
+    annual_income: np.ndarray  # float64
+    children_number: np.ndarray  # int8
+    segment: np.ndarray  # int8
+    savings: np.ndarray  # float64
+    saving_rate: np.ndarray  # float64
+    interest_rate: np.ndarray  # float64
+    house_id: np.ndarray  # int64
+    market: Optional[HousingMarket] = None  # Market the house ids refer to
+    neighborhood: Optional[np.ndarray] = None  # int16
+    _shared: set = field(default_factory=set, init=False, repr=False, compare=False)  # Arrays shared by fork
+
+    ARRAYS = ('annual_income', 'children_number', 'segment', 'savings', 'saving_rate', 'interest_rate', 'house_id',
+              'neighborhood')
+
+    def __post_init__(self):
+        if self.neighborhood is None:
+            self.neighborhood = np.full(len(self), -1, dtype=np.int16)
+
+    def __len__(self) -> int:
+        return self.annual_income.shape[0]
+
+    @classmethod
+    def concat(cls, parts: List["Population"]) -> "Population":
+        return cls(**{name: np.concatenate([getattr(part, name) for part in parts]) for name in cls.ARRAYS})
+
+    def fork(self) -> "Population":
+        """
+        A population sharing this population's arrays through read-only views. Each side copies
+        an array before its first write to it (see writable), so forking costs no copy and leaves
+        this population's arrays as they are.
+        """
+        arrays = {}
+        for name in self.ARRAYS:
+            arrays[name] = getattr(self, name).view()
+            arrays[name].flags.writeable = False
+        self._shared = set(self.ARRAYS)
+        return Population(**arrays, market=self.market)
+
+    def writable(self, *names: str) -> None:
+        """Copy the named arrays that are read-only or shared with a fork before writing to them."""
+        for name in names:
+            array = getattr(self, name)
+            if not array.flags.writeable or name in self._shared:
+                setattr(self, name, array.copy())
+                self._shared.discard(name)
+
+    def views(self, order: Optional[Sequence[int]] = None) -> Sequence[Consumer]:
+        """Consumer views onto the rows (in `order`, if given), created on access."""
+        return Handles(ConsumerView, self, range(len(self)) if order is None else order)
+
+    def to_consumers(self) -> List[Consumer]:
+        """Consumer objects holding a copy of each row."""
+        return [
+            Consumer(ID=index, annual_income=income, children_number=children, segment=SEGMENTS[segment],
+                     house=self.market.get_house_by_id(house_id) if house_id >= 0 else None,
+                     savings=savings, saving_rate=saving_rate, interest_rate=interest_rate,
+                     neighborhood=neighborhood if neighborhood >= 0 else None)
+            for index, (income, children, segment, savings, saving_rate, interest_rate, house_id,
+                        neighborhood) in enumerate(zip(
+                self.annual_income.tolist(), self.children_number.tolist(), self.segment.tolist(),
+                self.savings.tolist(), self.saving_rate.tolist(), self.interest_rate.tolist(),
+                self.house_id.tolist(), self.neighborhood.tolist()))
+        ]
+
+def _array_property(array: str, cast: Callable[[Any], Any]) -> property:
+    """Property reading and writing one element of a population array."""
+
+    def getter(self):
+        return cast(getattr(self._population, array)[self._index])
+
+    def setter(self, value):
+        self._population.writable(array)
+        getattr(self._population, array)[self._index] = value
+
+    return property(getter, setter)
+
+class ConsumerView(Consumer):
+    """
+    A Consumer backed by one row of a Population. The owned house is stored as its id and
+    looked up in the population's market on access.
+    """
+    __slots__ = ('_population', '_index')
+
+    def __init__(self, population: Population, index: int):
+        self._population = population
+        self._index = index
+
+    @property
+    def _owner(self) -> Population:
+        return self._population
+
+    @property
+    def ID(self) -> int:
+        return self._index
+
+    annual_income = _array_property('annual_income', float)
+    children_number = _array_property('children_number', int)
+    savings = _array_property('savings', float)
+    saving_rate = _array_property('saving_rate', float)
+    interest_rate = _array_property('interest_rate', float)
+
+    @property
+    def segment(self) -> Segment:
+        return SEGMENTS[self._population.segment[self._index]]
+
+    @segment.setter
+    def segment(self, value: Segment) -> None:
+        self._population.writable('segment')
+        self._population.segment[self._index] = SEGMENTS.index(value)
+
+    @property
+    def neighborhood(self) -> Optional[int]:
+        shard = int(self._population.neighborhood[self._index])
+        return shard if shard >= 0 else None
+
+    @neighborhood.setter
+    def neighborhood(self, value: Optional[int]) -> None:
+        self._population.writable('neighborhood')
+        self._population.neighborhood[self._index] = -1 if value is None else value
+
+    @property
+    def house(self) -> Optional[House]:
+        house_id = int(self._population.house_id[self._index])
+        return self._population.market.get_house_by_id(house_id) if house_id >= 0 else None
+
+    @house.setter
+    def house(self, value: Optional[House]) -> None:
+        self._population.writable('house_id')
+        self._population.house_id[self._index] = value.id if value is not None else -1
+
+class PopulationGenerator:
+    """
+    Seeded, batched consumer generator. Every chunk of `chunk_size` consumers, and within it
+    every attribute, draws from its own substream of one SeedSequence, so a population is
+    reproduced exactly from its seed whatever order (or process) the chunks are generated in,
+    and other random draws of a run (see `stream`) never shift it.
+    """
+    POPULATION, SHUFFLE, SCHEDULER, PREFERENCES = 0, 1, 2, 3  # Spawn keys of the substream families
+
+    def __init__(self, seed: Union[int, np.random.SeedSequence, None] = None, chunk_size: int = 1_000_000):
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.chunk_size = chunk_size
+
+    @property
+    def entropy(self) -> int:
+        """Root entropy: the seed to pass to reproduce a run started without one."""
+        return self.seed_sequence.entropy
+
+    def stream(self, *key: int) -> np.random.Generator:
+        """Independent generator for a spawn key under this seed."""
+        sequence = self.seed_sequence
+        return np.random.default_rng(np.random.SeedSequence(sequence.entropy, spawn_key=sequence.spawn_key + key))
+
+    @staticmethod
+    def truncated_normal(rng: np.random.Generator, size: int, mean: float, std: float,
+                         low: float, high: float) -> np.ndarray:
+        """
+        Normal draws restricted to [low, high], by inverse-CDF sampling: one uniform draw per
+        value, however little of the distribution the range holds. A range above the mean is
+        mirrored below it, where the normal CDF keeps its precision in the tail.
+        """
+        if low > high:
+            raise ValueError(f"Empty income range [{low}, {high}].")
+        if std == 0 or low == high:
+            return np.full(size, min(max(mean, low), high), dtype=np.float64)
+        alpha, beta = (low - mean) / std, (high - mean) / std
+        mirrored = alpha > 0
+        if mirrored:
+            alpha, beta = -beta, -alpha
+        lower, upper = special.ndtr(alpha), special.ndtr(beta)
+        uniform = rng.random(size)
+        if upper > 0:
+            standard = special.ndtri(lower + uniform * (upper - lower))
+        else:  # Past about 38 standard deviations the CDF underflows
+            standard = stats.truncnorm.ppf(uniform, alpha, beta)
+        standard = np.clip(standard, alpha, beta)
+        return np.clip(mean + std * (-standard if mirrored else standard), low, high)  # Rounding
+
+    def generate_chunk(self, chunk: int, size: int, annual_income, children_range,
+                       saving_rate: float = 0.3, interest_rate: float = 0.05) -> Population:
+        """Consumers of chunk number `chunk` (at most `chunk_size` of them)."""
+        incomes, children, segments = (self.stream(self.POPULATION, chunk, attribute) for attribute in range(3))
+        return Population(
+            annual_income=self.truncated_normal(incomes, size, annual_income.average, annual_income.standard_deviation,
+                                                annual_income.minimum, annual_income.maximum),
+            children_number=children.integers(children_range.minimum, children_range.maximum, size=size,
+                                              endpoint=True).astype(np.int8),
+            segment=segments.integers(len(SEGMENTS), size=size).astype(np.int8),
+            savings=np.zeros(size, dtype=np.float64),
+            saving_rate=np.full(size, saving_rate, dtype=np.float64),
+            interest_rate=np.full(size, interest_rate, dtype=np.float64),
+            house_id=np.full(size, -1, dtype=np.int64),
+        )
+
+    def chunks(self, size: int) -> List[Tuple[int, int]]:
+        """(chunk number, chunk size) pairs covering a population of `size` consumers."""
+        return [(chunk, min(self.chunk_size, size - start))
+                for chunk, start in enumerate(range(0, size, self.chunk_size))]
+
+    def generate(self, size: int, annual_income, children_range,
+                 saving_rate: float = 0.3, interest_rate: float = 0.05) -> Population:
+        """A population of `size` consumers with incomes from a truncated normal distribution."""
+        parts = [self.generate_chunk(chunk, chunk_size, annual_income, children_range, saving_rate, interest_rate)
+                 for chunk, chunk_size in self.chunks(size)]
+        if not parts:
+            return self.generate_chunk(0, 0, annual_income, children_range, saving_rate, interest_rate)
+        return parts[0] if len(parts) == 1 else Population.concat(parts)
@@ -0,0 +1,336 @@
+import heapq
+from dataclasses import dataclass, field, replace
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .clearing import ClearingEngine
+from .consumers import Segment, accumulated_savings
+from .house_market import HousingMarket, RunningTotals
+from .houses import QualityScore
+from .population import SEGMENTS, Population, PopulationGenerator
+from .simulation import CleaningMarketMechanism, Simulation
+
+class EventKind(IntEnum):
+    LISTING = 0  # A new house comes on the market
+    RESALE = 1  # An owner sells their house back to the market
+
+@dataclass
+class MarketScheduler:
+    """
+    Multi-period simulation driven by an event queue. Each period is one year: incomes grow
+    by `income_growth`, savings accrue, new listings arrive, owners resell with yearly
+    probability `resale_probability` (getting their down payment back), then buyers are served
+    in the order of `cleaning_market_mechanism`.
+
+    Only agents who may buy are served; the result is the same as serving every consumer
+    without a house every period. A buyer who fails is planned against the house their
+    segment would pick now (find_house): they sleep until the period their projected savings
+    afford it. A cheaper house listed or resold that may fit them becomes their target (they
+    act at once if they can afford it), and they wake early if the segment average they
+    compare against rises past the point where a cheaper house would fit them.
+    Averages also move while a period clears; when they wake a sleeper mid-period, the period
+    is cleared again with that sleeper in the queue. Savings are computed in closed form from
+    the last purchase or resale, so they do not depend on how often a consumer is served.
+    The per-period series are preallocated arrays.
+    """
+    market: HousingMarket
+    population: Population
+    periods: int
+    cleaning_market_mechanism: CleaningMarketMechanism
+    down_payment_percentage: float = 0.2
+    income_growth: float = 0.0
+    resale_probability: float = 0.0
+    listing_period: Optional[np.ndarray] = None  # Period each unsold house is listed in (0: from the start)
+    generator: PopulationGenerator = field(default_factory=PopulationGenerator)
+    ownership_rate: np.ndarray = field(init=False)
+    availability_rate: np.ndarray = field(init=False)
+    sales: np.ndarray = field(init=False)
+    resales: np.ndarray = field(init=False)
+    listings: np.ndarray = field(init=False)
+
+    @classmethod
+    def from_simulation(cls, simulation: Simulation, periods: int, **options) -> "MarketScheduler":
+        """Schedule a simulation whose market and consumers have been created."""
+        return cls(market=simulation.housing_market, population=simulation.population, periods=periods,
+                   cleaning_market_mechanism=simulation.cleaning_market_mechanism,
+                   down_payment_percentage=simulation.down_payment_percentage,
+                   generator=simulation.generator, **options)
+
+    def __post_init__(self):
+        periods = self.periods
+        self.ownership_rate = np.zeros(periods, dtype=np.float64)
+        self.availability_rate = np.zeros(periods, dtype=np.float64)
+        self.sales = np.zeros(periods, dtype=np.int64)
+        self.resales = np.zeros(periods, dtype=np.int64)
+        self.listings = np.zeros(periods, dtype=np.int64)
+        self.rng = self.generator.stream(PopulationGenerator.SCHEDULER)
+        self.engine = ClearingEngine(self.market, self.down_payment_percentage)
+        population = self.population
+        size = len(population)
+        population.writable('annual_income', 'savings', 'house_id')
+        population.market = self.market
+        self.base_income = population.annual_income.copy()  # Period 0 income; period p earns it times growth**p
+        self.anchor = np.zeros(size, dtype=np.int64)  # Period the savings were last set by a purchase or resale
+        self.anchor_savings = population.savings.copy()  # Savings at that period
+        self.wake = np.full(size, -1, dtype=np.int64)  # Period a waiting buyer acts next, -1 when not scheduled
+        self.target = np.full(size, np.inf)  # Price of the house a waiting buyer saves for (inf: none fits)
+        self.threshold = np.full(size, np.inf)  # Segment average above which a cheaper house fits them
+        self.average_buyers = population.segment == SEGMENTS.index(Segment.AVERAGE)
+        self.optimizer_buyers = population.segment == SEGMENTS.index(Segment.OPTIMIZER)
+        self.events: List[Tuple[int, int, int]] = []  # (period, kind, row)
+        self.buyers: List[Tuple[int, int]] = []  # (wake period, consumer); stale entries are skipped
+        self.owners = int(np.count_nonzero(population.house_id >= 0))
+        if self.listing_period is not None:
+            for row in np.flatnonzero((self.listing_period > 0) & self.market.available).tolist():
+                self.market.set_available(row, False)
+                heapq.heappush(self.events, (int(self.listing_period[row]), EventKind.LISTING, row))
+        for consumer in np.flatnonzero(population.house_id < 0).tolist():
+            self._wait(consumer, 1)
+        self._schedule_resales(np.flatnonzero(population.house_id >= 0), 0)
+
+    def _schedule_resales(self, owners: np.ndarray, period: int) -> None:
+        """Draw the period each new owner resells in; resales past the horizon are dropped."""
+        if self.resale_probability <= 0 or owners.size == 0:
+            return
+        delays = self.rng.geometric(self.resale_probability, size=owners.size)
+        for consumer, delay in zip(owners.tolist(), delays.tolist()):
+            if period + delay <= self.periods:
+                heapq.heappush(self.events, (period + delay, EventKind.RESALE, consumer))
+
+    def _wait(self, consumer: int, period: int) -> None:
+        self.wake[consumer] = period
+        heapq.heappush(self.buyers, (period, consumer))
+
+    def _savings_at(self, consumers: np.ndarray, periods) -> np.ndarray:
+        """Savings of some consumers at `periods` (broadcast against them), from their anchor."""
+        population = self.population
+        anchor = self.anchor[consumers]
+        return accumulated_savings(
+            self.anchor_savings[consumers], self.base_income[consumers] * (1 + self.income_growth) ** anchor,
+            population.saving_rate[consumers], population.interest_rate[consumers], periods - anchor,
+            self.income_growth,
+        )
+
+    def _catch_up(self, consumers: np.ndarray, period: int) -> None:
+        """Bring savings and incomes of some consumers up to `period`."""
+        population = self.population
+        population.savings[consumers] = self._savings_at(consumers, period)
+        population.annual_income[consumers] = self.base_income[consumers] * (1 + self.income_growth) ** period
+
+    def _anchor(self, consumers: np.ndarray, period: int) -> None:
+        """Record the current savings of consumers whose savings a purchase or resale just changed."""
+        self.anchor_savings[consumers] = self.population.savings[consumers]
+        self.anchor[consumers] = period
+
+    def _affordable_period(self, consumers: np.ndarray, period: int, prices: np.ndarray) -> np.ndarray:
+        """First later period each consumer can pay the down payment on their price, or -1 beyond the horizon."""
+        ahead = np.arange(period + 1, self.periods + 1)
+        if ahead.size == 0 or consumers.size == 0:
+            return np.full(consumers.size, -1, dtype=np.int64)
+        projected = self._savings_at(consumers[:, None], ahead[None, :])
+        affordable = projected >= prices[:, None] * self.down_payment_percentage
+        return np.where(affordable.any(axis=1), ahead[affordable.argmax(axis=1)], -1)
+
+    def _process_events(self, period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply the listings and resales due by `period`; returns the market rows put on the
+        market and the consumers who resold.
+        """
+        market, population = self.market, self.population
+        supply, sellers, sold = [], [], []
+        while self.events and self.events[0][0] <= period:
+            _, kind, row = heapq.heappop(self.events)
+            if kind == EventKind.LISTING:
+                house_row = row
+                self.listings[period - 1] += 1
+            else:
+                house_row = market.index.row_of(int(population.house_id[row]))
+                sellers.append(row)
+                sold.append(house_row)
+            market.set_available(house_row, True)
+            supply.append(house_row)
+        sellers = np.array(sellers, dtype=np.int64)
+        if sellers.size:
+            self._catch_up(sellers, period)
+            population.savings[sellers] += market.prices[sold] * self.down_payment_percentage  # Equity back
+            self._anchor(sellers, period)
+            population.house_id[sellers] = -1
+            self.owners -= sellers.size
+            self.resales[period - 1] = sellers.size
+            self.target[sellers] = -np.inf  # Sellers look for their next house from the following period only
+            self.threshold[sellers] = np.inf
+            for consumer in sellers.tolist():
+                self._wait(consumer, period + 1)
+        return np.array(supply, dtype=np.int64), sellers
+
+    def _woken(self, period: int) -> List[int]:
+        woken = []
+        while self.buyers and self.buyers[0][0] <= period:
+            wake, consumer = heapq.heappop(self.buyers)
+            if self.wake[consumer] == wake:
+                self.wake[consumer] = -1
+                woken.append(consumer)
+        return woken
+
+    def _acting(self, period: int, supply: np.ndarray, sellers: np.ndarray) -> np.ndarray:
+        """
+        Buyers to serve in `period`: those whose wake period has come, and the waiting buyers
+        who can afford a house just put on the market that is cheaper than their target and
+        may fit them. The other buyers such a house may fit now save for it instead.
+        """
+        acting = np.array(self._woken(period), dtype=np.int64)
+        if supply.size == 0:
+            return acting
+        market, population = self.market, self.population
+        prices = market.prices[supply]
+        waiting = np.flatnonzero((population.house_id < 0) & (self.target > prices.min()))
+        if waiting.size == 0:
+            return acting
+        fancy = market.new_construction()[supply] & (market.quality[supply] == QualityScore.EXCELLENT.value)
+        min_bedrooms = population.children_number[waiting].astype(np.int64) + 1
+        segments = population.segment[waiting].astype(np.int64)
+        price = np.full(waiting.size, np.inf)  # Cheapest new house each buyer may pick
+        groups, group_of = np.unique(np.stack([segments, min_bedrooms]), axis=1, return_inverse=True)
+        for group, (code, bedrooms) in enumerate(groups.T.tolist()):
+            fits = market.bedrooms[supply] >= bedrooms
+            if SEGMENTS[code] == Segment.FANCY:
+                fits &= fancy
+            if fits.any():
+                price[group_of.ravel() == group] = prices[fits].min()
+        cheaper = price < self.target[waiting]
+        waiting, price = waiting[cheaper], price[cheaper]
+        self.target[waiting] = price
+        average = self.average_buyers[waiting]
+        self.threshold[waiting[average]] = np.minimum(self.threshold[waiting[average]], price[average])
+        wake = self._affordable_period(waiting, period - 1, price)
+        now = wake == period
+        self.wake[waiting[now]] = -1  # Their heap entries become stale
+        earlier = (wake > period) & ((self.wake[waiting] < 0) | (wake < self.wake[waiting]))
+        for consumer, wake_period in zip(waiting[earlier].tolist(), wake[earlier].tolist()):
+            self._wait(consumer, wake_period)
+        return np.union1d(acting, waiting[now])
+
+    def _crossed(self, consumers: np.ndarray, average_price: float, average_price_per_sqft: float) -> np.ndarray:
+        """Waiting buyers outside `consumers` whose threshold the segment averages went above."""
+        crossed = (self.population.house_id < 0) & (
+            (self.average_buyers & (self.threshold < average_price))
+            | (self.optimizer_buyers & (self.threshold < average_price_per_sqft))
+        )
+        crossed[consumers] = False
+        return np.flatnonzero(crossed)
+
+    def _peak_averages(self, start: RunningTotals, rows: np.ndarray) -> Tuple[float, float]:
+        """Highest average price and price per square foot while the houses at `rows` sell in turn."""
+        market = self.market
+        totals = RunningTotals(start.count, start.price, start.price_per_sqft)
+        price, price_per_sqft = totals.average(totals.price), totals.average(totals.price_per_sqft)
+        for row in rows.tolist():  # As HousingMarket updates its totals on each sale
+            totals.add(float(market.prices[row]), float(market.price_per_sqft[row]), -1)
+            price = max(price, totals.average(totals.price))
+            price_per_sqft = max(price_per_sqft, totals.average(totals.price_per_sqft))
+        return price, price_per_sqft
+
+    def _queue(self, consumers: np.ndarray) -> np.ndarray:
+        income = self.population.annual_income[consumers]
+        mechanism = self.cleaning_market_mechanism
+        if mechanism == CleaningMarketMechanism.INCOME_ORDER_DESCENDANT:
+            return consumers[np.argsort(-income, kind='stable')]
+        if mechanism == CleaningMarketMechanism.INCOME_ORDER_ASCENDANT:
+            return consumers[np.argsort(income, kind='stable')]
+        if mechanism == CleaningMarketMechanism.RANDOM:
+            return consumers[self.rng.permutation(consumers.size)]
+        return consumers
+
+    def _clear(self, consumers: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Serve `consumers` and any sleeper the moving averages wake, undoing and repeating the
+        clearing until no one outside the queue could have bought. Returns the queue, the
+        market row each bought (or -1) and their savings.
+        """
+        market, population = self.market, self.population
+        totals = replace(market.totals)
+        bedroom_totals = {bedrooms: replace(group) for bedrooms, group in market.bedroom_totals.items()}
+        while True:
+            queue = np.empty(0, dtype=np.int64)
+            bought = np.empty(0, dtype=np.int64)
+            savings = np.empty(0, dtype=np.float64)
+            if consumers.size:
+                self._catch_up(consumers, period)
+                queue = self._queue(consumers)
+                savings = population.savings[queue]
+                bought = self.engine.assign(
+                    [SEGMENTS[code] for code in population.segment[queue].tolist()],
+                    population.children_number[queue].astype(np.int64) + 1,
+                    savings,
+                )
+            crossed = self._crossed(consumers, *self._peak_averages(totals, bought[bought >= 0]))
+            if crossed.size == 0:
+                return queue, bought, savings
+            for row in bought[bought >= 0].tolist():
+                market.set_available(row, True)
+            market.totals = replace(totals)  # Exactly as before, whatever the rounding of the updates
+            market.bedroom_totals = {bedrooms: replace(group) for bedrooms, group in bedroom_totals.items()}
+            self.wake[crossed] = -1
+            consumers = np.union1d(consumers, crossed)
+
+    def step(self, period: int) -> None:
+        """Run period `period` (1-based)."""
+        market, population = self.market, self.population
+        supply, sellers = self._process_events(period)
+        queue, bought, savings = self._clear(self._acting(period, supply, sellers), period)
+        if queue.size:
+            population.savings[queue] = savings
+            buyers = bought >= 0
+            population.house_id[queue[buyers]] = market.ids[bought[buyers]]
+            self._anchor(queue[buyers], period)
+            self.owners += int(np.count_nonzero(buyers))
+            self.sales[period - 1] = int(np.count_nonzero(buyers))
+            self._schedule_resales(queue[buyers], period)
+            self._reschedule(queue[~buyers], period)
+        self.ownership_rate[period - 1] = self.owners / len(population) if len(population) else 0.0
+        self.availability_rate[period - 1] = market.totals.count / len(market) if len(market) else 0.0
+
+    def _reschedule(self, consumers: np.ndarray, period: int) -> None:
+        """
+        Plan the next attempt of buyers who did not buy against the house their segment picks
+        now: its price is their target, and for AVERAGE and OPTIMIZER buyers the threshold is
+        the lowest segment average at which a cheaper house would qualify for them.
+        """
+        market, population = self.market, self.population
+        min_bedrooms = population.children_number[consumers].astype(np.int64) + 1
+        segments = population.segment[consumers]
+        target = np.full(consumers.size, np.inf)
+        threshold = np.full(consumers.size, np.inf)
+        groups, group_of = np.unique(np.stack([segments.astype(np.int64), min_bedrooms]), axis=1,
+                                     return_inverse=True)
+        for group, (code, bedrooms) in enumerate(groups.T.tolist()):
+            segment, members = SEGMENTS[code], group_of.ravel() == group
+            row = market.find_house(segment, bedrooms)
+            price = np.inf if row is None else float(market.prices[row])
+            target[members] = price
+            if segment == Segment.AVERAGE and row is None:
+                cheapest = market.index.cheapest(bedrooms)  # Fits once the average price is above it
+                threshold[members] = np.inf if cheapest is None else float(market.prices[cheapest])
+            elif segment == Segment.OPTIMIZER:
+                cheaper = market.available & (market.bedrooms >= bedrooms) & (market.prices < price)
+                threshold[members] = market.price_per_sqft[cheaper].min() if cheaper.any() else np.inf
+        self.target[consumers] = target
+        self.threshold[consumers] = threshold
+        planned = np.isfinite(target)
+        wake = np.full(consumers.size, -1, dtype=np.int64)
+        wake[planned] = self._affordable_period(consumers[planned], period, target[planned])
+        for consumer, wake_period in zip(consumers[wake > 0].tolist(), wake[wake > 0].tolist()):
+            self._wait(consumer, wake_period)
+
+    def run(self) -> Dict[str, np.ndarray]:
+        """Run every period; savings and incomes are brought up to the last period at the end."""
+        for period in range(1, self.periods + 1):
+            self.step(period)
+        self._catch_up(np.arange(len(self.population)), self.periods)
+        return {
+            'ownership_rate': self.ownership_rate,
+            'availability_rate': self.availability_rate,
+            'sales': self.sales,
+            'resales': self.resales,
+            'listings': self.listings,
+        }
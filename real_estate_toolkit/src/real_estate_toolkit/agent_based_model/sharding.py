@@ -0,0 +1,170 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ..data.table import Table
+from .clearing import ClearingEngine
+from .ensemble import SharedMarket
+from .house_market import HousingMarket
+from .population import SEGMENTS, Population, PopulationGenerator
+from .simulation import MARKET_ARRAYS, market_from_table
+
+def neighborhood_labels(table: Table, column: str = 'neighborhood') -> np.ndarray:
+    """Neighborhood of every row of a Table, '' where missing."""
+    neighborhoods = table[column]
+    return np.where(neighborhoods.mask, '', neighborhoods.decoded().astype(str))
+
+class ShardedMarket:
+    """
+    A housing market partitioned by neighborhood. Every shard is a HousingMarket of its own,
+    with its own indexes and running totals; `market` keeps the whole pool in sync with the
+    shards for the consumers who fall back to other neighborhoods.
+    """
+
+    def __init__(self, market: HousingMarket, neighborhoods: Sequence[str]):
+        self.market = market
+        self.names, codes = np.unique(np.asarray(neighborhoods), return_inverse=True)
+        self.codes = codes.astype(np.int64)  # Shard of each market row
+        self.rows: List[np.ndarray] = [np.flatnonzero(self.codes == shard) for shard in range(self.names.size)]
+        self.local_rows = np.empty(len(market), dtype=np.int64)  # Row of each market row in its shard
+        for rows in self.rows:
+            self.local_rows[rows] = np.arange(rows.size)
+        self.shards = [_shard(market, rows) for rows in self.rows]
+
+    @classmethod
+    def from_table(cls, table: Table, column: str = 'neighborhood') -> "ShardedMarket":
+        """Shard the market of a Table (see market_from_table) by a neighborhood column."""
+        return cls(market_from_table(table), neighborhood_labels(table, column))
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def shard_of(self, neighborhood: str) -> int:
+        shard = int(np.searchsorted(self.names, neighborhood))
+        if shard == self.names.size or self.names[shard] != neighborhood:
+            raise KeyError(f"Unknown neighborhood {neighborhood!r}.")
+        return shard
+
+    def sell(self, row: int) -> None:
+        """Mark market row `row` sold in the whole market and in its shard."""
+        self.market.sell(row)
+        self.shards[self.codes[row]].sell(self.local_rows[row])
+
+    def assign_preferences(self, population: Population, generator: PopulationGenerator) -> None:
+        """
+        Draw the preferred neighborhood of every consumer of `population`, in proportion to each
+        neighborhood's available houses, from the generator's PREFERENCES substream.
+        """
+        supply = np.array([shard.totals.count for shard in self.shards], dtype=np.float64)
+        if supply.sum() == 0:
+            supply = np.ones(len(self.shards))
+        rng = generator.stream(PopulationGenerator.PREFERENCES)
+        population.writable('neighborhood')
+        population.neighborhood[:] = rng.choice(len(self.shards), len(population), p=supply / supply.sum())
+
+def _shard(market: HousingMarket, rows: np.ndarray) -> HousingMarket:
+    """The houses of some rows of a market, as a market of their own."""
+    return HousingMarket.from_arrays(**{name: getattr(market, name)[rows] for name in MARKET_ARRAYS})
+
+def _clear_shard(market: SharedMarket, rows: np.ndarray, segments: np.ndarray, min_bedrooms: np.ndarray,
+                 savings: np.ndarray, down_payment_percentage: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Worker task: clear the shard of the given rows of a shared market for its queue of buyers;
+    returns the shard rows bought and the savings left.
+    """
+    bought = ClearingEngine(_shard(market.attach(), rows), down_payment_percentage).assign(
+        [SEGMENTS[code] for code in segments.tolist()], min_bedrooms, savings
+    )
+    return bought, savings
+
+class ShardedClearing:
+    """
+    Market clearing over a ShardedMarket in two steps. First every consumer with a preferred
+    neighborhood (Population.neighborhood) is queued in its shard; the shards share no buyers,
+    so they are cleared independently, in parallel across processes. The workers get the market
+    through shared memory (see SharedMarket) and build their shard from it. Then the consumers
+    left without a house, in the same queue order, fall back to the remaining houses of every
+    neighborhood.
+    """
+
+    def __init__(self, sharded: ShardedMarket, down_payment_percentage: float = 0.2,
+                 workers: Optional[int] = None):
+        self.sharded = sharded
+        self.down_payment_percentage = down_payment_percentage
+        self.workers = workers or os.cpu_count() or 1
+
+    def _first_choice(self, queues: Dict[int, np.ndarray],
+                      population: Population) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        def task(shard: int) -> tuple:
+            queue = queues[shard]
+            return (population.segment[queue], population.children_number[queue].astype(np.int64) + 1,
+                    population.savings[queue].copy(), self.down_payment_percentage)
+
+        shards = self.sharded.shards
+        if self.workers == 1 or len(queues) < 2:
+            results = {}
+            for shard in queues:
+                segments, min_bedrooms, savings, down_payment_percentage = task(shard)
+                bought = ClearingEngine(shards[shard], down_payment_percentage).assign(
+                    [SEGMENTS[code] for code in segments.tolist()], min_bedrooms, savings
+                )
+                results[shard] = bought, savings
+            return results
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            shared = SharedMarket.create(self.sharded.market, blocks)
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(queues))) as pool:
+                # Largest shards first, so that a big shard does not start last
+                futures = {shard: pool.submit(_clear_shard, shared, self.sharded.rows[shard], *task(shard))
+                           for shard in sorted(queues, key=lambda shard: -queues[shard].size)}
+                results = {shard: future.result() for shard, future in futures.items()}
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        for shard, (bought, _) in results.items():  # The workers cleared copies of the shards
+            for row in bought[bought >= 0].tolist():
+                shards[shard].sell(row)
+        return results
+
+    def clear_population(self, population: Population, order: Optional[np.ndarray] = None,
+                         fallback: bool = True) -> Dict[str, int]:
+        """
+        Let the consumers of a population buy houses in `order` (row order by default), each in
+        their preferred neighborhood first. Updates savings and house ids in place and returns
+        the number of purchases in the preferred neighborhood and on fallback.
+        """
+        sharded = self.sharded
+        order = np.arange(len(population)) if order is None else np.asarray(order)
+        population.writable('savings', 'house_id')
+        queue_shards = population.neighborhood[order]
+        queues = {shard: order[queue_shards == shard] for shard in np.unique(queue_shards).tolist()
+                  if 0 <= shard < len(sharded)}
+        first_choice = 0
+        for shard, (bought, savings) in self._first_choice(queues, population).items():
+            queue, buyers = queues[shard], bought >= 0
+            rows = sharded.rows[shard][bought[buyers]]
+            population.savings[queue] = savings
+            population.house_id[queue[buyers]] = sharded.market.ids[rows]
+            for row in rows.tolist():
+                sharded.market.sell(row)
+            first_choice += int(np.count_nonzero(buyers))
+
+        fallback_purchases = 0
+        if fallback:
+            waiting = order[population.house_id[order] < 0]
+            savings = population.savings[waiting]
+            bought = ClearingEngine(sharded.market, self.down_payment_percentage).assign(
+                [SEGMENTS[code] for code in population.segment[waiting].tolist()],
+                population.children_number[waiting].astype(np.int64) + 1,
+                savings,
+            )
+            buyers = bought >= 0
+            population.savings[waiting] = savings
+            population.house_id[waiting[buyers]] = sharded.market.ids[bought[buyers]]
+            for row in bought[buyers].tolist():
+                sharded.sell(row)
+            fallback_purchases = int(np.count_nonzero(buyers))
+        population.market = sharded.market
+        return {'first_choice': first_choice, 'fallback': fallback_purchases}
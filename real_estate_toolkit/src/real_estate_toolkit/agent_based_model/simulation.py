@@ -1,10 +1,17 @@
+import copy
+import io
+import json
 from enum import Enum, auto
-from dataclasses import dataclass, field
-from random import gauss, randint, shuffle, choice
-from typing import List, Dict, Any
+from dataclasses import asdict, dataclass, field
+from typing import List, Dict, Any, MutableSequence, Optional, Sequence, Union
+import numpy as np
+from ..data.table import Table, as_table
 from .houses import House
 from .house_market import HousingMarket
-from .consumers import Segment, Consumer
+from .consumers import Consumer, accumulated_savings
+from .clearing import ClearingEngine
+from .instrumentation import NULL_INSTRUMENTATION, Instrumentation
+from .population import Population, PopulationGenerator
 
 class CleaningMarketMechanism(Enum):
     INCOME_ORDER_DESCENDANT = auto()
@@ -23,9 +30,56 @@ class ChildrenRange:
     minimum: int = 0
     maximum: int = 5
 
+# Cleaned Ames column holding each House field, used when a Table does not carry the House field names
+AMES_HOUSE_COLUMNS = {
+    'id': 'id',
+    'price': 'sale_price',
+    'area': 'gr_liv_area',
+    'bedrooms': 'bedroom_abv_gr',
+    'year_built': 'year_built',
+    'quality_score': 'overall_qual',
+}
+
+def market_from_table(table: Table) -> HousingMarket:
+    """
+    Build a housing market straight from the columns of a Table, either named after the House
+    fields or after the cleaned Ames columns (overall quality 1-10 is mapped onto QualityScore).
+    """
+    ames = 'price' not in table
+    names = AMES_HOUSE_COLUMNS if ames else {name: name for name in AMES_HOUSE_COLUMNS}
+    quality = None
+    if names['quality_score'] in table:
+        column = table[names['quality_score']]
+        quality = np.clip(column.values.astype(np.int64) // 2, 1, 5) if ames else column.values
+        quality = np.where(column.mask, 0, quality)
+    return HousingMarket.from_arrays(
+        ids=table[names['id']].values,
+        prices=table[names['price']].values,
+        areas=table[names['area']].values,
+        bedrooms=table[names['bedrooms']].values,
+        year_built=table[names['year_built']].values,
+        quality=quality,
+        available=table['available'].values if 'available' in table else None,
+    )
+
+# Arrays that rebuild a HousingMarket, named as the arguments of HousingMarket.from_arrays
+MARKET_ARRAYS = ('ids', 'prices', 'areas', 'bedrooms', 'year_built', 'quality', 'available')
+
+def build_market(housing_market_data: Union[List[Dict[str, Any]], Table]) -> HousingMarket:
+    """Housing market of a Table (see market_from_table) or of a list of House field dictionaries."""
+    if isinstance(housing_market_data, Table):
+        return market_from_table(housing_market_data)
+    return HousingMarket(houses=[House(**data) for data in housing_market_data])
+
+def houses_from_table(table: Table) -> Sequence[House]:
+    """
+    Build houses straight from the columns of a Table (as views onto a market built from it).
+    """
+    return market_from_table(table).houses
+
 @dataclass
 class Simulation:
-    housing_market_data: List[Dict[str, Any]]
+    housing_market_data: Union[List[Dict[str, Any]], Table]
     consumers_number: int
     years: int
     annual_income: AnnualIncomeStatistics
@@ -34,54 +88,173 @@ class Simulation:
     down_payment_percentage: float = 0.2
     saving_rate: float = 0.3
     interest_rate: float = 0.05
+    seed: Union[int, np.random.SeedSequence, None] = None  # None draws fresh entropy (see generator.entropy)
+    # Column of the housing market data to shard the market by: consumers then prefer a neighborhood,
+    # buy there first and fall back to the others (see sharding.ShardedClearing)
+    neighborhood_column: Optional[str] = None
+    clearing_workers: int = 1  # Processes clearing the neighborhoods in parallel
     housing_market: HousingMarket = field(init=False)
-    consumers: List[Consumer] = field(init=False)
+    neighborhoods: Optional[np.ndarray] = field(init=False, default=None, repr=False)  # Of each market row
+    # Views onto `population`, a list of them in all but storage (see Handles): reordering them does not change
+    # the clearing order, which follows cleaning_market_mechanism
+    consumers: MutableSequence[Consumer] = field(init=False)
+    population: Population = field(init=False)
+    generator: PopulationGenerator = field(init=False)
+    instrumentation: Instrumentation = field(default=NULL_INSTRUMENTATION, repr=False)  # Opt-in timers and counters
+
+    def __post_init__(self):
+        self.generator = PopulationGenerator(self.seed)
+
+    def _instrument_market(self) -> None:
+        if self.instrumentation.enabled:
+            self.housing_market.instrumentation = self.instrumentation
+
+    def _sharded_market(self):
+        """ShardedMarket over the current market, or None without neighborhoods."""
+        from .sharding import ShardedMarket  # sharding builds on this module
+        return ShardedMarket(self.housing_market, self.neighborhoods) if self.neighborhoods is not None else None
 
     def create_housing_market(self):
-        houses = [House(**data) for data in self.housing_market_data]
-        self.housing_market = HousingMarket(houses=houses)
+        with self.instrumentation.phase('market_creation'):
+            self.housing_market = build_market(self.housing_market_data)
+            if self.neighborhood_column is not None:
+                from .sharding import neighborhood_labels
+                self.neighborhoods = neighborhood_labels(as_table(self.housing_market_data), self.neighborhood_column)
+        self._instrument_market()
 
     def create_consumers(self):
-        self.consumers = []
-        for _ in range(self.consumers_number):
-            income = gauss(self.annual_income.average, self.annual_income.standard_deviation)
-            while income < self.annual_income.minimum or income > self.annual_income.maximum:
-                income = gauss(self.annual_income.average, self.annual_income.standard_deviation)
-            children = randint(self.children_range.minimum, self.children_range.maximum)
-            segment = choice(list(Segment))
-            consumer = Consumer(
-                ID=_,
-                annual_income=income,
-                children_number=children,
-                segment=segment,
-                savings=0.0,
-                saving_rate=self.saving_rate,
-                interest_rate=self.interest_rate
+        with self.instrumentation.phase('population_generation'):
+            self.population = self.generator.generate(
+                self.consumers_number, self.annual_income, self.children_range, self.saving_rate, self.interest_rate
             )
-            self.consumers.append(consumer)
+            sharded = self._sharded_market()
+            if sharded is not None:
+                sharded.assign_preferences(self.population, self.generator)
+            self.consumers = self.population.views()
 
     def compute_consumers_savings(self):
-        for consumer in self.consumers:
-            consumer.compute_savings(self.years)
+        population = self.population
+        with self.instrumentation.phase('savings'):
+            population.writable('savings')
+            population.savings[:] = accumulated_savings(
+                population.savings, population.annual_income, population.saving_rate, population.interest_rate,
+                self.years,
+            )
 
     def clean_the_market(self):
-        if self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_DESCENDANT:
-            self.consumers.sort(key=lambda x: x.annual_income, reverse=True)
-        elif self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_ASCENDANT:
-            self.consumers.sort(key=lambda x: x.annual_income)
-        elif self.cleaning_market_mechanism == CleaningMarketMechanism.RANDOM:
-            shuffle(self.consumers)
+        self._instrument_market()
+        with self.instrumentation.phase('clearing'):
+            income = self.population.annual_income
+            if self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_DESCENDANT:
+                order = np.argsort(-income, kind='stable')
+            elif self.cleaning_market_mechanism == CleaningMarketMechanism.INCOME_ORDER_ASCENDANT:
+                order = np.argsort(income, kind='stable')
+            elif self.cleaning_market_mechanism == CleaningMarketMechanism.RANDOM:
+                order = self.generator.stream(PopulationGenerator.SHUFFLE).permutation(len(income))
+            else:
+                order = np.arange(len(income))
 
-        for consumer in self.consumers:
-            consumer.buy_a_house(self.housing_market)
+            sharded = self._sharded_market()
+            if sharded is None:
+                ClearingEngine(self.housing_market, self.down_payment_percentage).clear_population(
+                    self.population, order
+                )
+            else:
+                from .sharding import ShardedClearing
+                ShardedClearing(sharded, self.down_payment_percentage, self.clearing_workers).clear_population(
+                    self.population, order
+                )
+            self.consumers = self.population.views(order)  # Queue order, as the consumer list was sorted before
 
     def compute_owners_population_rate(self) -> float:
-        owners = sum(1 for consumer in self.consumers if consumer.house is not None)
+        owners = int(np.count_nonzero(self.population.house_id >= 0))
         return owners / self.consumers_number if self.consumers_number > 0 else 0
 
     def compute_houses_availability_rate(self) -> float:
-        available_houses = sum(1 for house in self.housing_market.houses if house.available)
-        total_houses = len(self.housing_market.houses)
+        available_houses = int(np.count_nonzero(self.housing_market.available))
+        total_houses = len(self.housing_market)
         return available_houses / total_houses if total_houses > 0 else 0
 
+    def fork(self, **changes: Any) -> "Simulation":
+        """
+        A simulation continuing from this one's current state with the given parameters changed,
+        e.g. to branch a policy change after the savings have accrued. The market and population
+        arrays are shared copy on write (see HousingMarket.with_availability and Population.fork),
+        and random draws come from the same seed, so each branch behaves as a rerun from scratch
+        that changed only its own parameters from the steps still to run.
+        """
+        forked = copy.copy(self)
+        for name, value in changes.items():
+            if name == 'seed' or name not in self.__dataclass_fields__ or not self.__dataclass_fields__[name].init:
+                raise TypeError(f"fork() cannot change '{name}'")
+            setattr(forked, name, value)
+        if hasattr(self, 'housing_market'):
+            forked.housing_market = self.housing_market.with_availability()
+        if hasattr(self, 'population'):
+            forked.population = self.population.fork()
+            if forked.population.market is not None and forked.population.market is self.housing_market:
+                forked.population.market = forked.housing_market
+            forked.consumers = forked.population.views(self.consumers.rows)
+            for name in ('saving_rate', 'interest_rate'):  # Per consumer in the population
+                if name in changes:
+                    forked.population.writable(name)
+                    getattr(forked.population, name)[:] = changes[name]
+        return forked
 
+    def snapshot(self) -> bytes:
+        """
+        Compressed NumPy archive of the state: parameters, seed, market and population arrays and
+        the consumer order. The housing market data is not kept, the market arrays stand for it.
+        """
+        config = {
+            name: getattr(self, name)
+            for name in ('consumers_number', 'years', 'down_payment_percentage', 'saving_rate', 'interest_rate',
+                         'neighborhood_column', 'clearing_workers')
+        }
+        config.update(
+            annual_income=asdict(self.annual_income),
+            children_range=asdict(self.children_range),
+            cleaning_market_mechanism=self.cleaning_market_mechanism.name,
+            entropy=self.generator.seed_sequence.entropy,
+            spawn_key=list(self.generator.seed_sequence.spawn_key),
+        )
+        arrays = {'config': np.array(json.dumps(config))}
+        if hasattr(self, 'housing_market'):
+            arrays.update({f"market.{name}": getattr(self.housing_market, name) for name in MARKET_ARRAYS})
+        if self.neighborhoods is not None:
+            arrays['market.neighborhoods'] = self.neighborhoods
+        if hasattr(self, 'population'):
+            arrays.update({f"population.{name}": getattr(self.population, name) for name in Population.ARRAYS})
+            if not isinstance(self.consumers.rows, range):
+                arrays['consumers.order'] = np.asarray(self.consumers.rows)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_snapshot(cls, data: bytes) -> "Simulation":
+        """Restore a simulation saved with snapshot (its housing_market_data is empty)."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+        config = json.loads(str(arrays.pop('config')))
+        seed = np.random.SeedSequence(config.pop('entropy'), spawn_key=tuple(config.pop('spawn_key')))
+        simulation = cls(
+            housing_market_data=[],
+            annual_income=AnnualIncomeStatistics(**config.pop('annual_income')),
+            children_range=ChildrenRange(**config.pop('children_range')),
+            cleaning_market_mechanism=CleaningMarketMechanism[config.pop('cleaning_market_mechanism')],
+            seed=seed,
+            **config,
+        )
+        if 'market.ids' in arrays:
+            simulation.housing_market = HousingMarket.from_arrays(
+                **{name: arrays[f"market.{name}"] for name in MARKET_ARRAYS}
+            )
+        simulation.neighborhoods = arrays.get('market.neighborhoods')
+        if 'population.savings' in arrays:
+            simulation.population = Population(
+                **{name: arrays[f"population.{name}"] for name in Population.ARRAYS if f"population.{name}" in arrays},
+                market=getattr(simulation, 'housing_market', None),
+            )
+            simulation.consumers = simulation.population.views(arrays.get('consumers.order'))
+        return simulation
@@ -0,0 +1,182 @@
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import astuple, replace
+from functools import lru_cache
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from ..data.table import Table
+from .ensemble import Scenario, SharedMarket
+from .house_market import HousingMarket
+from .population import Population, PopulationGenerator
+from .simulation import AnnualIncomeStatistics, ChildrenRange, build_market
+
+# Columns of a sweep result: the task, its scenario, then the outcomes
+RESULT_COLUMNS = [
+    'point', 'replica', 'consumers_number', 'years', 'income_minimum', 'income_average',
+    'income_standard_deviation', 'income_maximum', 'children_minimum', 'children_maximum',
+    'cleaning_market_mechanism', 'down_payment_percentage', 'saving_rate', 'interest_rate',
+    'owners_population_rate', 'houses_availability_rate',
+]
+ENTROPY_HEADER = '# entropy='  # First line of a results file, before the columns
+
+def scenario_fields(scenario: Scenario) -> List[str]:
+    """The scenario columns of a result row, as written to the CSV file."""
+    return [str(value) for value in (
+        scenario.consumers_number, scenario.years, *astuple(scenario.annual_income),
+        *astuple(scenario.children_range), scenario.cleaning_market_mechanism.name,
+        scenario.down_payment_percentage, scenario.saving_rate, scenario.interest_rate,
+    )]
+
+@lru_cache(maxsize=8)
+def _base_population(entropy: int, replica: int, consumers_number: int, annual_income: Tuple[float, ...],
+                     children_range: Tuple[int, int]) -> Population:
+    """
+    Consumers of a replica before savings: they depend only on the seed, the size and the income
+    and children distributions, so grid points that share those generate them once per process.
+    """
+    generator = PopulationGenerator(np.random.SeedSequence(entropy, spawn_key=(replica,)))
+    return generator.generate(consumers_number, AnnualIncomeStatistics(*annual_income), ChildrenRange(*children_range))
+
+def _population(entropy: int, replica: int, scenario: Scenario) -> Population:
+    base = _base_population(entropy, replica, scenario.consumers_number, astuple(scenario.annual_income),
+                            astuple(scenario.children_range))
+    size = len(base)
+    return replace(  # The drawn attributes are shared, the rest is the scenario's own
+        base,
+        savings=np.zeros(size, dtype=np.float64),
+        saving_rate=np.full(size, scenario.saving_rate, dtype=np.float64),
+        interest_rate=np.full(size, scenario.interest_rate, dtype=np.float64),
+        house_id=np.full(size, -1, dtype=np.int64),
+    )
+
+def _run_points(market: Union[HousingMarket, SharedMarket], entropy: int,
+                tasks: List[Tuple[int, int, Scenario]]) -> List[Tuple[int, int, float, float]]:
+    """Worker task: (point, replica, owners rate, availability rate) of some grid points."""
+    base = market.attach() if isinstance(market, SharedMarket) else market
+    results = []
+    for point, replica, scenario in tasks:
+        seed = np.random.SeedSequence(entropy, spawn_key=(replica,))
+        owners, availability = scenario.run(base.with_availability(), seed, _population(entropy, replica, scenario))
+        results.append((point, replica, owners, availability))
+    return results
+
+class Sweep:
+    """
+    Runs a list of scenarios (see grid) on one market, `replicas` times each. The market is
+    built once and shared with the workers; replica r of every point draws from the substream
+    (seed, r), so points are compared on the same consumers, which each worker generates once
+    for all the points that share their distributions.
+
+    Results go to a columnar Table with one row per point and replica. With a `path`, every
+    finished row is appended to that CSV file, and a later run with the same sweep only runs
+    the rows missing from it. The file starts with the entropy of the seed, and a sweep with
+    another one (e.g. seed=None, which draws fresh entropy) refuses to resume it.
+    """
+
+    def __init__(self, housing_market_data: Union[List[Dict[str, Any]], Table, HousingMarket],
+                 scenarios: Sequence[Scenario], seed: Optional[int] = None, replicas: int = 1):
+        self.market = (housing_market_data if isinstance(housing_market_data, HousingMarket)
+                       else build_market(housing_market_data))
+        self.scenarios = list(scenarios)
+        self.replicas = replicas
+        self.seed_sequence = np.random.SeedSequence(seed)
+
+    @classmethod
+    def grid(cls, housing_market_data: Union[List[Dict[str, Any]], Table, HousingMarket], base: Scenario,
+             seed: Optional[int] = None, replicas: int = 1, **axes: Sequence[Any]) -> "Sweep":
+        """Sweep over every combination of the values given for Scenario fields, e.g. saving_rate=[0.2, 0.3]."""
+        names = list(axes)
+        scenarios = [replace(base, **dict(zip(names, values))) for values in itertools.product(*axes.values())]
+        return cls(housing_market_data, scenarios, seed, replicas)
+
+    def _row(self, point: int, replica: int, owners: float, availability: float) -> List[str]:
+        return [str(point), str(replica), *scenario_fields(self.scenarios[point]), str(owners), str(availability)]
+
+    def _finished(self, path: Path) -> Dict[Tuple[int, int], List[str]]:
+        """Rows already in the results file, checked against this sweep's seed and scenarios."""
+        if not path.exists() or path.stat().st_size == 0:
+            return {}
+        with open(path, newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if not header or len(header) != 1 or not header[0].startswith(ENTROPY_HEADER) \
+                    or next(reader, None) != RESULT_COLUMNS:
+                raise ValueError(f"{path} is not a sweep results file.")
+            entropy = int(header[0][len(ENTROPY_HEADER):])
+            if entropy != self.seed_sequence.entropy:
+                raise ValueError(f"{path} holds results of a sweep seeded with entropy {entropy}, "
+                                 f"not {self.seed_sequence.entropy}: pass seed={entropy} to resume it.")
+            finished = {}
+            for row in reader:
+                point, replica = int(row[0]), int(row[1])
+                if point >= len(self.scenarios) or row[2:-2] != scenario_fields(self.scenarios[point]):
+                    raise ValueError(f"{path} holds results of another sweep (point {point}).")
+                finished[point, replica] = row
+        return finished
+
+    def run(self, path: Union[str, Path, None] = None, workers: Optional[int] = None,
+            batch_size: Optional[int] = None) -> Table:
+        """
+        Run the rows not yet in `path` on `workers` processes (all cores by default; 1 runs in this
+        process), in tasks of `batch_size` rows, and return every row ordered by point and replica.
+        """
+        path = Path(path) if path is not None else None
+        rows = {}
+        if path is not None and path.exists():
+            text = path.read_bytes()
+            if text and not text.endswith(b'\n'):
+                path.write_bytes(text[:text.rfind(b'\n') + 1])  # Drop the partial row of an interrupted run
+            rows = self._finished(path)
+        entropy = self.seed_sequence.entropy
+        # Points sharing a population next to each other, so that they land in the same tasks
+        pending = sorted(
+            ((point, replica, scenario) for point, scenario in enumerate(self.scenarios)
+             for replica in range(self.replicas) if (point, replica) not in rows),
+            key=lambda task: (task[1], task[2].consumers_number, astuple(task[2].annual_income),
+                              astuple(task[2].children_range), task[0]),
+        )
+        workers = workers or os.cpu_count() or 1
+        batch_size = batch_size or max(1, -(-len(pending) // (4 * workers)))
+        batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+
+        file = None
+        if path is not None:
+            new_file = not path.exists() or path.stat().st_size == 0
+            file = open(path, 'a', newline='')
+        try:
+            writer = csv.writer(file) if file is not None else None
+            if writer is not None and new_file:
+                writer.writerow([f'{ENTROPY_HEADER}{entropy}'])
+                writer.writerow(RESULT_COLUMNS)
+
+            def record(results: List[Tuple[int, int, float, float]]) -> None:
+                for point, replica, owners, availability in results:
+                    rows[point, replica] = self._row(point, replica, owners, availability)
+                    if writer is not None:
+                        writer.writerow(rows[point, replica])
+                if file is not None:
+                    file.flush()
+
+            if workers == 1:
+                for batch in batches:
+                    record(_run_points(self.market, entropy, batch))
+            else:
+                blocks: List[shared_memory.SharedMemory] = []
+                try:
+                    shared = SharedMarket.create(self.market, blocks)
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        for task in as_completed([pool.submit(_run_points, shared, entropy, batch)
+                                                  for batch in batches]):
+                            record(task.result())
+                finally:
+                    for block in blocks:
+                        block.close()
+                        block.unlink()
+        finally:
+            if file is not None:
+                file.close()
+        return Table.from_rows(RESULT_COLUMNS, [rows[key] for key in sorted(rows)])
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import numpy as np
+from .house_market import HousingMarket
+
+@dataclass(frozen=True)
+class MarketShape:
+    """
+    Distribution of the houses of a market: (log price, log area) as a bivariate normal,
+    bedrooms and quality scores (0 for missing) as categorical distributions, and the year
+    built through its deciles. generate draws synthetic markets of any size from it.
+    """
+    log_mean: Tuple[float, float]  # Mean of (log price, log area)
+    log_covariance: Tuple[Tuple[float, float], Tuple[float, float]]
+    bedrooms: Tuple[float, ...]  # Weight of 0, 1, 2, ... bedrooms
+    quality: Tuple[float, ...]  # Weight of quality 0 (missing), 1, ..., 5
+    year_built_deciles: Tuple[float, ...]  # Percentiles 0, 10, ..., 100
+
+    @classmethod
+    def fit(cls, market: HousingMarket) -> "MarketShape":
+        """Shape of an existing market (houses with a zero price or area are left out of the log fit)."""
+        valid = (market.prices > 0) & (market.areas > 0)
+        logs = np.log(np.stack([market.prices[valid], market.areas[valid]]))
+        covariance = np.cov(logs)
+        return cls(
+            log_mean=(float(logs[0].mean()), float(logs[1].mean())),
+            log_covariance=((float(covariance[0, 0]), float(covariance[0, 1])),
+                            (float(covariance[1, 0]), float(covariance[1, 1]))),
+            bedrooms=tuple(np.bincount(market.bedrooms).astype(float).tolist()),
+            quality=tuple(np.bincount(market.quality, minlength=6).astype(float).tolist()),
+            year_built_deciles=tuple(np.percentile(market.year_built, np.arange(0, 101, 10)).tolist()),
+        )
+
+    def generate(self, size: int, seed: Optional[int] = None) -> HousingMarket:
+        """A market of `size` available houses with ids 0 .. size - 1."""
+        rng = np.random.default_rng(seed)
+        prices, areas = np.exp(rng.multivariate_normal(self.log_mean, self.log_covariance, size)).T
+        bedrooms = np.asarray(self.bedrooms) / np.sum(self.bedrooms)
+        quality = np.asarray(self.quality) / np.sum(self.quality)
+        deciles = np.asarray(self.year_built_deciles)
+        return HousingMarket.from_arrays(
+            ids=np.arange(size),
+            prices=np.round(prices),
+            areas=np.round(areas),
+            bedrooms=rng.choice(bedrooms.size, size, p=bedrooms),
+            year_built=np.round(np.interp(rng.uniform(0, 1, size), np.linspace(0, 1, deciles.size), deciles)),
+            quality=rng.choice(quality.size, size, p=quality),
+        )
+
+# Shape of the cleaned files/train.csv (Ames, 1460 houses)
+AMES_SHAPE = MarketShape(
+    log_mean=(12.0241, 7.2678),
+    log_covariance=((0.15956, 0.0973), (0.0973, 0.11126)),
+    bedrooms=(6, 50, 358, 804, 213, 21, 7, 0, 1),
+    quality=(0, 25, 513, 693, 211, 18),
+    year_built_deciles=(1872.0, 1924.9, 1947.8, 1958.0, 1965.0, 1973.0, 1984.0, 1997.3, 2003.0, 2006.0, 2010.0),
+)
+
+# Houses per neighborhood of files/train.csv
+AMES_NEIGHBORHOODS = {
+    'Blmngtn': 17, 'Blueste': 2, 'BrDale': 16, 'BrkSide': 58, 'ClearCr': 28, 'CollgCr': 150, 'Crawfor': 51,
+    'Edwards': 100, 'Gilbert': 79, 'IDOTRR': 37, 'MeadowV': 17, 'Mitchel': 49, 'NAmes': 225, 'NPkVill': 9,
+    'NWAmes': 73, 'NoRidge': 41, 'NridgHt': 77, 'OldTown': 113, 'SWISU': 25, 'Sawyer': 74, 'SawyerW': 59,
+    'Somerst': 86, 'StoneBr': 25, 'Timber': 38, 'Veenker': 11,
+}
+
+def generate_neighborhoods(size: int, weights: Dict[str, float] = AMES_NEIGHBORHOODS,
+                           seed: Optional[int] = None) -> np.ndarray:
+    """Neighborhood names of `size` synthetic houses, drawn in proportion to `weights`."""
+    names = np.array(list(weights))
+    probabilities = np.array(list(weights.values()), dtype=np.float64)
+    return names[np.random.default_rng(seed).choice(names.size, size, p=probabilities / probabilities.sum())]
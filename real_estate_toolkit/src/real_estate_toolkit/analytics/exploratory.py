@@ -1,41 +1,86 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
 import polars as pl
+import polars.selectors as cs
 import plotly.express as px
 import plotly.graph_objects as go
 import os
+from ..data.cache import DatasetCache, scan_csv_cached
+
+SCATTER_COLUMNS = ['SalePrice', 'GrLivArea', 'YearBuilt', 'OverallQual']
 
 class MarketAnalyzer:
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, cache: Optional[DatasetCache] = None,
+                 output_dir: str = 'src/real_estate_toolkit/analytics/outputs'):
         """
-        Initialize the analyzer with data from a CSV file.
+        Initialize the analyzer on a lazy scan of a CSV file (through the cache, if given).
+        Nothing is read until an analysis runs, and each analysis only reads the columns it uses.
         """
-        self.real_state_data = pl.read_csv(data_path)
-        self.real_state_clean_data = None
+        self.real_state_data = scan_csv_cached(data_path, cache, null_values="NA", infer_schema_length=10000)
+        self.real_state_clean_data: Optional[pl.LazyFrame] = None
+        self.output_dir = output_dir
+        self._results: Dict[str, pl.DataFrame] = {}  # Collected queries, shared by the analyses
 
     def clean_data(self) -> None:
         """
         Perform comprehensive data cleaning.
         """
-        # Handling missing values and converting data types
-        self.real_state_clean_data = self.real_state_data.fill_none("mean")  # Example strategy
+        # Missing numeric values are filled with the column mean; lazily, so only used columns are filled
+        self.real_state_clean_data = self.real_state_data.with_columns(cs.numeric().fill_null(strategy="mean"))
+        self._results.clear()
+
+    def _queries(self, variables: Sequence[str] = ()) -> Dict[str, pl.LazyFrame]:
+        """The lazy queries behind the analyses, by name."""
+        data = self.real_state_clean_data
+        price = pl.col('SalePrice')
+        queries = {
+            'price_stats': data.select([
+                price.mean().alias('Mean'),
+                price.median().alias('Median'),
+                price.std().alias('StdDev'),
+                price.min().alias('Min'),
+                price.max().alias('Max'),
+            ]),
+            'sale_prices': data.select('SalePrice'),
+            'neighborhood_stats': data.group_by('Neighborhood').agg(
+                price.median().alias('MedianPrice'),
+            ).sort('MedianPrice', descending=True),
+            'neighborhood_prices': data.select(['Neighborhood', 'SalePrice']),
+            'scatter': data.select(SCATTER_COLUMNS),
+        }
+        if variables:
+            queries[f"correlation:{','.join(variables)}"] = data.select(list(variables))
+        return queries
+
+    def collect(self, names: Optional[Sequence[str]] = None, variables: Sequence[str] = ()) -> None:
+        """
+        Run the named queries not run yet (all of them, with the correlation one for `variables`,
+        by default) in one pl.collect_all, which scans the file once for all of them.
+        """
+        queries = self._queries(variables)
+        names = queries if names is None else names
+        pending = {name: queries[name] for name in names if name not in self._results}
+        if pending:
+            self._results.update(zip(pending, pl.collect_all(list(pending.values()))))
+
+    def _result(self, *names: str, variables: Sequence[str] = ()) -> List[pl.DataFrame]:
+        """Results of the queries an analysis needs, collecting only those."""
+        self.collect(names, variables)
+        return [self._results[name] for name in names]
+
+    def _write(self, fig: go.Figure, name: str) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        fig.write_html(os.path.join(self.output_dir, f'{name}.html'))
 
     def generate_price_distribution_analysis(self) -> pl.DataFrame:
         """
         Analyze sale price distribution using clean data.
         """
         # Compute price statistics
-        price_stats = self.real_state_clean_data.select([
-            pl.col('SalePrice').mean().alias('Mean'),
-            pl.col('SalePrice').median().alias('Median'),
-            pl.col('SalePrice').std().alias('StdDev'),
-            pl.col('SalePrice').min().alias('Min'),
-            pl.col('SalePrice').max().alias('Max')
-        ])
+        price_stats, sale_prices = self._result('price_stats', 'sale_prices')
         # Create a histogram
-        fig = px.histogram(self.real_state_clean_data.to_pandas(), x='SalePrice')
+        fig = px.histogram(sale_prices.to_pandas(), x='SalePrice')
         fig.update_layout(title='Distribution of Sale Prices')
-        output_path = 'src/real_estate_toolkit/analytics/outputs/sale_price_distribution.html'
-        fig.write_html(output_path)
+        self._write(fig, 'sale_price_distribution')
         return price_stats
 
     def neighborhood_price_comparison(self) -> pl.DataFrame:
@@ -43,17 +88,14 @@ class MarketAnalyzer:
         Create a boxplot comparing house prices across different neighborhoods.
         """
         # Group by neighborhood and calculate statistics
-        neighborhood_stats = self.real_state_clean_data.groupby('Neighborhood').agg([
-            pl.col('SalePrice').median().alias('MedianPrice'),
-            pl.col('SalePrice').list().alias('Prices')
-        ]).sort('MedianPrice', reverse=True)
-
-        # Plotting
-        df = neighborhood_stats.to_pandas()
-        fig = px.box(df, y='Prices', x='Neighborhood', labels={'Prices': 'Sale Price', 'Neighborhood': 'Neighborhood'})
+        neighborhood_stats, neighborhood_prices = self._result('neighborhood_stats', 'neighborhood_prices')
+
+        # Plotting, neighborhoods by decreasing median price
+        fig = px.box(neighborhood_prices.to_pandas(), y='SalePrice', x='Neighborhood',
+                     category_orders={'Neighborhood': neighborhood_stats['Neighborhood'].to_list()},
+                     labels={'SalePrice': 'Sale Price', 'Neighborhood': 'Neighborhood'})
         fig.update_layout(title='Neighborhood Price Comparison')
-        output_path = 'src/real_estate_toolkit/analytics/outputs/neighborhood_price_comparison.html'
-        fig.write_html(output_path)
+        self._write(fig, 'neighborhood_price_comparison')
         return neighborhood_stats
 
     def feature_correlation_heatmap(self, variables: List[str]) -> None:
@@ -61,40 +103,38 @@ class MarketAnalyzer:
         Generate a correlation heatmap for selected variables.
         """
         # Compute correlation matrix
-        data = self.real_state_clean_data.select(variables).to_pandas()
-        corr_matrix = data.corr()
+        [correlation] = self._result(f"correlation:{','.join(variables)}", variables=variables)
+        corr_matrix = correlation.corr().to_numpy()
         fig = px.imshow(corr_matrix, text_auto=True, aspect="auto",
                         labels=dict(x="Variable", y="Variable", color="Correlation"),
                         x=variables, y=variables)
         fig.update_layout(title='Feature Correlation Heatmap')
-        output_path = 'src/real_estate_toolkit/analytics/outputs/correlation_heatmap.html'
-        fig.write_html(output_path)
+        self._write(fig, 'correlation_heatmap')
 
     def create_scatter_plots(self) -> Dict[str, go.Figure]:
         """
         Create scatter plots exploring relationships between key features.
         """
         plots = {}
+        [scatter] = self._result('scatter')
+        data = scatter.to_pandas()  # The four plotted columns, converted once
         # House price vs. Total square footage
-        fig1 = px.scatter(self.real_state_clean_data.to_pandas(), x='GrLivArea', y='SalePrice', trendline="ols",
+        fig1 = px.scatter(data, x='GrLivArea', y='SalePrice', trendline="ols",
                           labels={'GrLivArea': 'Total Living Area (sq ft)', 'SalePrice': 'Sale Price'})
         plots['price_vs_sqft'] = fig1
 
         # Sale price vs. Year built
-        fig2 = px.scatter(self.real_state_clean_data.to_pandas(), x='YearBuilt', y='SalePrice', trendline="ols",
+        fig2 = px.scatter(data, x='YearBuilt', y='SalePrice', trendline="ols",
                           labels={'YearBuilt': 'Year Built', 'SalePrice': 'Sale Price'})
         plots['price_vs_yearbuilt'] = fig2
 
         # Overall quality vs. Sale price
-        fig3 = px.scatter(self.real_state_clean_data.to_pandas(), x='OverallQual', y='SalePrice', trendline="ols",
+        fig3 = px.scatter(data, x='OverallQual', y='SalePrice', trendline="ols",
                           labels={'OverallQual': 'Overall Quality', 'SalePrice': 'Sale Price'})
         plots['quality_vs_price'] = fig3
 
         # Saving plots
         for key, fig in plots.items():
-            output_path = f'src/real_estate_toolkit/analytics/outputs/{key}.html'
-            fig.write_html(output_path)
+            self._write(fig, key)
 
         return plots
-
-
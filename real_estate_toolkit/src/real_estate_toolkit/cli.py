@@ -0,0 +1,155 @@
+"Command line entry point: real-estate-toolkit {load,describe,simulate,analyze,predict}"
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Each subcommand imports its own subsystem, so e.g. `simulate` never loads pandas, polars,
+# plotly or scikit-learn.
+
+def _cache(args: argparse.Namespace):
+    if args.cache_dir is None:
+        return None
+    from .data.cache import DatasetCache
+    return DatasetCache(Path(args.cache_dir))
+
+def _read_table(args: argparse.Namespace):
+    """Read and clean a CSV file with the streaming reader (no pandas needed)."""
+    from .data.cleaner import Cleaner
+    from .data.loader import DataLoader
+    from .data.table import Table
+    table = Table.concat(DataLoader(Path(args.path)).iter_batches())
+    return Cleaner(table).clean()
+
+def run_load(args: argparse.Namespace) -> int:
+    from .data.loader import DataLoader
+    loader = DataLoader(Path(args.path), cache=_cache(args))
+    table = loader.load_table(compact=args.compact)
+    print(json.dumps({
+        "rows": len(table),
+        "columns": len(table.column_names),
+        "nbytes": table.nbytes,
+        "schema": loader.schema,
+    }, indent=2))
+    return 0
+
+def run_describe(args: argparse.Namespace) -> int:
+    from .data.cleaner import Cleaner
+    from .data.descriptor import Descriptor
+    from .data.loader import DataLoader
+    table = Cleaner(DataLoader(Path(args.path), cache=_cache(args)).load_table(compact=args.compact)).clean()
+    summary = Descriptor(table).describe(columns=args.columns or "all", workers=args.workers)
+    print(json.dumps(summary, indent=2, default=str))
+    return 0
+
+def run_simulate(args: argparse.Namespace) -> int:
+    from .agent_based_model.instrumentation import NULL_INSTRUMENTATION, Instrumentation
+    from .agent_based_model.simulation import (
+        AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+    )
+    instrumentation = Instrumentation() if args.profile else NULL_INSTRUMENTATION
+    simulation = Simulation(
+        housing_market_data=_read_table(args),
+        consumers_number=args.consumers,
+        years=args.years,
+        annual_income=AnnualIncomeStatistics(
+            minimum=args.income_min,
+            average=args.income_mean,
+            standard_deviation=args.income_std,
+            maximum=args.income_max,
+        ),
+        children_range=ChildrenRange(minimum=0, maximum=args.max_children),
+        cleaning_market_mechanism=CleaningMarketMechanism[args.mechanism],
+        down_payment_percentage=args.down_payment,
+        saving_rate=args.saving_rate,
+        interest_rate=args.interest_rate,
+        instrumentation=instrumentation,
+    )
+    simulation.create_housing_market()
+    simulation.create_consumers()
+    simulation.compute_consumers_savings()
+    simulation.clean_the_market()
+    print(json.dumps({
+        "owners_population_rate": simulation.compute_owners_population_rate(),
+        "houses_availability_rate": simulation.compute_houses_availability_rate(),
+    }, indent=2))
+    if args.profile:
+        if args.profile.endswith(".csv"):
+            instrumentation.to_csv(args.profile)
+        else:
+            instrumentation.to_json(args.profile)
+    return 0
+
+def run_analyze(args: argparse.Namespace) -> int:
+    from .analytics.exploratory import MarketAnalyzer
+    analyzer = MarketAnalyzer(data_path=args.path, cache=_cache(args))
+    analyzer.clean_data()
+    print(analyzer.generate_price_distribution_analysis())
+    print(analyzer.neighborhood_price_comparison())
+    analyzer.feature_correlation_heatmap(args.variables)
+    analyzer.create_scatter_plots()
+    return 0
+
+def run_predict(args: argparse.Namespace) -> int:
+    from .ml_models.predictor import HousePricePredictor
+    predictor = HousePricePredictor(train_data_path=args.train, test_data_path=args.test, cache=_cache(args))
+    predictor.clean_data()
+    results = predictor.train_baseline_models()
+    print(json.dumps({name: result["metrics"] for name, result in results.items()}, indent=2, default=float))
+    predictor.forecast_sales_price(model_type=args.model)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="real-estate-toolkit", description="Real estate data toolkit.")
+    parser.add_argument("--cache-dir", default=None, help="Cache parsed datasets in this directory.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load = subparsers.add_parser("load", help="Load a CSV file and report its size and schema.")
+    load.add_argument("path")
+    load.add_argument("--compact", action="store_true", help="Use compact dtypes.")
+    load.set_defaults(run=run_load)
+
+    describe = subparsers.add_parser("describe", help="Print descriptive statistics of a CSV file as JSON.")
+    describe.add_argument("path")
+    describe.add_argument("--columns", nargs="+", help="Cleaned column names (default: all).")
+    describe.add_argument("--workers", type=int, default=None, help="Spread the scan over processes.")
+    describe.add_argument("--compact", action="store_true", help="Use compact dtypes.")
+    describe.set_defaults(run=run_describe)
+
+    simulate = subparsers.add_parser("simulate", help="Run the agent-based housing market simulation.")
+    simulate.add_argument("path")
+    simulate.add_argument("--consumers", type=int, default=100)
+    simulate.add_argument("--years", type=int, default=5)
+    simulate.add_argument("--income-min", type=float, default=30000.0)
+    simulate.add_argument("--income-mean", type=float, default=60000.0)
+    simulate.add_argument("--income-std", type=float, default=20000.0)
+    simulate.add_argument("--income-max", type=float, default=150000.0)
+    simulate.add_argument("--max-children", type=int, default=5)
+    simulate.add_argument("--mechanism", default="RANDOM",
+                          choices=["RANDOM", "INCOME_ORDER_DESCENDANT", "INCOME_ORDER_ASCENDANT"])
+    simulate.add_argument("--down-payment", type=float, default=0.2)
+    simulate.add_argument("--saving-rate", type=float, default=0.3)
+    simulate.add_argument("--interest-rate", type=float, default=0.05)
+    simulate.add_argument("--profile", metavar="PATH",
+                          help="Write phase timers and counters to PATH (CSV if it ends in .csv, JSON otherwise).")
+    simulate.set_defaults(run=run_simulate)
+
+    analyze = subparsers.add_parser("analyze", help="Run the exploratory market analysis and write the plots.")
+    analyze.add_argument("path")
+    analyze.add_argument("--variables", nargs="+", default=["SalePrice", "GrLivArea", "YearBuilt", "OverallQual"])
+    analyze.set_defaults(run=run_analyze)
+
+    predict = subparsers.add_parser("predict", help="Train the price models and write a submission file.")
+    predict.add_argument("train")
+    predict.add_argument("test")
+    predict.add_argument("--model", default="Linear Regression")
+    predict.set_defaults(run=run_predict)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+from .table import Column, Table
+
+def default_cache_dir() -> Path:
+    """Cache location: $REAL_ESTATE_TOOLKIT_CACHE, or ~/.cache/real_estate_toolkit."""
+    return Path(os.environ.get("REAL_ESTATE_TOOLKIT_CACHE", Path.home() / ".cache" / "real_estate_toolkit"))
+
+def content_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """BLAKE2b digest of a file's bytes, read in chunks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@dataclass
+class DatasetCache:
+    """
+    On-disk cache of parsed datasets. An entry is keyed by the source path and parse options,
+    and is valid while the source size, mtime and content hash match; a changed mtime alone
+    triggers a re-hash, so touched but unchanged files still hit. Tables are stored as one
+    .npy file per column (values and null mask) and memory-mapped on load; polars frames are
+    stored as uncompressed Arrow IPC. Least recently used entries are evicted above `max_bytes`.
+    """
+    cache_dir: Path = field(default_factory=default_cache_dir)
+    max_bytes: int = 2 * 1024 ** 3
+
+    MANIFEST = "manifest.json"
+
+    def _entry_dir(self, source: Path, kind: str) -> Path:
+        key = hashlib.blake2b(f"{kind}:{Path(source).resolve()}".encode(), digest_size=16).hexdigest()
+        return Path(self.cache_dir) / key
+
+    def _lookup(self, source: Path, kind: str) -> Optional[Path]:
+        """Return the entry directory if it holds an up-to-date copy of `source`."""
+        entry = self._entry_dir(source, kind)
+        manifest_path = entry / self.MANIFEST
+        try:
+            manifest = json.loads(manifest_path.read_text())
+            stat = Path(source).stat()
+        except (OSError, ValueError):
+            return None
+        if manifest["size"] != stat.st_size:
+            return None
+        if manifest["mtime_ns"] != stat.st_mtime_ns:
+            if content_hash(source) != manifest["digest"]:
+                return None
+            manifest["mtime_ns"] = stat.st_mtime_ns  # Same bytes, only touched
+        manifest["last_access"] = time.time()
+        manifest_path.write_text(json.dumps(manifest))
+        return entry
+
+    def _store(self, source: Path, kind: str, write, extra: Dict[str, Any]) -> Path:
+        """Write an entry into a temporary directory with `write(directory)`, then swap it in."""
+        entry = self._entry_dir(source, kind)
+        staging = entry.with_name(entry.name + f".tmp{os.getpid()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        stat = Path(source).stat()
+        write(staging)
+        manifest = {
+            "source": str(Path(source).resolve()),
+            "kind": kind,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": content_hash(source),
+            "nbytes": sum(path.stat().st_size for path in staging.iterdir()),
+            "last_access": time.time(),
+            **extra,
+        }
+        (staging / self.MANIFEST).write_text(json.dumps(manifest))
+        shutil.rmtree(entry, ignore_errors=True)
+        staging.rename(entry)
+        self.evict(keep=entry)
+        return entry
+
+    def load_table(self, source: Path, options: str = "") -> Optional[Table]:
+        """Return the cached Table of `source` with memory-mapped columns, or None on a miss."""
+        entry = self._lookup(source, f"table{options}")
+        if entry is None:
+            return None
+        manifest = json.loads((entry / self.MANIFEST).read_text())
+        columns = {}
+        for index, name in enumerate(manifest["columns"]):
+            values = np.load(entry / f"{index}.values.npy", mmap_mode="r")
+            mask = np.load(entry / f"{index}.mask.npy", mmap_mode="r")
+            categories = None
+            if index in manifest["categorical"]:
+                categories = np.load(entry / f"{index}.categories.npy", mmap_mode="r")
+            columns[name] = Column(values=values, mask=mask, categories=categories)
+        return Table(columns)
+
+    def store_table(self, source: Path, table: Table, options: str = "") -> None:
+        """
+        Cache a parsed Table of `source`; string columns and labels are stored as
+        fixed-width unicode, dictionary-encoded columns keep their integer codes.
+        """
+        categorical = [index for index, column in enumerate(table.columns.values()) if column.is_categorical]
+
+        def write(directory: Path) -> None:
+            for index, column in enumerate(table.columns.values()):
+                values = column.values
+                if values.dtype == object:
+                    values = np.where(column.mask, "", values).astype(str)
+                np.save(directory / f"{index}.values.npy", values)
+                np.save(directory / f"{index}.mask.npy", np.asarray(column.mask, dtype=bool))
+                if column.is_categorical:
+                    np.save(directory / f"{index}.categories.npy", column.categories.astype(str))
+        self._store(source, f"table{options}", write, {"columns": table.column_names, "categorical": categorical})
+
+    def frame_path(self, source: Path, options: str = "") -> Optional[Path]:
+        """Path of the cached Arrow IPC copy of `source`, or None on a miss."""
+        entry = self._lookup(source, f"frame{options}")
+        return None if entry is None else entry / "frame.arrow"
+
+    def load_frame(self, source: Path, options: str = ""):
+        """Return the cached polars DataFrame of `source` (memory-mapped IPC), or None on a miss."""
+        path = self.frame_path(source, options)
+        if path is None:
+            return None
+        import polars as pl
+        return pl.read_ipc(path)  # Uncompressed IPC is memory-mapped by polars
+
+    def store_frame(self, source: Path, frame, options: str = "") -> None:
+        """Cache a polars DataFrame parsed from `source` with the given parse options."""
+        self._store(source, f"frame{options}",
+                    lambda directory: frame.write_ipc(directory / "frame.arrow", compression="uncompressed"), {})
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Manifests of all cache entries, with their directory under 'path'."""
+        manifests = []
+        if not Path(self.cache_dir).is_dir():
+            return manifests
+        for entry in Path(self.cache_dir).iterdir():
+            try:
+                manifest = json.loads((entry / self.MANIFEST).read_text())
+            except (OSError, ValueError):
+                continue
+            manifest["path"] = entry
+            manifests.append(manifest)
+        return manifests
+
+    def size(self) -> int:
+        """Total bytes held by the cache."""
+        return sum(manifest["nbytes"] for manifest in self.entries())
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """Drop least recently used entries until the cache fits in `max_bytes`."""
+        entries = sorted(self.entries(), key=lambda manifest: manifest["last_access"])
+        total = sum(manifest["nbytes"] for manifest in entries)
+        for manifest in entries:
+            if total <= self.max_bytes:
+                break
+            if manifest["path"] == keep:
+                continue
+            shutil.rmtree(manifest["path"], ignore_errors=True)
+            total -= manifest["nbytes"]
+
+    def invalidate(self, source: Optional[Path] = None) -> None:
+        """Drop every cached entry of `source`, or the whole cache when no source is given."""
+        if source is None:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            return
+        resolved = str(Path(source).resolve())
+        for manifest in self.entries():
+            if manifest["source"] == resolved:
+                shutil.rmtree(manifest["path"], ignore_errors=True)
+
+def read_csv_cached(path, cache: Optional[DatasetCache] = None, **read_options):
+    """pl.read_csv through the cache: warm runs open the cached Arrow IPC copy instead of parsing."""
+    import polars as pl
+    if cache is None:
+        return pl.read_csv(path, **read_options)
+    options = json.dumps(read_options, sort_keys=True, default=str) if read_options else ""
+    frame = cache.load_frame(Path(path), options)
+    if frame is None:
+        frame = pl.read_csv(path, **read_options)
+        cache.store_frame(Path(path), frame, options)
+    return frame
+
+def scan_csv_cached(path, cache: Optional[DatasetCache] = None, **scan_options):
+    """
+    pl.scan_csv through the cache: warm runs scan the cached Arrow IPC copy instead of the CSV,
+    so either way queries on the LazyFrame only read the columns they use.
+    """
+    import polars as pl
+    if cache is None:
+        return pl.scan_csv(path, **scan_options)
+    options = "scan" + json.dumps(scan_options, sort_keys=True, default=str)
+    frame_path = cache.frame_path(Path(path), options)
+    if frame_path is None:
+        cache.store_frame(Path(path), pl.scan_csv(path, **scan_options).collect(), options)
+        frame_path = cache.frame_path(Path(path), options)
+    return pl.scan_ipc(frame_path)
@@ -1,32 +1,185 @@
 import re  # Import regular expression library for text manipulation
-from dataclasses import dataclass
-from typing import Dict, List, Any
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
+import numpy as np
+from .table import Column, Table
+
+@lru_cache(maxsize=None)
+def to_snake_case(name: str) -> str:
+    """Convert a column name to snake_case; cached so each name is only converted once."""
+    new_name = re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()  # Add underscore before uppercase letters not at the start
+    return new_name.replace(' ', '_')  # Replace spaces with underscores
+
+@dataclass
+class CleaningStep:
+    """
+    A value transformation fused into the Cleaner's single pass over the data.
+    `columns` restricts the step to some (cleaned) column names; None means all columns.
+    """
+    columns: Optional[Sequence[str]] = None
+
+    def __call__(self, value: Any) -> Any:
+        return value
+
+    def applies_to(self, column: str) -> bool:
+        return self.columns is None or column in self.columns
+
+    def apply_column(self, column: Column) -> Column:
+        """Apply the step to a Table column; steps override this with a vectorized version."""
+        return Column.from_values([self(value) for value in column.to_list()])
+
+@dataclass
+class NaToNone(CleaningStep):
+    """Replace the 'NA' string with None."""
+
+    def __call__(self, value: Any) -> Any:
+        return None if value == 'NA' else value
+
+    def apply_column(self, column: Column) -> Column:
+        if column.is_numeric:
+            return column
+        if column.is_categorical:
+            # Only the labels need checking; rows whose code points at 'NA' become missing
+            hits = np.flatnonzero(column.categories == 'NA')
+            return Column(values=column.values, mask=column.mask | np.isin(column.values, hits),
+                          categories=column.categories)
+        return Column(values=column.values, mask=column.mask | (column.values == 'NA'))
+
+@dataclass
+class StripStrings(CleaningStep):
+    """Trim surrounding whitespace from string values."""
+
+    def __call__(self, value: Any) -> Any:
+        return value.strip() if isinstance(value, str) else value
+
+    def apply_column(self, column: Column) -> Column:
+        if column.is_numeric:
+            return column
+        if column.is_categorical:
+            # Strip the labels, then merge labels that became equal
+            labels, inverse = np.unique(np.char.strip(column.categories.astype(str)), return_inverse=True)
+            codes = inverse.astype(np.min_scalar_type(max(len(labels) - 1, 0)))[column.values]
+            return Column(values=codes, mask=column.mask, categories=labels)
+        return super().apply_column(column)
+
+@dataclass
+class SentinelToNone(CleaningStep):
+    """Replace sentinel values (e.g. 0 or -1 used as "unknown") with None."""
+    sentinels: Tuple[Any, ...] = ()
+
+    def __call__(self, value: Any) -> Any:
+        return None if value in self.sentinels else value
+
+    def apply_column(self, column: Column) -> Column:
+        sentinels = [s for s in self.sentinels if isinstance(s, (int, float)) and not isinstance(s, bool)] \
+            if column.is_numeric else list(self.sentinels)
+        mask = column.mask.copy()
+        if column.is_categorical:
+            hits = np.flatnonzero(np.isin(column.categories, [str(s) for s in sentinels]))
+            mask |= np.isin(column.values, hits)
+            return Column(values=column.values, mask=mask, categories=column.categories)
+        for sentinel in sentinels:
+            mask |= column.values == sentinel
+        return Column(values=column.values, mask=mask)
+
+@dataclass
+class CoerceNumeric(CleaningStep):
+    """Convert strings holding numbers into int or float values."""
+
+    def __call__(self, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        for number_type in (int, float):
+            try:
+                return number_type(value)
+            except ValueError:
+                continue
+        return value
+
+    def apply_column(self, column: Column) -> Column:
+        if column.is_numeric:
+            return column
+        parsed = Column.from_strings([str(value) for value in column.valid()])
+        if not parsed.is_numeric or parsed.mask.any():
+            # Some value is not a number, or is a null token that __call__ keeps as a string
+            return super().apply_column(column)
+        values = np.zeros(len(column), dtype=parsed.values.dtype)
+        values[~column.mask] = parsed.values
+        return Column(values=values, mask=column.mask.copy())
 
 @dataclass
 class Cleaner:
-    """Class for cleaning real estate data."""
-    data: List[Dict[str, Any]]
+    """Class for cleaning real estate data, given as a list of dictionaries or a Table."""
+    data: Union[List[Dict[str, Any]], Table]
+    steps: List[CleaningStep] = field(default_factory=list)  # Extra steps run by `clean`
+
+    def add_step(self, step: CleaningStep) -> "Cleaner":
+        """Register an extra step to be fused into the cleaning pass."""
+        self.steps.append(step)
+        return self
+
+    def rename_map(self) -> Dict[str, str]:
+        """Compile the old name -> snake_case name mapping once for all rows."""
+        if not self.data:
+            return {}
+        keys = self.data.column_names if isinstance(self.data, Table) else self.data[0].keys()
+        return {key: to_snake_case(key) for key in keys}
+
+    def clean(self) -> Union[List[Dict[str, Any]], Table]:
+        """
+        Rename the columns, replace 'NA' with None and run the extra steps in a single pass.
+        Rows are rewritten in place in the data list; Table columns are updated without copying rows.
+        """
+        return self._run(rename=True, na=True, steps=self.steps)
 
     def rename_with_best_practices(self) -> None:
         """ Rename the columns with best practices """
-        if not self.data:
-            return
-        
-        old_new_names = {}
-        for key in self.data[0].keys():
-            # Convert to snake_case
-            new_key = re.sub(r'(?<!^)(?=[A-Z])', '_', key).lower()  # Add underscore before uppercase letters not at the start
-            new_key = new_key.replace(' ', '_')  # Replace spaces with underscores
-            old_new_names[key] = new_key
-
-        for row in self.data:
-            for old_key, new_key in old_new_names.items():
-                row[new_key] = row.pop(old_key)
-
-    def na_to_none(self) -> List[Dict[str, Any]]:
+        self._run(rename=True, na=False, steps=[])
+
+    def na_to_none(self) -> Union[List[Dict[str, Any]], Table]:
         """
         Replace 'NA' with None in all values with 'NA' in the dictionary.
-        Returns a new list of dictionaries with the modifications.
+        The rows are updated in place, and the cleaned data is returned.
         """
-        return [{k: (None if v == 'NA' else v) for k, v in row.items()} for row in self.data]
+        return self._run(rename=False, na=True, steps=[])
+
+    def _run(self, rename: bool, na: bool, steps: List[CleaningStep]) -> Union[List[Dict[str, Any]], Table]:
+        if not self.data:
+            return self.data
+        names = self.rename_map() if rename else {}
+        if isinstance(self.data, Table):
+            self.data.rename(names)  # Columnar data only needs the column index renamed
+            steps = [NaToNone(), *steps] if na else steps
+            for name, column in self.data.columns.items():
+                for step in steps:
+                    if step.applies_to(name):
+                        column = step.apply_column(column)
+                self.data.columns[name] = column
+            return self.data
+
+        if not steps:
+            # Fast path: renaming and the 'NA' check fit in one comprehension per row
+            for index, row in enumerate(self.data):
+                if na:
+                    self.data[index] = {names.get(k, k): (None if v == 'NA' else v) for k, v in row.items()}
+                else:
+                    self.data[index] = {names.get(k, k): v for k, v in row.items()}
+            return self.data
 
+        # Each key maps to its new name and the steps that apply to it, resolved once per column
+        plan: Dict[str, Tuple[str, Tuple[CleaningStep, ...]]] = {}
+        for index, row in enumerate(self.data):
+            cleaned = {}
+            for key, value in row.items():
+                if key not in plan:
+                    new_key = names.get(key, key)
+                    plan[key] = (new_key, tuple(step for step in steps if step.applies_to(new_key)))
+                new_key, column_steps = plan[key]
+                if na and value == 'NA':
+                    value = None
+                for step in column_steps:
+                    value = step(value)
+                cleaned[new_key] = value
+            self.data[index] = cleaned
+        return self.data
@@ -1,65 +1,123 @@
+import json
 import statistics
-from dataclasses import dataclass
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Dict, List, Tuple, Any, Union, Optional
 import numpy as np
+from .parallel import parallel_stats
+from .stats import ColumnStats, collect_stats, record_batches, select_quantile
+from .table import Column, Table, as_table, is_null
 
 @dataclass
 class Descriptor:
-    """Class for summarizing and describing real estate data."""
-    data: List[Dict[str, Any]]
+    """Class for summarizing and describing real estate data, given as a list of dictionaries or a Table."""
+    data: Union[List[Dict[str, Any]], Table]
 
-    def none_ratio(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
-        """Compute the ratio of None values per column."""
+    def _columns(self) -> List[str]:
+        """All column names of the data."""
+        if isinstance(self.data, Table):
+            return self.data.column_names
+        return list(self.data[0].keys())
+
+    def _numeric_columns(self) -> List[str]:
+        """Columns holding numeric values (judged on the first row for row data)."""
+        if isinstance(self.data, Table):
+            return [name for name, column in self.data.columns.items() if column.is_numeric]
+        return [col for col in self.data[0].keys() if isinstance(self.data[0][col], (int, float, type(None)))]
+
+    def _values(self, column: str) -> List[Any]:
+        """Non-missing values of a column (None, and the NaN pandas uses for empty cells, are missing)."""
+        if isinstance(self.data, Table):
+            return self.data[column].valid().tolist()
+        return [row[column] for row in self.data if not is_null(row[column])]
+
+    def _numeric_values(self, column: str) -> List[Any]:
+        """Non-missing numeric values of a column."""
+        return [value for value in self._values(column) if isinstance(value, (int, float))]
+
+    def _check_columns(self, columns: List[str]) -> None:
+        for column in columns:
+            if column not in self._columns():
+                raise ValueError(f"Column {column} does not exist in the data.")
+
+    def _aggregates(self, columns: List[str], workers: int) -> "IncrementalDescriptor":
+        """The columns aggregated on `workers` processes, read as the aggregates of an IncrementalDescriptor."""
+        self._check_columns(columns)
+        return IncrementalDescriptor(parallel_stats(as_table(self.data), columns, workers))
+
+    def none_ratio(self, columns: Union[List[str], str] = "all", workers: Optional[int] = None) -> Dict[str, float]:
+        """
+        Compute the ratio of None (or NaN) values per column. With `workers`, this and the other
+        per-metric methods aggregate the columns on that many processes, as describe does.
+        """
         if columns == "all":
-            columns = self.data[0].keys()
+            columns = self._columns()
+        if workers is not None:
+            return self._aggregates(columns, workers).none_ratio(columns)
         none_ratios = {}
         for column in columns:
-            if column not in self.data[0]:
+            if column not in self._columns():
                 raise ValueError(f"Column {column} does not exist in the data.")
-            total = sum(1 for row in self.data if row.get(column) is None)
+            if isinstance(self.data, Table):
+                total = int(np.count_nonzero(self.data[column].mask))
+            else:
+                total = sum(1 for row in self.data if is_null(row.get(column)))
             none_ratios[column] = total / len(self.data)
         return none_ratios
 
-    def average(self, columns: Union[List[str], str] = "all"):
+    def average(self, columns: Union[List[str], str] = "all", workers: Optional[int] = None):
         """Compute the average value for numeric variables, omit None values."""
         if columns == "all":
-            columns = [col for col in self.data[0].keys() if isinstance(self.data[0][col], (int, float, type(None)))]
+            columns = self._numeric_columns()
+        if workers is not None:
+            return self._aggregates(columns, workers).average(columns)
         averages = {}
         for column in columns:
-            filtered_values = [row[column] for row in self.data if row[column] is not None and isinstance(row[column], (int, float))]
+            filtered_values = self._numeric_values(column)
             if filtered_values:
                 averages[column] = sum(filtered_values) / len(filtered_values)
         return averages
 
-    def median(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+    def median(self, columns: Union[List[str], str] = "all", workers: Optional[int] = None) -> Dict[str, float]:
         """Compute the median value for numeric variables, omit None values."""
         if columns == "all":
-            columns = [col for col in self.data[0].keys() if isinstance(self.data[0][col], (int, float, type(None)))]
+            columns = self._numeric_columns()
+        if workers is not None:
+            return self._aggregates(columns, workers).median(columns)
         medians = {}
         for column in columns:
-            filtered_values = [row[column] for row in self.data if row[column] is not None and isinstance(row[column], (int, float))]
+            filtered_values = self._numeric_values(column)
             if filtered_values:
                 medians[column] = statistics.median(filtered_values)
         return medians
 
-    def percentile(self, columns: Union[List[str], str] = "all", percentile: int = 50) -> Dict[str, float]:
+    def percentile(self, columns: Union[List[str], str] = "all", percentile: int = 50,
+                   workers: Optional[int] = None) -> Dict[str, float]:
         """Compute the percentile value for numeric variables, default is 50% (median)."""
+        if not 1 <= percentile <= 99:
+            raise ValueError("Percentile must be between 1 and 99.")
         if columns == "all":
-            columns = [col for col in self.data[0].keys() if isinstance(self.data[0][col], (int, float, type(None)))]
+            columns = self._numeric_columns()
+        if workers is not None:
+            return self._aggregates(columns, workers).percentile(columns, percentile)
         percentiles = {}
         for column in columns:
-            filtered_values = [row[column] for row in self.data if row[column] is not None and isinstance(row[column], (int, float))]
+            filtered_values = self._numeric_values(column)
             if filtered_values:
-                percentiles[column] = statistics.quantiles(filtered_values, n=100)[percentile-1]
+                percentiles[column] = select_quantile(filtered_values, percentile, 100)
         return percentiles
 
-    def type_and_mode(self, columns: Union[List[str], str] = "all") -> Dict[str, Union[Tuple[str, Any], Tuple[str, str]]]:
+    def type_and_mode(self, columns: Union[List[str], str] = "all",
+                      workers: Optional[int] = None) -> Dict[str, Union[Tuple[str, Any], Tuple[str, str]]]:
         """Compute the mode for variables, including variable type."""
         if columns == "all":
-            columns = self.data[0].keys()
+            columns = self._columns()
+        if workers is not None:
+            return self._aggregates(columns, workers).type_and_mode(columns)
         modes = {}
         for column in columns:
-            column_values = [row[column] for row in self.data if row[column] is not None]
+            column_values = self._values(column)
             if column_values:
                 if all(isinstance(value, (int, float)) for value in column_values):
                     mode_value = statistics.mode(column_values)
@@ -72,74 +130,257 @@ class Descriptor:
                         modes[column] = ('categorical', 'No mode found')
         return modes
 
+    def describe(self, columns: Union[List[str], str] = "all", quantiles: Tuple[float, ...] = (0.25, 0.5, 0.75),
+                 batch_size: int = 10_000, workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute none ratio, count, mean, variance, std, min, max, quantiles and mode
+        for every column in a single scan of the data (None and NaN count as missing).
+        With `workers`, columns and row blocks are spread over that many processes.
+        """
+        if columns == "all":
+            columns = self._columns()
+        self._check_columns(columns)
+        if workers is not None:
+            stats = parallel_stats(as_table(self.data), columns, workers)
+        elif isinstance(self.data, Table):
+            stats = collect_stats([self.data], columns)
+        else:
+            stats = collect_stats(record_batches(self.data, columns, batch_size), columns)
+        return {column: stats[column].result(quantiles) for column in columns}
+
+
+@dataclass
+class IncrementalDescriptor:
+    """
+    Stateful descriptor for data that arrives in batches (e.g. daily sales). Each column keeps
+    partial aggregates (counts, null counts, mean and M2, a quantile sketch and value counts)
+    that are updated with new rows, merged across partitions and serialized, so a refresh only
+    scans the new rows. Results use the same dictionaries as Descriptor.
+    """
+    stats: Dict[str, ColumnStats] = field(default_factory=dict)
+
+    def update(self, data: Union[List[Dict[str, Any]], Table], batch_size: int = 10_000) -> None:
+        """Fold new rows (a list of dictionaries or a Table) into the aggregates."""
+        if not data:
+            return
+        columns = data.column_names if isinstance(data, Table) else list(data[0].keys())
+        batches = [data] if isinstance(data, Table) else record_batches(data, columns, batch_size)
+        for name, column_stats in collect_stats(batches, columns).items():
+            if name in self.stats:
+                self.stats[name].merge(column_stats)
+            else:
+                self.stats[name] = column_stats
+
+    def merge(self, other: "IncrementalDescriptor") -> None:
+        """Fold the aggregates of another partition into this one."""
+        for name, column_stats in other.stats.items():
+            if name in self.stats:
+                self.stats[name].merge(column_stats)
+            else:
+                self.stats[name] = ColumnStats.from_dict(column_stats.to_dict())
+
+    def _select(self, columns: Union[List[str], str], numeric: bool = False) -> List[str]:
+        if columns == "all":
+            return [name for name, column_stats in self.stats.items()
+                    if not numeric or (column_stats.numeric and column_stats.count > 0)]
+        for column in columns:
+            if column not in self.stats:
+                raise ValueError(f"Column {column} does not exist in the data.")
+        return list(columns)
+
+    def none_ratio(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+        """Ratio of missing values per column."""
+        return {column: self.stats[column].result(())['none_ratio'] for column in self._select(columns)}
+
+    def average(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+        """Average of numeric columns, omitting missing values."""
+        return {column: self.stats[column].mean for column in self._select(columns, numeric=True)
+                if self.stats[column].numeric and self.stats[column].count}
+
+    def median(self, columns: Union[List[str], str] = "all") -> Dict[str, float]:
+        """Median of numeric columns (exact until the sketches start compacting)."""
+        return self.percentile(columns, 50)
+
+    def percentile(self, columns: Union[List[str], str] = "all", percentile: int = 50) -> Dict[str, float]:
+        """Percentile of numeric columns, from the quantile sketches."""
+        return {column: self.stats[column].sketch.quantile(percentile / 100)
+                for column in self._select(columns, numeric=True)
+                if self.stats[column].numeric and self.stats[column].count}
+
+    def type_and_mode(self, columns: Union[List[str], str] = "all") -> Dict[str, Tuple[str, Any]]:
+        """Type and mode of each column."""
+        modes = {}
+        for column in self._select(columns):
+            summary = self.stats[column].result(())
+            if summary['count']:
+                modes[column] = (summary['type'], summary['mode'])
+        return modes
+
+    def describe(self, columns: Union[List[str], str] = "all",
+                 quantiles: Tuple[float, ...] = (0.25, 0.5, 0.75)) -> Dict[str, Dict[str, Any]]:
+        """Full summary of each column, as Descriptor.describe."""
+        return {column: self.stats[column].result(quantiles) for column in self._select(columns)}
+
+    def to_bytes(self) -> bytes:
+        """Serialize the aggregates (compressed JSON)."""
+        state = {name: column_stats.to_dict() for name, column_stats in self.stats.items()}
+        return zlib.compress(json.dumps(state).encode())
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "IncrementalDescriptor":
+        state = json.loads(zlib.decompress(payload))
+        return cls({name: ColumnStats.from_dict(column_state) for name, column_state in state.items()})
+
+    def save(self, path: Path) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Path) -> "IncrementalDescriptor":
+        return cls.from_bytes(Path(path).read_bytes())
+
 
 @dataclass
 class DescriptorNumpy:
-    """Class for summarizing and describing real estate data using NumPy."""
-    data: np.ndarray  # Assuming data is a structured NumPy array
+    """
+    Class for summarizing and describing real estate data using NumPy.
+    Accepts a structured NumPy array with NaN for missing values, or loader/cleaner output
+    (a list of dictionaries or a Table), which is converted on creation with categorical
+    columns encoded as integer codes.
+    """
+    data: Union[np.ndarray, List[Dict[str, Any]], Table]
+    categories: Dict[str, np.ndarray] = field(default_factory=dict)  # Labels of the code-encoded columns
+
+    def __post_init__(self):
+        if not isinstance(self.data, np.ndarray):
+            self.data, self.categories = as_table(self.data).to_structured_array()
 
-    def none_ratio(self, columns=None):
-        """Compute the ratio of None (or np.nan for NumPy) values per column."""
+    def _numeric_columns(self, columns) -> List[str]:
+        """Requested (or all) columns that hold numbers rather than category codes."""
         if columns is None:
             columns = self.data.dtype.names
+        return [column for column in columns
+                if column not in self.categories and np.issubdtype(self.data[column].dtype, np.number)]
+
+    def _matrix(self, columns: List[str]) -> np.ndarray:
+        """Stack columns into one (rows, columns) float array for batched reductions."""
+        return np.column_stack([self.data[column].astype(np.float64) for column in columns])
+
+    def _table(self, columns) -> Table:
+        """The columns as a Table, NaN as missing and category codes decoded by their labels."""
+        table = Table({})
+        for column in columns:
+            values = self.data[column].astype(np.float64)
+            mask = np.isnan(values)
+            if column in self.categories:
+                codes = np.where(mask, 0, values).astype(np.int64)
+                table.columns[column] = Column(values=codes, mask=mask, categories=self.categories[column])
+            else:
+                table.columns[column] = Column(values=values, mask=mask)
+        return table
+
+    def _aggregates(self, columns, workers: int) -> IncrementalDescriptor:
+        """The columns aggregated on `workers` processes, read as the aggregates of an IncrementalDescriptor."""
+        return IncrementalDescriptor(parallel_stats(self._table(columns), columns, workers))
+
+    def none_ratio(self, columns=None, workers: Optional[int] = None):
+        """
+        Compute the ratio of None (or np.nan for NumPy) values per column. With `workers`, this
+        and the other per-metric methods aggregate the columns on that many processes, as describe does.
+        """
+        if columns is None:
+            columns = self.data.dtype.names
+        if workers is not None:
+            return self._aggregates(columns, workers).none_ratio(columns)
         none_ratios = {}
         for column in columns:
             column_data = self.data[column]
-            none_count = np.count_nonzero(np.isnan(column_data))
+            none_count = np.count_nonzero(np.isnan(column_data)) if np.issubdtype(column_data.dtype, np.floating) else 0
             total_count = column_data.shape[0]
             none_ratios[column] = none_count / total_count
         return none_ratios
 
-    def average(self, columns=None):
+    def average(self, columns=None, workers: Optional[int] = None):
         """Compute the average value for numeric variables, omit None (np.nan) values."""
-        if columns is None:
-            columns = self.data.dtype.names
-        averages = {}
-        for column in columns:
-            column_data = self.data[column]
-            if np.issubdtype(column_data.dtype, np.number):
-                valid_data = column_data[~np.isnan(column_data)]
-                if valid_data.size > 0:
-                    averages[column] = np.mean(valid_data)
-        return averages
+        columns = self._numeric_columns(columns)
+        if not columns:
+            return {}
+        if workers is not None:
+            return self._aggregates(columns, workers).average(columns)
+        matrix = self._matrix(columns)
+        counts = np.count_nonzero(~np.isnan(matrix), axis=0)
+        sums = np.nansum(matrix, axis=0)
+        return {column: float(total / count) for column, total, count in zip(columns, sums, counts) if count > 0}
 
-    def median(self, columns=None):
+    def median(self, columns=None, workers: Optional[int] = None):
         """Compute the median value for numeric variables, omit None (np.nan) values."""
-        if columns is None:
-            columns = self.data.dtype.names
-        medians = {}
-        for column in columns:
-            column_data = self.data[column]
-            if np.issubdtype(column_data.dtype, np.number):
-                valid_data = column_data[~np.isnan(column_data)]
-                if valid_data.size > 0:
-                    medians[column] = np.median(valid_data)
-        return medians
+        return {column: values[50] for column, values in self.percentiles(columns, (50,), workers).items()}
 
-    def percentile(self, columns=None, percentile=50):
+    def percentile(self, columns=None, percentile=50, workers: Optional[int] = None):
         """Compute the specified percentile value for numeric variables."""
-        if columns is None:
-            columns = self.data.dtype.names
-        percentiles = {}
-        for column in columns:
-            column_data = self.data[column]
-            if np.issubdtype(column_data.dtype, np.number):
-                valid_data = column_data[~np.isnan(column_data)]
-                if valid_data.size > 0:
-                    percentiles[column] = np.percentile(valid_data, percentile)
-        return percentiles
+        return {
+            column: values[percentile] for column, values in self.percentiles(columns, (percentile,), workers).items()
+        }
 
-    def type_and_mode(self, columns=None):
-        """Compute the mode and type for variables."""
+    def percentiles(self, columns=None, percentiles=(25, 50, 75),
+                    workers: Optional[int] = None) -> Dict[str, Dict[float, float]]:
+        """
+        Compute several percentiles for all numeric columns with one np.nanpercentile call.
+        The 'weibull' method is the 'exclusive' method of statistics.quantiles used by Descriptor
+        (and equals the median at 50). With `workers`, they come from the merged quantile
+        sketches, which are exact up to their exact_limit values per column.
+        """
+        columns = self._numeric_columns(columns)
+        if not columns:
+            return {}
+        if workers is not None:
+            aggregates = self._aggregates(columns, workers)
+            return {
+                column: {p: aggregates.stats[column].sketch.quantile(p / 100) for p in percentiles}
+                for column in columns if aggregates.stats[column].count
+            }
+        matrix = self._matrix(columns)
+        has_values = np.any(~np.isnan(matrix), axis=0)
+        if not has_values.all():
+            columns = [column for column, keep in zip(columns, has_values) if keep]
+            matrix = matrix[:, has_values]
+        results = np.nanpercentile(matrix, percentiles, axis=0, method='weibull').reshape(len(percentiles), -1)
+        return {
+            column: {p: float(value) for p, value in zip(percentiles, results[:, index])}
+            for index, column in enumerate(columns)
+        }
+
+    def type_and_mode(self, columns=None, workers: Optional[int] = None):
+        """
+        Compute the mode and type for variables, as ('numeric', value) or ('categorical', label).
+        Ties go to the value that appears first, as with statistics.mode.
+        """
         if columns is None:
             columns = self.data.dtype.names
+        if workers is not None:
+            return self._aggregates(columns, workers).type_and_mode(columns)
         types_and_modes = {}
         for column in columns:
             column_data = self.data[column]
-            if column_data.size > 0:
-                types_and_modes[column] = (column_data.dtype, np.nan if np.isnan(column_data).all() else np.nanmode(column_data))
+            valid = column_data[~np.isnan(column_data)] if np.issubdtype(column_data.dtype, np.floating) else column_data
+            if valid.size == 0:
+                continue
+            values, first_index, counts = np.unique(valid, return_index=True, return_counts=True)
+            candidates = np.flatnonzero(counts == counts.max())
+            mode_value = values[candidates[np.argmin(first_index[candidates])]].item()
+            if column in self.categories:
+                types_and_modes[column] = ('categorical', self.categories[column][int(mode_value)].item())
+            else:
+                types_and_modes[column] = ('numeric', mode_value)
         return types_and_modes
 
-
-
-
+    def describe(self, columns=None, quantiles=(0.25, 0.5, 0.75), workers: Optional[int] = None):
+        """
+        Compute none ratio, count, mean, variance, std, min, max, quantiles and mode per column
+        in one scan, as Descriptor.describe. With `workers`, columns and row blocks are spread
+        over that many processes.
+        """
+        if columns is None:
+            columns = self.data.dtype.names
+        table = self._table(columns)
+        stats = parallel_stats(table, columns, workers) if workers is not None else collect_stats([table], columns)
+        return {column: stats[column].result(quantiles) for column in columns}
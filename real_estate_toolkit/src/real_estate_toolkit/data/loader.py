@@ -1,15 +1,32 @@
-import pandas as pd
+import csv
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
+from .cache import DatasetCache
+from .schema import cast_table, infer_batch_schema, infer_schema, load_schema, pandas_dtypes, save_schema
+from .table import Table
+
+class DataLoadError(ValueError):
+    """Raised when a CSV file cannot be read; `row` is the 1-based data row (0 for the header)."""
+
+    def __init__(self, message: str, path: Path, row: Optional[int] = None, line: Optional[int] = None):
+        location = f" (row {row}, line {line})" if row is not None and line is not None else ""
+        super().__init__(f"{path}{location}: {message}")
+        self.path = path
+        self.row = row
+        self.line = line
 
 @dataclass
 class DataLoader:
     """Class for loading and basic processing of real estate data."""
     data_path: Path
+    cache: Optional[DatasetCache] = None  # When set, parsed tables are cached on disk
+    schema: Optional[Dict[str, str]] = None  # Compact column dtypes, inferred on the first compact load
+    schema_path: Optional[Path] = None  # JSON file the schema is read from and recorded to
 
     def load_data_from_csv(self) -> List[Dict[str, Any]]:
         """Load data from a CSV file into a list of dictionaries."""
+        import pandas as pd
         try:
             df = pd.read_csv(self.data_path)
             return df.to_dict(orient='records')
@@ -17,13 +34,131 @@ class DataLoader:
             print(f"Error loading data: {e}")
             return []
 
-    def validate_columns(self, data: List[Dict[str, Any]], required_columns: List[str]) -> bool:
+    def load_table(self, compact: bool = False) -> Table:
+        """
+        Load data from a CSV file into a columnar table of typed NumPy columns with null masks.
+        With `compact`, numbers are stored in their smallest safe dtype and low-cardinality
+        strings are dictionary-encoded (see `load_compact_table`).
+        With a cache, warm loads memory-map the cached columns instead of parsing the CSV.
+        """
+        import pandas as pd
+        options = "-compact" if compact else ""
+        if self.cache is not None:
+            table = self.cache.load_table(self.data_path, options)
+            if table is not None:
+                return table
+        if compact:
+            table = self.load_compact_table()
+        else:
+            table = Table.from_frame(pd.read_csv(self.data_path, dtype_backend="numpy_nullable"))
+        if self.cache is not None:
+            self.cache.store_table(self.data_path, table, options)
+        return table
+
+    def load_compact_table(self) -> Table:
+        """
+        Load the CSV into compact dtypes. A known schema (given, or recorded at `schema_path`)
+        is handed to pandas so columns are parsed straight into it; otherwise, or when the data
+        no longer fits it, the schema is inferred once and recorded for the next loads.
+        """
+        import pandas as pd
+        if self.schema is None and self.schema_path is not None and Path(self.schema_path).exists():
+            self.schema = load_schema(self.schema_path)
+        if self.schema is not None:
+            try:
+                df = pd.read_csv(self.data_path, dtype=pandas_dtypes(self.schema), dtype_backend="numpy_nullable")
+                return Table.from_frame(df)
+            except (ValueError, TypeError, OverflowError):
+                pass  # Values outside the recorded dtypes, infer the schema again
+        table = Table.from_frame(pd.read_csv(self.data_path, dtype_backend="numpy_nullable"))
+        self.schema = infer_schema(table)
+        if self.schema_path is not None:
+            save_schema(self.schema, self.schema_path)
+        return cast_table(table, self.schema)
+
+    def iter_batches(self, batch_size: int = 10_000, required_columns: Optional[List[str]] = None) -> Iterator[Table]:
+        """
+        Stream the CSV file as Tables of at most `batch_size` rows, so peak memory stays
+        bounded by one batch. The header is checked against `required_columns` before any
+        row is parsed, and a malformed row raises DataLoadError with its row number.
+        With a known schema every batch is cast to it, and the first row that does not fit raises
+        DataLoadError. Otherwise the dtypes are inferred as the file is read and only widen from
+        one batch to the next (see infer_batch_schema), so the batches load whatever their size
+        and Table.concat stacks them into the dtypes of the whole file.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        with open(self.data_path, newline='') as file:
+            reader = csv.reader(file)
+            try:
+                header = next(reader)
+            except StopIteration:
+                raise DataLoadError("File is empty, no header found.", self.data_path, row=0, line=0) from None
+            except csv.Error as e:
+                raise DataLoadError(str(e), self.data_path, row=0, line=reader.line_num) from e
+            missing_columns = [col for col in (required_columns or []) if col not in header]
+            if missing_columns:
+                raise DataLoadError(f"Missing required columns: {missing_columns}", self.data_path, row=0, line=1)
+
+            batch: List[List[str]] = []
+            lines: List[int] = []  # Line of each row of the batch
+            schema = self.schema
+            row_number = 0
+            while True:
+                try:
+                    fields = next(reader)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    raise DataLoadError(str(e), self.data_path, row=row_number + 1, line=reader.line_num) from e
+                if not fields:
+                    continue  # Skip blank lines, as pandas does
+                row_number += 1
+                if len(fields) != len(header):
+                    raise DataLoadError(
+                        f"Expected {len(header)} fields, saw {len(fields)}.",
+                        self.data_path, row=row_number, line=reader.line_num
+                    )
+                batch.append(fields)
+                lines.append(reader.line_num)
+                if len(batch) == batch_size:
+                    table, schema = self._batch_table(header, batch, schema, row_number, lines)
+                    yield table
+                    batch, lines = [], []
+            if batch:
+                yield self._batch_table(header, batch, schema, row_number, lines)[0]
+
+    def _batch_table(self, header: List[str], batch: List[List[str]], schema: Optional[Dict[str, Optional[str]]],
+                     last_row: int, lines: List[int]) -> Tuple[Table, Dict[str, Optional[str]]]:
+        """
+        Parse a batch and cast it to the known schema, or to the inferred one widened to fit it.
+        Returns the table and the schema for the next batch.
+        """
+        table = Table.from_rows(header, batch)
+        if self.schema is None:
+            schema = infer_batch_schema(table, schema)
+        known = {name: dtype for name, dtype in schema.items() if dtype is not None}
+        try:
+            return cast_table(table, known), schema
+        except ValueError:
+            pass
+        for offset, fields in enumerate(batch):  # Find the first row that does not fit
+            try:
+                cast_table(Table.from_rows(header, [fields]), known)
+            except ValueError as e:
+                row = last_row - len(batch) + 1 + offset
+                raise DataLoadError(f"Row does not fit the schema: {e}", self.data_path,
+                                    row=row, line=lines[offset]) from e
+        raise DataLoadError("Batch does not fit the schema.", self.data_path, row=last_row - len(batch) + 1,
+                            line=lines[0])
+
+    def validate_columns(self, data: Union[List[Dict[str, Any]], Table], required_columns: List[str]) -> bool:
         """ Validate that all required columns are present in the dataset. """
         if not data:
             print("No data loaded. Cannot validate columns.")
             return False
         
-        data_columns = set(data[0].keys())  # assuming 'data' is not empty
+        data_columns = set(data.column_names) if isinstance(data, Table) else set(data[0].keys())
         missing_columns = [col for col in required_columns if col not in data_columns]
         
         if missing_columns:
@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+from .table import Column, Table
+
+# Schema dtypes, from the most to the least compact, that integer columns may be stored in
+INTEGER_DTYPES = ("uint8", "int8", "uint16", "int16", "uint32", "int32", "int64")
+
+# Dtypes of the batches of DataLoader.iter_batches, from the narrowest: a later batch may widen a column
+BATCH_DTYPES = ("int64", "float64", "str")
+
+# pandas nullable dtype used to parse a column straight into its schema dtype
+PANDAS_DTYPES = {
+    "uint8": "UInt8", "int8": "Int8", "uint16": "UInt16", "int16": "Int16",
+    "uint32": "UInt32", "int32": "Int32", "int64": "Int64",
+    "float32": "Float32", "float64": "Float64",
+    "category": "category", "str": "string",
+}
+
+def infer_column_dtype(column: Column, max_categories: int = 1024, category_ratio: float = 0.5) -> str:
+    """
+    Smallest safe dtype for a column: the narrowest integer type holding its range, float32
+    when every value round-trips exactly, and 'category' for strings with few distinct values.
+    """
+    valid = column.valid()
+    if column.is_numeric:
+        if np.issubdtype(valid.dtype, np.integer):
+            low, high = (int(valid.min()), int(valid.max())) if valid.size else (0, 0)
+            for dtype in INTEGER_DTYPES:
+                info = np.iinfo(dtype)
+                if info.min <= low and high <= info.max:
+                    return dtype
+        if valid.size == 0 or np.array_equal(valid.astype(np.float32).astype(valid.dtype), valid):
+            return "float32"
+        return "float64"
+    distinct = len(column.categories) if column.is_categorical else len(np.unique(valid.astype(str)))
+    if distinct <= max_categories and distinct <= max(1, category_ratio * valid.size):
+        return "category"
+    return "str"
+
+def infer_schema(table: Table, max_categories: int = 1024, category_ratio: float = 0.5) -> Dict[str, str]:
+    """Infer the compact dtype of every column of a table."""
+    return {name: infer_column_dtype(column, max_categories, category_ratio) for name, column in table.columns.items()}
+
+def infer_batch_schema(table: Table, schema: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Optional[str]]:
+    """
+    Dtypes of the batches of a file read so far (`schema`, for the earlier ones) widened to
+    fit the batch `table`, along BATCH_DTYPES. Columns with no value yet are None: their
+    dtype stays unknown until a batch has one.
+    """
+    widened = dict(schema or {})
+    for name, column in table.columns.items():
+        if column.mask.all():
+            dtype = None
+        elif column.is_categorical or not column.is_numeric:
+            dtype = "str"
+        elif not np.issubdtype(column.values.dtype, np.integer):
+            dtype = "float64"
+        else:
+            dtype = "int64"
+        known = [value for value in (widened.get(name), dtype) if value is not None]
+        widened[name] = max(known, key=BATCH_DTYPES.index) if known else None
+    return widened
+
+def cast_column(column: Column, dtype: str) -> Column:
+    """Convert a column to a schema dtype."""
+    if dtype == "category":
+        return column.encode()
+    if dtype == "str":
+        values = column.decoded()
+        values = (values.astype(str) if column.is_numeric else values).astype(object)
+        values[column.mask] = None
+        return Column(values=values, mask=column.mask)
+    if not column.is_numeric:
+        raise ValueError(f"Cannot store a non-numeric column as {dtype}.")
+    values = np.where(column.mask, 0, column.values)
+    cast = values.astype(dtype)
+    if not np.array_equal(cast.astype(values.dtype), values):
+        raise ValueError(f"Values do not fit in {dtype}.")
+    return Column(values=cast, mask=column.mask)
+
+def cast_table(table: Table, schema: Dict[str, str]) -> Table:
+    """Convert the columns listed in the schema; other columns are kept as they are."""
+    return Table({
+        name: cast_column(column, schema[name]) if name in schema else column
+        for name, column in table.columns.items()
+    })
+
+def pandas_dtypes(schema: Dict[str, str]) -> Dict[str, str]:
+    """pandas.read_csv `dtype` argument that parses columns directly into the schema dtypes."""
+    return {name: PANDAS_DTYPES[dtype] for name, dtype in schema.items()}
+
+def save_schema(schema: Dict[str, str], path: Path) -> None:
+    Path(path).write_text(json.dumps(schema, indent=2))
+
+def load_schema(path: Path) -> Dict[str, str]:
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,291 @@
+import math
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from .table import Column, Table
+
+def _cut_point(ld: int, i: int, n: int) -> Tuple[int, int]:
+    """Index j and integer weight delta of the i-th n-quantile, as in statistics.quantiles."""
+    m = ld + 1
+    j = i * m // n
+    j = 1 if j < 1 else ld - 1 if j > ld - 1 else j  # Clamp to 1 .. ld-1
+    return j, i * m - j * n
+
+def exclusive_quantile(sorted_values: Sequence[Any], i: int, n: int) -> Any:
+    """
+    The i-th of the n-quantiles of sorted data, using the same 'exclusive' method and
+    integer arithmetic as statistics.quantiles, without computing the other n - 1 cut points.
+    """
+    ld = len(sorted_values)
+    if ld == 0:
+        raise ValueError("Quantiles need at least one data point.")
+    if ld == 1:
+        return sorted_values[0]
+    j, delta = _cut_point(ld, i, n)
+    return (sorted_values[j - 1] * (n - delta) + sorted_values[j] * delta) / n
+
+def select_quantile(values: Sequence[Any], i: int, n: int) -> Any:
+    """Same as exclusive_quantile on unsorted data, selecting the two neighbours in O(n)."""
+    ld = len(values)
+    if ld <= 1:
+        return exclusive_quantile(list(values), i, n)
+    j, delta = _cut_point(ld, i, n)
+    neighbours = np.partition(np.asarray(values), [j - 1, j])[j - 1:j + 1].tolist()
+    return (neighbours[0] * (n - delta) + neighbours[1] * delta) / n
+
+def quantile_fraction(q: float) -> Fraction:
+    """Express a quantile in [0, 1] as i/n so exclusive_quantile can use exact integer math."""
+    if not 0 <= q <= 1:
+        raise ValueError(f"Quantile {q} is outside [0, 1].")
+    return Fraction(q).limit_denominator(10_000)
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch built from KLL compactors. While fewer than `exact_limit`
+    values have been seen every value is kept, so quantiles of small data are exact.
+    """
+
+    def __init__(self, k: int = 256, exact_limit: int = 50_000, seed: int = 0):
+        self.k = k
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.minimum, self.maximum = math.inf, -math.inf  # Kept exactly, as compaction drops items
+        self.levels: List[np.ndarray] = [np.empty(0)]  # Items in levels[h] weigh 2**h
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of non-null numbers."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Fold another sketch into this one."""
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        if self.exact and self.levels[0].size <= self.exact_limit:
+            return
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if items.size <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                odd = items.size % 2
+                # Keep every other item of each sorted pair at twice the weight, starting at random
+                promoted = items[:items.size - odd][self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = items[items.size - odd:]
+                compacted = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state, including the compaction RNG so restored sketches evolve identically."""
+        return {
+            'k': self.k,
+            'exact_limit': self.exact_limit,
+            'count': self.count,
+            'minimum': self.minimum,
+            'maximum': self.maximum,
+            'levels': [level.tolist() for level in self.levels],
+            'rng': self._rng.bit_generator.state,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(k=state['k'], exact_limit=state['exact_limit'])
+        sketch.count = state['count']
+        sketch.minimum, sketch.maximum = state['minimum'], state['maximum']
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in state['levels']]
+        sketch._rng.bit_generator.state = state['rng']
+        return sketch
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-quantile (exact, 'exclusive' method, while the sketch is exact). The
+        method only defines inner cut points, so q=0 and q=1 give the minimum and maximum.
+        """
+        if self.count == 0:
+            raise ValueError("Quantiles need at least one data point.")
+        fraction = quantile_fraction(q)
+        if fraction in (0, 1):
+            return self.minimum if fraction == 0 else self.maximum
+        if self.exact:
+            return exclusive_quantile(np.sort(self.levels[0]).tolist(), fraction.numerator, fraction.denominator)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = min(int(np.searchsorted(cumulative, q * cumulative[-1])), items.size - 1)
+        return float(items[order][index])
+
+@dataclass
+class ColumnStats:
+    """
+    Aggregates of one column that are updated batch by batch in a single scan:
+    null count, mean and M2 (for the variance), min/max, a quantile sketch and value counts.
+    """
+    rows: int = 0
+    nulls: int = 0
+    count: int = 0  # Non-null numeric values folded into mean/m2/sketch
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+    numeric: bool = True  # Every non-null value seen so far is a number
+    integral: bool = True  # Every non-null number seen so far is an integer
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
+    counts: Dict[Any, int] = field(default_factory=dict)  # Insertion order follows first occurrence
+    counts_exact: bool = True
+    mode_limit: int = 100_000  # Distinct values tracked before the counts are pruned
+
+    def update(self, column: Column) -> None:
+        """Fold a batch of values (a Column with its null mask) into the aggregates."""
+        self.rows += len(column)
+        self.nulls += int(np.count_nonzero(column.mask))
+        valid = column.valid()
+        if valid.size == 0:
+            return
+        if column.is_numeric and self.numeric:
+            self.integral = self.integral and np.issubdtype(valid.dtype, np.integer)
+            self._update_moments(valid)
+        else:
+            self.numeric = False
+        self._update_counts(valid)
+
+    def _update_moments(self, valid: np.ndarray) -> None:
+        numbers = valid.astype(np.float64)
+        batch_count = numbers.size
+        batch_mean = float(numbers.mean())
+        batch_m2 = float(((numbers - batch_mean) ** 2).sum())
+        self._combine_moments(batch_count, batch_mean, batch_m2)
+        self.minimum = min(self.minimum, float(numbers.min()))
+        self.maximum = max(self.maximum, float(numbers.max()))
+        self.sketch.update(numbers)
+
+    def _combine_moments(self, count: int, mean: float, m2: float) -> None:
+        # Chan et al. pairwise update, so batches and partitions combine exactly like one pass
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def _update_counts(self, valid: np.ndarray) -> None:
+        if valid.dtype == object:
+            values, first_index, counts = np.unique(valid.astype(str), return_index=True, return_counts=True)
+            values = valid[first_index]
+        else:
+            values, first_index, counts = np.unique(valid, return_index=True, return_counts=True)
+        order = np.argsort(first_index, kind="stable")
+        for value, count in zip(values[order].tolist(), counts[order].tolist()):
+            self.counts[value] = self.counts.get(value, 0) + count
+        if len(self.counts) > self.mode_limit:
+            self._prune_counts()
+
+    def _prune_counts(self) -> None:
+        # Keep the most frequent half; the mode is then approximate (heavy hitters)
+        keep = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:self.mode_limit // 2]
+        kept = {value for value, _ in keep}
+        self.counts = {value: count for value, count in self.counts.items() if value in kept}
+        self.counts_exact = False
+
+    def merge(self, other: "ColumnStats") -> None:
+        """Fold the aggregates of another partition of the same column into this one."""
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.numeric = self.numeric and other.numeric
+        self.integral = self.integral and other.integral
+        if other.count:
+            self._combine_moments(other.count, other.mean, other.m2)
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+            self.sketch.merge(other.sketch)
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.counts_exact = self.counts_exact and other.counts_exact
+        if len(self.counts) > self.mode_limit:
+            self._prune_counts()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state; value counts are kept as [value, count] pairs to preserve key types."""
+        state = {name: getattr(self, name) for name in (
+            'rows', 'nulls', 'count', 'mean', 'm2', 'minimum', 'maximum',
+            'numeric', 'integral', 'counts_exact', 'mode_limit')}
+        state['sketch'] = self.sketch.to_dict()
+        state['counts'] = [[value, count] for value, count in self.counts.items()]
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "ColumnStats":
+        state = dict(state)
+        sketch = QuantileSketch.from_dict(state.pop('sketch'))
+        counts = {value: count for value, count in state.pop('counts')}
+        return cls(sketch=sketch, counts=counts, **state)
+
+    def mode(self) -> Any:
+        """Most frequent value; ties go to the value seen first, as statistics.mode does."""
+        if not self.counts:
+            return None
+        return max(self.counts.items(), key=lambda item: item[1])[0]
+
+    def result(self, quantiles: Sequence[float] = (0.25, 0.5, 0.75)) -> Dict[str, Any]:
+        """Summary of the column; numeric summaries are only given for numeric columns."""
+        is_numeric = self.numeric and self.count > 0
+        summary: Dict[str, Any] = {
+            'type': 'numeric' if is_numeric else 'categorical',
+            'count': self.rows - self.nulls,
+            'none_ratio': self.nulls / self.rows if self.rows else 0.0,
+            'mode': self.mode(),
+        }
+        if is_numeric:
+            summary.update({
+                'mean': self.mean,
+                'variance': self.m2 / (self.count - 1) if self.count > 1 else 0.0,
+                'std': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0,
+                'min': int(self.minimum) if self.integral else self.minimum,
+                'max': int(self.maximum) if self.integral else self.maximum,
+                'quantiles': {q: self.sketch.quantile(q) for q in quantiles},
+            })
+        return summary
+
+def collect_stats(batches: Iterable[Table], columns: Optional[Sequence[str]] = None) -> Dict[str, ColumnStats]:
+    """Scan a stream of Tables (e.g. DataLoader.iter_batches) once, aggregating every column."""
+    stats: Dict[str, ColumnStats] = {}
+    for batch in batches:
+        for name in (columns if columns is not None else batch.column_names):
+            if name not in stats:
+                stats[name] = ColumnStats()
+            stats[name].update(batch[name])
+    return stats
+
+def record_batches(data: List[Dict[str, Any]], columns: Sequence[str], batch_size: int = 10_000) -> Iterable[Table]:
+    """Cut a list of row dictionaries into Tables of the given columns, one batch at a time."""
+    for start in range(0, len(data), batch_size):
+        rows = data[start:start + batch_size]
+        yield Table({name: Column.from_values([row.get(name) for row in rows]) for name in columns})
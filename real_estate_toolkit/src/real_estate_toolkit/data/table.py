@@ -0,0 +1,248 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import math
+import sys
+import numpy as np
+
+# Field values read as missing, mirroring the default NA markers of pandas.read_csv
+NULL_TOKENS = ("", "NA", "N/A", "n/a", "#N/A", "NaN", "nan", "NULL", "null", "None", "<NA>")
+
+@dataclass
+class Column:
+    """
+    A typed column: a NumPy array of values plus a boolean null mask.
+    A dictionary-encoded column stores integer codes in `values` and their labels in `categories`.
+    """
+    values: np.ndarray
+    mask: np.ndarray  # True where the value is missing
+    categories: Optional[np.ndarray] = None  # Labels of a dictionary-encoded column
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def is_numeric(self) -> bool:
+        """Whether the column holds numbers (booleans and category codes excluded)."""
+        return self.categories is None and np.issubdtype(self.values.dtype, np.number)
+
+    @property
+    def is_categorical(self) -> bool:
+        return self.categories is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the column, counting the Python strings of object columns."""
+        total = self.values.nbytes + self.mask.nbytes
+        for array in (self.values, self.categories):
+            if array is not None and array.dtype == object:
+                total += sum(sys.getsizeof(value) for value in array.tolist())
+        if self.categories is not None and self.categories.dtype != object:
+            total += self.categories.nbytes
+        return total
+
+    def decoded(self) -> np.ndarray:
+        """All values, with codes of a dictionary-encoded column replaced by their labels."""
+        if self.categories is None:
+            return self.values
+        if self.categories.size == 0:
+            return np.full(len(self), None, dtype=object)
+        return self.categories[self.values]
+
+    def valid(self) -> np.ndarray:
+        """Return the non-null values (labels for a dictionary-encoded column)."""
+        if self.categories is None:
+            return self.values[~self.mask]
+        return self.categories[self.values[~self.mask]]
+
+    def encode(self) -> "Column":
+        """Dictionary-encode the column as the smallest integer codes into sorted labels."""
+        if self.categories is not None:
+            return self
+        labels, codes = np.unique(self.valid().astype(str), return_inverse=True)
+        values = np.zeros(len(self), dtype=np.min_scalar_type(max(len(labels) - 1, 0)))
+        values[~self.mask] = codes
+        return Column(values=values, mask=self.mask, categories=labels)
+
+    def to_list(self) -> List[Any]:
+        """Return the values as Python objects, with None for missing entries."""
+        values = self.decoded().tolist()
+        for index in np.flatnonzero(self.mask).tolist():
+            values[index] = None
+        return values
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any]) -> "Column":
+        """Build a column from Python values, treating None and NaN as missing."""
+        mask = np.fromiter((is_null(value) for value in values), dtype=bool, count=len(values))
+        valid = [value for value, missing in zip(values, mask) if not missing]
+        if all(isinstance(value, int) and not isinstance(value, bool) for value in valid):
+            dtype, fill = np.int64, 0
+        elif all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in valid):
+            dtype, fill = np.float64, np.nan
+        else:
+            dtype, fill = object, None
+        array = np.array([fill if missing else value for value, missing in zip(values, mask)], dtype=dtype)
+        return cls(values=array, mask=mask)
+
+    @classmethod
+    def from_strings(cls, fields: Sequence[str]) -> "Column":
+        """Parse raw CSV fields, inferring int64, then float64, then falling back to strings."""
+        strings = np.array(fields, dtype=str)
+        mask = np.isin(strings, NULL_TOKENS)
+        filled = np.where(mask, "0", strings)
+        for dtype in (np.int64, np.float64):
+            try:
+                return cls(values=filled.astype(dtype), mask=mask)
+            except (ValueError, OverflowError):
+                continue
+        values = strings.astype(object)
+        values[mask] = None
+        return cls(values=values, mask=mask)
+
+
+def _as_strings(column: Column) -> Column:
+    """A numeric column as an object column of strings, None where missing."""
+    values = column.values.astype(str).astype(object)
+    values[column.mask] = None
+    return Column(values=values, mask=column.mask)
+
+def is_null(value: Any) -> bool:
+    """Whether a Python value counts as missing (None or NaN)."""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+@dataclass
+class Table:
+    """Columnar table of typed columns that share the same number of rows."""
+    columns: Dict[str, Column]
+
+    def __len__(self) -> int:
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name: str) -> Column:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the rows as dictionaries (backward compatible row view)."""
+        names = self.column_names
+        lists = [self.columns[name].to_list() for name in names]
+        for values in zip(*lists):
+            yield dict(zip(names, values))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by all columns."""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialize the table as a list of dictionaries, like `load_data_from_csv`."""
+        return list(self.rows())
+
+    def select(self, names: Sequence[str]) -> "Table":
+        """Return a table with only the given columns (arrays are shared, not copied)."""
+        return Table({name: self.columns[name] for name in names})
+
+    def rename(self, mapping: Dict[str, str]) -> None:
+        """Rename columns in place; only the column index is rebuilt."""
+        self.columns = {mapping.get(name, name): column for name, column in self.columns.items()}
+
+    def to_structured_array(self) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Convert to a structured float64 array with NaN for missing values. Non-numeric
+        columns are encoded as integer codes; the second return value maps each of
+        those columns to its labels (code i stands for labels[i]).
+        """
+        array = np.empty(len(self), dtype=[(name, np.float64) for name in self.column_names])
+        categories = {}
+        for name, column in self.columns.items():
+            if not column.is_numeric:
+                column = column.encode()
+                categories[name] = column.categories
+            values = column.values.astype(np.float64)
+            values[column.mask] = np.nan
+            array[name] = values
+        return array, categories
+
+    @classmethod
+    def concat(cls, tables: Iterable["Table"]) -> "Table":
+        """
+        Stack tables with the same columns (e.g. the batches of DataLoader.iter_batches).
+        Dictionary-encoded columns are re-encoded over the union of their labels, and numbers
+        stacked with strings become strings.
+        """
+        tables = list(tables)
+        if not tables:
+            return cls({})
+        columns = {}
+        for name in tables[0].column_names:
+            parts = [table[name] for table in tables]
+            mask = np.concatenate([part.mask for part in parts])
+            if any(part.is_categorical for part in parts):
+                parts = [part.encode() for part in parts]
+                labels = np.unique(np.concatenate([part.categories.astype(str) for part in parts]))
+                codes = np.concatenate([
+                    np.searchsorted(labels, part.categories.astype(str))[part.values] if part.categories.size
+                    else np.zeros(len(part), dtype=np.int64)
+                    for part in parts
+                ])
+                values = codes.astype(np.min_scalar_type(max(len(labels) - 1, 0)))
+                columns[name] = Column(values=values, mask=mask, categories=labels)
+            else:
+                if any(part.values.dtype == object for part in parts):
+                    parts = [_as_strings(part) if part.is_numeric else part for part in parts]
+                columns[name] = Column(values=np.concatenate([part.values for part in parts]), mask=mask)
+        return cls(columns)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "Table":
+        """Build a table from a list of dictionaries, using the first row's keys."""
+        if not records:
+            return cls({})
+        return cls({name: Column.from_values([row.get(name) for row in records]) for name in records[0]})
+
+    @classmethod
+    def from_rows(cls, header: Sequence[str], rows: List[Sequence[str]]) -> "Table":
+        """Build a table from raw CSV rows of strings sharing the given header."""
+        if not rows:
+            return cls({name: Column.from_strings([]) for name in header})
+        return cls({name: Column.from_strings(fields) for name, fields in zip(header, zip(*rows))})
+
+    @classmethod
+    def from_frame(cls, frame) -> "Table":
+        """Build a table from a pandas DataFrame read with nullable dtypes."""
+        columns = {}
+        for name in frame.columns:
+            series = frame[name]
+            mask = series.isna().to_numpy(dtype=bool)
+            numpy_dtype = getattr(series.dtype, "numpy_dtype", series.dtype)
+            kind = numpy_dtype.kind if isinstance(numpy_dtype, np.dtype) else "O"
+            if str(series.dtype) == "category":
+                codes = series.cat.codes.to_numpy()
+                values = np.where(mask, 0, codes).astype(codes.dtype)
+                labels = np.asarray(series.cat.categories, dtype=str)
+                columns[str(name)] = Column(values=values, mask=mask, categories=labels)
+                continue
+            if kind in "iu":
+                values = series.to_numpy(dtype=numpy_dtype, na_value=0)
+            elif kind == "f":
+                values = series.to_numpy(dtype=numpy_dtype, na_value=np.nan)
+            else:
+                values = series.to_numpy(dtype=object, na_value=None)
+            columns[str(name)] = Column(values=values, mask=mask)
+        return cls(columns)
+
+
+def as_table(data) -> Table:
+    """Return `data` as a Table, converting a list of dictionaries if needed."""
+    if isinstance(data, Table):
+        return data
+    return Table.from_records(data)
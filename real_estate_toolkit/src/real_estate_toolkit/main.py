@@ -1,8 +1,6 @@
 "Main module for running tests"
 from pathlib import Path
 from typing import List, Dict, Any
-import polars as pl
-import plotly.graph_objects as go
 
 from real_estate_toolkit.data.loader import DataLoader
 from real_estate_toolkit.data.cleaner import Cleaner
@@ -16,8 +14,7 @@ from real_estate_toolkit.agent_based_model.simulation import (
     AnnualIncomeStatistics,
     ChildrenRange
 )
-from real_estate_toolkit.analytics.exploratory import MarketAnalyzer
-from real_estate_toolkit.ml_models.predictor import HousePricePredictor
+# polars, plotly and scikit-learn are imported by the tests that use them, keeping startup light
 
 def is_valid_snake_case(string: str) -> bool:
     """
@@ -221,6 +218,9 @@ def test_simulation(cleaned_data: List[Dict[str, Any]]):
 
 def test_market_analyzer():
     """Test the functionality of the MarketAnalyzer class."""
+    import polars as pl
+    import plotly.graph_objects as go
+    from real_estate_toolkit.analytics.exploratory import MarketAnalyzer
     dataset_path = Path("files/train.csv")
     analyzer = MarketAnalyzer(data_path=str(dataset_path))
     # Test cleaning data
@@ -262,6 +262,7 @@ def test_market_analyzer():
 
 def test_house_price_predictor():
     """Test the functionality of the HousePricePredictor class."""
+    from real_estate_toolkit.ml_models.predictor import HousePricePredictor
     # Paths to the datasets
     train_data_path = Path("files/train.csv")
     test_data_path = Path("files/test.csv")
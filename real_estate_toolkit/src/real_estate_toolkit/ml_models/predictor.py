@@ -1,4 +1,5 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.impute import SimpleImputer
@@ -8,27 +9,31 @@ from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score, mean_absolute_percentage_error
 import polars as pl
+import polars.selectors as cs
 import os
+from ..data.cache import DatasetCache, read_csv_cached
 
 class HousePricePredictor:
-    def __init__(self, train_data_path: str, test_data_path: str):
-        self.train_data = pl.read_csv(train_data_path)
-        self.test_data = pl.read_csv(test_data_path)
+    def __init__(self, train_data_path: str, test_data_path: str, cache: Optional[DatasetCache] = None):
+        self.train_data = read_csv_cached(train_data_path, cache, null_values="NA", infer_schema_length=10000)
+        self.test_data = read_csv_cached(test_data_path, cache, null_values="NA", infer_schema_length=10000)
         self.model_results = {}
+        self.preprocessor: Optional[ColumnTransformer] = None  # Built by prepare_features
+        self.feature_columns: List[str] = []
         self.output_directory = 'src/real_estate_toolkit/ml_models/outputs/'
         os.makedirs(self.output_directory, exist_ok=True)
 
     def clean_data(self):
-        # Assume handling missing values and correcting data types
-        self.train_data = self.train_data.fill_missing(pl.median(self.train_data.select(pl.col('SalePrice'))))
-        self.test_data = self.test_data.fill_missing(pl.median(self.test_data.select(pl.col('SalePrice'))))
+        # Houses without a sale price get the median one; missing features are imputed by the preprocessor
+        self.train_data = self.train_data.with_columns(pl.col('SalePrice').fill_null(pl.col('SalePrice').median()))
 
     def prepare_features(self, target_column='SalePrice', selected_predictors=None):
-        y = self.train_data.select(target_column)
-        X = self.train_data.drop(target_column) if not selected_predictors else self.train_data.select(selected_predictors)
-        
-        numeric_features = X.select(pl.col('*').exclude(pl.Utf8)).columns
-        categorical_features = X.select(pl.col('*').is_in(numeric_features).is_not()).columns
+        y = self.train_data[target_column].to_numpy()
+        X = self.train_data.drop(target_column, 'Id') if not selected_predictors else self.train_data.select(selected_predictors)
+        self.feature_columns = X.columns
+
+        numeric_features = X.select(cs.numeric()).columns
+        categorical_features = X.select(cs.string()).columns
 
         numeric_transformer = Pipeline(steps=[
             ('imputer', SimpleImputer(strategy='median')),
@@ -40,15 +45,14 @@ class HousePricePredictor:
             ('onehot', OneHotEncoder(handle_unknown='ignore'))
         ])
 
-        preprocessor = ColumnTransformer(
+        self.preprocessor = ColumnTransformer(
             transformers=[
                 ('num', numeric_transformer, numeric_features),
                 ('cat', categorical_transformer, categorical_features)
             ])
 
-        X_preprocessed = preprocessor.fit_transform(X)
-
-        return train_test_split(X_preprocessed, y, test_size=0.2, random_state=42)
+        # The preprocessor is fitted with each model, on the training split only
+        return train_test_split(X, y, test_size=0.2, random_state=42)
 
     def train_baseline_models(self):
         X_train, X_test, y_train, y_test = self.prepare_features()
@@ -59,9 +63,8 @@ class HousePricePredictor:
         }
 
         for model_name, model in models.items():
-            pipeline = Pipeline(steps=[('preprocessor', preprocessor), ('model', model)])
+            pipeline = Pipeline(steps=[('preprocessor', clone(self.preprocessor)), ('model', model)])
             pipeline.fit(X_train, y_train)
-            y_pred_train = pipeline.predict(X_train)
             y_pred_test = pipeline.predict(X_test)
 
             self.model_results[model_name] = {
@@ -71,17 +74,15 @@ class HousePricePredictor:
                     'R2': r2_score(y_test, y_pred_test),
                     'MAPE': mean_absolute_percentage_error(y_test, y_pred_test)
                 },
-                'model': model
+                'model': pipeline
             }
 
         return self.model_results
 
-    def forecast_sales_price(self, model_type='LinearRegression'):
+    def forecast_sales_price(self, model_type='Linear Regression'):
         # Load best model or specified model
         model = self.model_results[model_type]['model']
-        X_test_preprocessed = self.prepare_features(self.test_data)
-        predictions = model.predict(X_test_preprocessed)
+        predictions = model.predict(self.test_data.select(self.feature_columns))
 
         submission_df = pl.DataFrame({'Id': self.test_data['Id'], 'SalePrice': predictions})
         submission_df.write_csv(os.path.join(self.output_directory, 'submission.csv'))
-
@@ -0,0 +1,19 @@
+import pytest
+from real_estate_toolkit.data.cleaner import CoerceNumeric, NaToNone, SentinelToNone, StripStrings
+from real_estate_toolkit.data.table import Column
+
+COLUMNS = [
+    ['1', 'N/A', '3'],
+    ['1', '2', None, '4'],
+    ['1.5', '2', '-3e2'],
+    ['1', 'x', '2.5', None],
+    ['NaN', '1', ''],
+    [1, 2, None],
+    [' a', 'NA', 'b ', None],
+]
+
+@pytest.mark.parametrize("step", [CoerceNumeric(), NaToNone(), StripStrings(), SentinelToNone(sentinels=(0, '-1'))])
+@pytest.mark.parametrize("values", COLUMNS)
+def test_apply_column_matches_the_row_path(step, values):
+    fused = step.apply_column(Column.from_values(values))
+    assert fused.to_list() == Column.from_values([step(value) for value in values]).to_list()
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from real_estate_toolkit.agent_based_model.clearing import ClearingEngine
+from real_estate_toolkit.agent_based_model.consumers import Consumer, Segment
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+
+def random_market(rng: np.random.Generator, size: int) -> HousingMarket:
+    """A market with many tied prices, some zero areas and plenty of new excellent houses."""
+    return HousingMarket.from_arrays(
+        ids=np.arange(size),
+        prices=rng.choice([90_000.0, 120_000.0, 150_000.0, 200_000.0, 350_000.0], size),
+        areas=np.where(rng.random(size) < 0.1, 0.0, rng.choice([800.0, 1200.0, 1500.0, 2500.0], size)),
+        bedrooms=rng.integers(0, 6, size),
+        year_built=rng.choice([1950, 1990, 2021, 2023], size),
+        quality=rng.integers(0, 6, size),
+    )
+
+def greedy_reference(market: HousingMarket, consumers: list, down_payment_percentage: float) -> list:
+    """
+    The original Consumer.buy_a_house loop over plain Python lists: each consumer scans the
+    available houses of their segment, cheapest first, and buys the first one with enough
+    bedrooms if they can afford its down payment. Returns the row bought by each consumer.
+    """
+    prices, areas = market.prices.tolist(), market.areas.tolist()
+    bedrooms, year_built, quality = market.bedrooms.tolist(), market.year_built.tolist(), market.quality.tolist()
+    per_sqft = [0.0 if area == 0 else round(price / area, 2) for price, area in zip(prices, areas)]
+    available = market.available.tolist()
+    bought = []
+    for savings, children_number, segment in consumers:
+        rows = [row for row in range(len(prices)) if available[row]]
+        average_price = round(sum(prices[row] for row in rows) / len(rows), 2) if rows else 0.0
+        average_per_sqft = round(sum(per_sqft[row] for row in rows) / len(rows), 2) if rows else 0.0
+        if segment == Segment.FANCY:
+            rows = [row for row in rows if 2024 - year_built[row] < 5 and quality[row] == 5]
+        elif segment == Segment.OPTIMIZER:
+            rows = [row for row in rows if per_sqft[row] < average_per_sqft]
+        else:
+            rows = [row for row in rows if prices[row] < average_price]
+        rows.sort(key=lambda row: prices[row])
+        choice = -1
+        for row in rows:
+            if bedrooms[row] >= children_number + 1 and savings >= prices[row] * down_payment_percentage:
+                choice = row
+                available[row] = False
+                break
+        bought.append(choice)
+    return bought
+
+def random_queue(rng: np.random.Generator, market: HousingMarket, size: int,
+                 down_payment_percentage: float) -> list:
+    """(savings, children, segment) of a queue of consumers; many can pay some down payment exactly or not quite."""
+    down_payments = np.unique(market.prices) * down_payment_percentage
+    exact = rng.choice(down_payments, size)
+    savings = np.where(rng.random(size) < 0.5, exact, np.nextafter(exact, -np.inf))
+    savings = np.where(rng.random(size) < 0.2, rng.uniform(0, 2 * down_payments.max() + 1, size), savings)
+    segments = rng.choice(list(Segment), size)
+    return list(zip(savings.tolist(), rng.integers(0, 4, size).tolist(), segments.tolist()))
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("down_payment_percentage", [0.0, 0.2, 1.0])
+def test_clear_matches_buy_a_house(seed, down_payment_percentage):
+    rng = np.random.default_rng(seed)
+    market = random_market(rng, 120)
+    queue = random_queue(rng, market, 150, down_payment_percentage)
+
+    def consumers():
+        return [Consumer(ID=position, annual_income=0.0, children_number=children, segment=segment, savings=savings)
+                for position, (savings, children, segment) in enumerate(queue)]
+
+    expected = greedy_reference(market, queue, down_payment_percentage)
+    looped, batched = consumers(), consumers()
+    loop_market, batch_market = market.with_availability(), market.with_availability()
+    for consumer in looped:
+        consumer.buy_a_house(loop_market, down_payment_percentage)
+    ClearingEngine(batch_market, down_payment_percentage).clear(batched)
+
+    expected_ids = [int(market.ids[row]) if row >= 0 else None for row in expected]
+    for result in (looped, batched):
+        assert [consumer.house.id if consumer.house else None for consumer in result] == expected_ids
+    assert [consumer.savings for consumer in batched] == [consumer.savings for consumer in looped]
+    assert np.array_equal(batch_market.available, loop_market.available)
+    assert 0 < sum(row >= 0 for row in expected) < len(queue)
+    assert {segment for (_, _, segment), row in zip(queue, expected) if row >= 0} == set(Segment)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from real_estate_toolkit.agent_based_model.consumers import Consumer, Segment, accumulated_savings
+
+def iterated_savings(savings: float, annual_income: float, saving_rate: float, interest_rate: float,
+                     years: int, income_growth: float = 0.0) -> float:
+    consumer = Consumer(ID=0, annual_income=annual_income, children_number=0, segment=Segment.AVERAGE,
+                        savings=savings, saving_rate=saving_rate, interest_rate=interest_rate)
+    for _ in range(years):
+        consumer.compute_savings(1)
+        consumer.annual_income *= 1 + income_growth
+    return consumer.savings
+
+@pytest.mark.parametrize("interest_rate", [0.0, 1e-9, 0.05, 0.3])
+@pytest.mark.parametrize("years", [0, 1, 7, 40])
+def test_accumulated_savings_matches_compute_savings(interest_rate, years):
+    expected = iterated_savings(1000.0, 52_000.0, 0.3, interest_rate, years)
+    closed_form = accumulated_savings(1000.0, 52_000.0, 0.3, interest_rate, years)
+    assert closed_form == pytest.approx(expected, rel=1e-12, abs=1e-9)
+
+def test_accumulated_savings_with_mixed_rates_per_consumer():
+    rng = np.random.default_rng(0)
+    size = 200
+    savings = rng.uniform(0, 50_000, size)
+    income = rng.uniform(20_000, 150_000, size)
+    saving_rate = rng.uniform(0, 0.5, size)
+    interest_rate = np.where(rng.random(size) < 0.3, 0.0, rng.uniform(0, 0.1, size))
+    years = rng.integers(0, 30, size)
+    closed_form = accumulated_savings(savings, income, saving_rate, interest_rate, years)
+    expected = [iterated_savings(*arguments) for arguments in zip(savings.tolist(), income.tolist(),
+                                                                  saving_rate.tolist(), interest_rate.tolist(),
+                                                                  years.tolist())]
+    np.testing.assert_allclose(closed_form, expected, rtol=1e-12, atol=1e-9)
+
+@pytest.mark.parametrize("income_growth", [0.0, 0.03, 0.05, -0.02])
+@pytest.mark.parametrize("interest_rate", [0.0, 0.05])
+def test_accumulated_savings_with_income_growth(income_growth, interest_rate):
+    for years in (0, 1, 12):
+        expected = iterated_savings(500.0, 40_000.0, 0.25, interest_rate, years, income_growth)
+        closed_form = accumulated_savings(500.0, 40_000.0, 0.25, interest_rate, years, income_growth)
+        assert closed_form == pytest.approx(expected, rel=1e-12, abs=1e-9)
@@ -0,0 +1,57 @@
+import math
+import numpy as np
+import pytest
+from real_estate_toolkit.data.descriptor import Descriptor, DescriptorNumpy
+from real_estate_toolkit.data.table import Table
+
+@pytest.fixture
+def records():
+    rng = np.random.default_rng(5)
+    rows = []
+    for index in range(200):
+        rows.append({
+            'price': None if index % 17 == 0 else int(rng.integers(50_000, 500_000)),
+            'area': math.nan if index % 11 == 0 else float(np.round(rng.normal(1500, 400), 1)),
+            'rooms': int(rng.integers(1, 6)),
+            'zone': None if index % 13 == 0 else str(rng.choice(['RL', 'RM', 'FV', 'RH'])),
+        })
+    return rows
+
+def assert_close(left, right):
+    assert left.keys() == right.keys()
+    for key in left:
+        if isinstance(left[key], tuple):
+            assert left[key][0] == right[key][0]
+            assert left[key][1] == pytest.approx(right[key][1])
+        else:
+            assert left[key] == pytest.approx(right[key])
+
+@pytest.mark.parametrize("as_table", [False, True])
+def test_descriptor_numpy_matches_descriptor(records, as_table):
+    data = Table.from_records(records) if as_table else records
+    descriptor, descriptor_numpy = Descriptor(records), DescriptorNumpy(data)
+    numeric = ['price', 'area', 'rooms']
+    assert_close(descriptor.none_ratio(), descriptor_numpy.none_ratio())
+    assert_close(descriptor.average(numeric), descriptor_numpy.average())
+    assert_close(descriptor.median(numeric), descriptor_numpy.median())
+    for percentile in (1, 25, 90, 99):
+        assert_close(descriptor.percentile(numeric, percentile), descriptor_numpy.percentile(percentile=percentile))
+    assert_close(descriptor.type_and_mode(), descriptor_numpy.type_and_mode())
+
+def test_describe_matches_across_inputs(records):
+    expected = Descriptor(records).describe()
+    for result in (Descriptor(Table.from_records(records)).describe(), DescriptorNumpy(records).describe()):
+        assert result.keys() == expected.keys()
+        for column, summary in expected.items():
+            assert_close(summary, result[column])
+
+@pytest.mark.parametrize("numpy", [False, True])
+def test_per_metric_methods_with_workers_match_the_serial_ones(records, numpy):
+    descriptor = DescriptorNumpy(records) if numpy else Descriptor(records)
+    for method in ('none_ratio', 'average', 'median', 'type_and_mode'):
+        expected = getattr(descriptor, method)()
+        assert expected
+        assert_close(expected, getattr(descriptor, method)(workers=2))
+    for percentile in (1, 25, 90, 99):
+        assert_close(descriptor.percentile(percentile=percentile), descriptor.percentile(percentile=percentile, workers=2))
+    assert_close(descriptor.average(['area']), descriptor.average(['area'], workers=2))
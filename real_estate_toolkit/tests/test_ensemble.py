@@ -0,0 +1,73 @@
+import os
+import statistics
+import numpy as np
+import pytest
+from real_estate_toolkit.agent_based_model.ensemble import Ensemble, EnsembleResult, Scenario
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE
+
+SCENARIO = Scenario(
+    consumers_number=500, years=3,
+    annual_income=AnnualIncomeStatistics(minimum=20000.0, average=60000.0, standard_deviation=30000.0,
+                                         maximum=150000.0),
+    children_range=ChildrenRange(minimum=0, maximum=4),
+    cleaning_market_mechanism=CleaningMarketMechanism.RANDOM,
+)
+
+def test_ensemble_leaves_the_callers_market_writable_and_unchanged():
+    market = AMES_SHAPE.generate(300, seed=0)
+    before = {name: getattr(market, name).copy() for name in (*HousingMarket.HOUSE_ARRAYS, 'available')}
+    arrays = {name: getattr(market, name) for name in HousingMarket.HOUSE_ARRAYS}
+    Ensemble(market, SCENARIO, seed=1).run(4, workers=1)
+    for name, array in arrays.items():
+        assert getattr(market, name) is array
+        assert array.flags.writeable, name
+    for name, values in before.items():
+        np.testing.assert_array_equal(getattr(market, name), values, err_msg=name)
+    market.prices[0] = 1.0
+
+def test_with_availability_markets_do_not_see_each_others_updates():
+    market = AMES_SHAPE.generate(50, seed=0)
+    price = float(market.prices[0])
+    derived = market.with_availability()
+    assert not derived.prices.flags.writeable
+    derived.update_house(0, price=price + 1)
+    assert market.prices[0] == price
+    market.update_house(0, price=price + 2)
+    assert derived.prices[0] == price + 1
+    other = market.with_availability()
+    market.houses[1].id = -1
+    assert other.ids[1] != -1
+
+def test_results_do_not_depend_on_workers_or_batching():
+    market = AMES_SHAPE.generate(300, seed=0)
+    ensemble = Ensemble(market, SCENARIO, seed=2)
+    expected = ensemble.run(6, workers=1, batch_size=6)
+    blocks = set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+    for workers, batch_size in ((1, 1), (2, 1), (2, 4)):
+        result = ensemble.run(6, workers=workers, batch_size=batch_size)
+        np.testing.assert_array_equal(result.owners_population_rate, expected.owners_population_rate)
+        np.testing.assert_array_equal(result.houses_availability_rate, expected.houses_availability_rate)
+        assert result.entropy == expected.entropy == 2
+    assert np.unique(expected.owners_population_rate).size > 1  # Replicas draw different consumers
+    assert market.available.all()
+    if os.path.isdir('/dev/shm'):  # The shared market blocks are released
+        assert set(os.listdir('/dev/shm')) <= blocks
+
+def test_summary():
+    owners = np.array([0.2, 0.4, 0.3, 0.5])
+    result = EnsembleResult(owners_population_rate=owners, houses_availability_rate=np.full(4, 0.1), entropy=0)
+    summary = result.summary(confidence=0.9, quantiles=(0.5, 1.0))
+    margin = statistics.NormalDist().inv_cdf(0.95) * statistics.stdev(owners.tolist()) / 2
+    assert summary['owners_population_rate'] == pytest.approx({
+        'mean': 0.35, 'std': statistics.stdev(owners.tolist()), 'ci_low': 0.35 - margin, 'ci_high': 0.35 + margin,
+        'q50': 0.35, 'q100': 0.5,
+    })
+    assert summary['houses_availability_rate'] == pytest.approx({
+        'mean': 0.1, 'std': 0.0, 'ci_low': 0.1, 'ci_high': 0.1, 'q50': 0.1, 'q100': 0.1,
+    })
+    empty = EnsembleResult(np.empty(0), np.empty(0), entropy=0).summary()
+    assert empty['owners_population_rate']['mean'] == 0.0 and len(empty['owners_population_rate']) == 9
@@ -0,0 +1,36 @@
+import polars as pl
+import pytest
+from real_estate_toolkit.analytics.exploratory import MarketAnalyzer
+
+def analyzer(tmp_path) -> MarketAnalyzer:
+    path = tmp_path / "train.csv"
+    pl.DataFrame({
+        'Neighborhood': ['A', 'B', 'A', 'C', 'B', 'C'],
+        'SalePrice': [100_000, 250_000, 120_000, 90_000, None, 80_000],
+        'GrLivArea': [900, 2000, 1100, 800, 1500, 700],
+        'YearBuilt': [1990, 2005, 1995, 1960, 2001, 1950],
+        'OverallQual': [5, 8, 6, 4, 7, 3],
+    }).write_csv(path, null_value="NA")
+    analyzer = MarketAnalyzer(str(path), output_dir=str(tmp_path / "outputs"))
+    analyzer.clean_data()
+    return analyzer
+
+def test_correlation_heatmap_collects_only_its_query(tmp_path):
+    market = analyzer(tmp_path)
+    market.feature_correlation_heatmap(['SalePrice', 'GrLivArea'])
+    assert set(market._results) == {'correlation:SalePrice,GrLivArea'}
+    assert (tmp_path / "outputs" / "correlation_heatmap.html").exists()
+
+def test_neighborhood_stats_hold_only_the_median(tmp_path):
+    [neighborhood_stats] = analyzer(tmp_path)._result('neighborhood_stats')
+    assert neighborhood_stats.columns == ['Neighborhood', 'MedianPrice']
+    assert neighborhood_stats['Neighborhood'].to_list() == ['B', 'A', 'C']
+
+def test_each_analysis_collects_only_its_queries(tmp_path):
+    pytest.importorskip("pyarrow")  # Plotted frames go through to_pandas
+    market = analyzer(tmp_path)
+    price_stats = market.generate_price_distribution_analysis()
+    assert set(market._results) == {'price_stats', 'sale_prices'}
+    assert price_stats['Max'][0] == 250_000
+    market.neighborhood_price_comparison()
+    assert set(market._results) == {'price_stats', 'sale_prices', 'neighborhood_stats', 'neighborhood_prices'}
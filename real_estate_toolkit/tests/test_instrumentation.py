@@ -0,0 +1,68 @@
+import csv
+import json
+import numpy as np
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.instrumentation import NULL_INSTRUMENTATION, Instrumentation
+from real_estate_toolkit.agent_based_model.population import SEGMENTS
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE
+
+CONSUMERS, HOUSES = 3000, 500
+
+def run(instrumentation=NULL_INSTRUMENTATION) -> Simulation:
+    simulation = Simulation(
+        housing_market_data=[], consumers_number=CONSUMERS, years=3,
+        annual_income=AnnualIncomeStatistics(minimum=20000.0, average=60000.0, standard_deviation=30000.0,
+                                             maximum=150000.0),
+        children_range=ChildrenRange(minimum=0, maximum=4),
+        cleaning_market_mechanism=CleaningMarketMechanism.INCOME_ORDER_DESCENDANT, seed=5,
+        instrumentation=instrumentation,
+    )
+    simulation.housing_market = AMES_SHAPE.generate(HOUSES, seed=5)
+    simulation.create_consumers()
+    simulation.compute_consumers_savings()
+    simulation.clean_the_market()
+    return simulation
+
+def test_counters_of_a_small_run():
+    instrumentation = Instrumentation()
+    simulation = run(instrumentation)
+    counters = instrumentation.counters
+    assert counters['clearing.queries'] + counters['clearing.skipped'] == CONSUMERS
+    assert counters['index.builds'] == 1 and counters['index.rows_sorted'] == HOUSES
+    segments = np.bincount(simulation.population.segment, minlength=len(SEGMENTS))
+    for segment, consumers in zip(SEGMENTS, segments.tolist()):
+        assert (counters.get(f"purchase.success.{segment.name}", 0)
+                + counters.get(f"purchase.failure.{segment.name}", 0)) == consumers
+    owners = int(np.count_nonzero(simulation.population.house_id >= 0))
+    assert sum(counters.get(f"purchase.success.{segment.name}", 0) for segment in SEGMENTS) == owners
+    assert {'population_generation', 'savings', 'clearing', 'index_build'} <= set(instrumentation.phases)
+    assert all(timer.calls == 1 for timer in instrumentation.phases.values())
+
+def test_reports(tmp_path):
+    instrumentation = Instrumentation()
+    run(instrumentation)
+    text = instrumentation.to_json(tmp_path / "report.json")
+    assert (tmp_path / "report.json").read_text() == text
+    assert json.loads(text) == instrumentation.to_dict()
+    instrumentation.to_csv(tmp_path / "report.csv")
+    with open(tmp_path / "report.csv", newline='') as file:
+        rows = list(csv.DictReader(file))
+    phases = {row['name']: row for row in rows if row['kind'] == 'phase'}
+    counters = {row['name']: int(row['count']) for row in rows if row['kind'] == 'counter'}
+    assert counters == instrumentation.counters
+    assert {name: int(row['calls']) for name, row in phases.items()} == {
+        name: timer.calls for name, timer in instrumentation.phases.items()
+    }
+    assert float(phases['clearing']['wall_seconds']) == instrumentation.phases['clearing'].wall_seconds
+
+def test_null_instrumentation_records_nothing():
+    simulation = run()
+    assert simulation.housing_market.instrumentation is NULL_INSTRUMENTATION
+    assert HousingMarket.instrumentation is NULL_INSTRUMENTATION
+    assert NULL_INSTRUMENTATION.counters == {} and NULL_INSTRUMENTATION.phases == {}
+    with NULL_INSTRUMENTATION.phase('clearing'):
+        NULL_INSTRUMENTATION.count('clearing.queries', 3)
+    assert NULL_INSTRUMENTATION.to_dict() == {'phases': {}, 'counters': {}}
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from real_estate_toolkit.data.loader import DataLoader, DataLoadError
+from real_estate_toolkit.data.table import Table
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "data.csv"
+    path.write_text(text)
+    return path
+
+def test_iter_batches_widen_the_dtypes_as_needed(tmp_path):
+    path = write_csv(tmp_path, "a,b,c,d\n1,x,NA,1.5\n2,y,NA,2.5\nNA,3,1.5,3\n4,z,2,4\n")
+    batches = list(DataLoader(path).iter_batches(batch_size=2))
+    assert batches[0]["a"].values.dtype == batches[1]["a"].values.dtype == np.int64
+    assert batches[1]["c"].values.dtype == np.float64  # Unknown until its first value
+    table = Table.concat(batches)
+    assert table["a"].to_list() == [1, 2, None, 4]
+    assert table["b"].to_list() == ["x", "y", "3", "z"]
+    assert table["c"].to_list() == [None, None, 1.5, 2.0]
+    assert table["d"].values.dtype == np.float64
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 10])
+def test_iter_batches_load_the_same_table_whatever_the_batch_size(tmp_path, batch_size):
+    path = write_csv(tmp_path, "a,c,e\n1,NA,7\n2,NA,8\n3.5,1.5,x\n4,2.0,9\n")
+    table = Table.concat(DataLoader(path).iter_batches(batch_size=batch_size))
+    assert table["a"].to_list() == [1.0, 2.0, 3.5, 4.0]
+    assert table["c"].to_list() == [None, None, 1.5, 2.0]
+    assert table["e"].to_list() == ["7", "8", "x", "9"]
+
+def test_iter_batches_report_the_first_row_outside_a_given_schema(tmp_path):
+    path = write_csv(tmp_path, "a\n1\n2\n3\n3.5\n4.5\n")
+    with pytest.raises(DataLoadError, match=r"row 4, line 5") as error:
+        list(DataLoader(path, schema={"a": "int64"}).iter_batches(batch_size=10))
+    assert (error.value.row, error.value.line) == (4, 5)
+
+def test_iter_batches_use_a_given_schema(tmp_path):
+    path = write_csv(tmp_path, "a\n1\n2\n3.5\n")
+    table = Table.concat(DataLoader(path, schema={"a": "float64"}).iter_batches(batch_size=2))
+    assert table["a"].to_list() == [1.0, 2.0, 3.5]
@@ -0,0 +1,36 @@
+import tracemalloc
+import numpy as np
+import pytest
+from scipy import stats
+from real_estate_toolkit.agent_based_model.population import PopulationGenerator
+
+@pytest.mark.parametrize("low, high", [
+    (20_000.0, 150_000.0),  # Around the mean
+    (300_000.0, 320_000.0),  # 8 to 9 standard deviations above
+    (-220_000.0, -200_000.0),  # 8.7 to 9.3 below
+    (1_000_000.0, 1_100_000.0),  # Past the range of the normal CDF
+])
+def test_truncated_normal_follows_the_distribution_in_any_range(low, high):
+    mean, std = 60_000.0, 30_000.0
+    values = PopulationGenerator.truncated_normal(np.random.default_rng(0), 200_000, mean, std, low, high)
+    assert values.shape == (200_000,) and low <= values.min() and values.max() <= high
+    expected = stats.truncnorm((low - mean) / std, (high - mean) / std, loc=mean, scale=std)
+    assert values.mean() == pytest.approx(expected.mean(), abs=5 * expected.std() / np.sqrt(values.size))
+    assert stats.kstest(values, expected.cdf).pvalue > 1e-3
+
+def test_truncated_normal_memory_does_not_grow_in_the_tail():
+    size = 100_000
+    tracemalloc.start()
+    try:
+        PopulationGenerator.truncated_normal(np.random.default_rng(0), size, 60_000.0, 30_000.0, 300_000.0, 320_000.0)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 8 * size * 8  # A few arrays of the output's size, where rejection needed thousands
+
+def test_truncated_normal_degenerate_ranges():
+    rng = np.random.default_rng(0)
+    assert PopulationGenerator.truncated_normal(rng, 3, 5.0, 0.0, 0.0, 4.0).tolist() == [4.0] * 3
+    assert PopulationGenerator.truncated_normal(rng, 2, 5.0, 1.0, 7.0, 7.0).tolist() == [7.0] * 2
+    with pytest.raises(ValueError):
+        PopulationGenerator.truncated_normal(rng, 2, 5.0, 1.0, 7.0, 6.0)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from real_estate_toolkit.agent_based_model.scheduler import MarketScheduler
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE
+
+class RescanScheduler(MarketScheduler):
+    """Reference: every consumer without a house is served every period."""
+
+    def _acting(self, period, supply, sellers):
+        self._woken(period)
+        return np.setdiff1d(np.flatnonzero(self.population.house_id < 0), sellers)
+
+def scheduled(scheduler_class, seed: int, houses: int, consumers: int, mechanism: CleaningMarketMechanism,
+              listings: bool, **options):
+    simulation = Simulation(
+        housing_market_data=[], consumers_number=consumers, years=2,
+        annual_income=AnnualIncomeStatistics(minimum=20000.0, average=60000.0, standard_deviation=30000.0,
+                                             maximum=150000.0),
+        children_range=ChildrenRange(minimum=0, maximum=4), cleaning_market_mechanism=mechanism, seed=seed,
+    )
+    simulation.housing_market = AMES_SHAPE.generate(houses, seed=seed)
+    simulation.create_consumers()
+    simulation.compute_consumers_savings()
+    simulation.clean_the_market()
+    listing_period = np.random.default_rng(seed).integers(0, 8, houses) if listings else None
+    scheduler = scheduler_class.from_simulation(simulation, 15, listing_period=listing_period, **options)
+    return scheduler.run(), simulation.population
+
+@pytest.mark.parametrize("seed, houses, consumers", [(3, 1460, 5000), (4, 1460, 300), (5, 800, 2000)])
+@pytest.mark.parametrize("mechanism", [CleaningMarketMechanism.INCOME_ORDER_DESCENDANT,
+                                       CleaningMarketMechanism.INCOME_ORDER_ASCENDANT])
+@pytest.mark.parametrize("listings, resale_probability", [(False, 0.0), (True, 0.0), (True, 0.1)])
+def test_scheduler_matches_rescan_every_period(seed, houses, consumers, mechanism, listings, resale_probability):
+    options = dict(income_growth=0.03, resale_probability=resale_probability)
+    result, population = scheduled(MarketScheduler, seed, houses, consumers, mechanism, listings, **options)
+    expected, expected_population = scheduled(RescanScheduler, seed, houses, consumers, mechanism, listings,
+                                              **options)
+    for name, series in expected.items():
+        np.testing.assert_array_equal(result[name], series, err_msg=name)
+    np.testing.assert_array_equal(population.house_id, expected_population.house_id)
+    np.testing.assert_array_equal(population.savings, expected_population.savings)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from real_estate_toolkit.agent_based_model.house_market import HousingMarket
+from real_estate_toolkit.agent_based_model.population import PopulationGenerator
+from real_estate_toolkit.agent_based_model.sharding import ShardedClearing, ShardedMarket
+from real_estate_toolkit.agent_based_model.simulation import (
+    MARKET_ARRAYS, AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE, generate_neighborhoods
+from real_estate_toolkit.data.table import Column, Table
+
+INCOME = AnnualIncomeStatistics(minimum=20000.0, average=60000.0, standard_deviation=30000.0, maximum=150000.0)
+CHILDREN = ChildrenRange(minimum=0, maximum=4)
+
+def sharded_case(seed: int, houses: int = 1500, consumers: int = 4000):
+    market = AMES_SHAPE.generate(houses, seed=seed)
+    sharded = ShardedMarket(market, generate_neighborhoods(houses, seed=seed))
+    generator = PopulationGenerator(seed)
+    population = generator.generate(consumers, INCOME, CHILDREN)
+    population.savings[:] = population.annual_income * np.random.default_rng(seed).uniform(0, 2, consumers)
+    sharded.assign_preferences(population, generator)
+    population.neighborhood[::7] = -1  # No preference: straight to the fallback
+    order = np.random.default_rng(seed).permutation(consumers)
+    return sharded, population, order
+
+def assert_totals_match(market: HousingMarket) -> None:
+    expected = HousingMarket.from_arrays(**{name: getattr(market, name) for name in MARKET_ARRAYS})
+    assert market.totals.count == expected.totals.count
+    assert market.totals.price == pytest.approx(expected.totals.price)
+    assert market.totals.price_per_sqft == pytest.approx(expected.totals.price_per_sqft)
+    counts = {bedrooms: totals.count for bedrooms, totals in market.bedroom_totals.items() if totals.count}
+    assert counts == {bedrooms: totals.count for bedrooms, totals in expected.bedroom_totals.items()}
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_parallel_clearing_matches_one_worker(seed):
+    results = []
+    for workers in (1, 2):
+        sharded, population, order = sharded_case(seed)
+        counts = ShardedClearing(sharded, workers=workers).clear_population(population, order)
+        results.append((counts, population, sharded))
+    (counts, population, sharded), (parallel_counts, parallel_population, parallel_sharded) = results
+    assert counts == parallel_counts
+    assert counts['first_choice'] > 0 and counts['fallback'] > 0
+    np.testing.assert_array_equal(population.house_id, parallel_population.house_id)
+    np.testing.assert_array_equal(population.savings, parallel_population.savings)
+    np.testing.assert_array_equal(sharded.market.available, parallel_sharded.market.available)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_shards_stay_in_sync_with_the_market_and_no_house_is_sold_twice(workers):
+    sharded, population, order = sharded_case(2)
+    available_before = sharded.market.available.copy()
+    ShardedClearing(sharded, workers=workers).clear_population(population, order)
+    market = sharded.market
+    for rows, shard in zip(sharded.rows, sharded.shards):
+        np.testing.assert_array_equal(shard.available, market.available[rows])
+        assert_totals_match(shard)
+    assert_totals_match(market)
+
+    owned = population.house_id[population.house_id >= 0]
+    assert np.unique(owned).size == owned.size
+    sold = market.ids[available_before & ~market.available]
+    np.testing.assert_array_equal(np.sort(owned), np.sort(sold))
+
+def market_table(houses: int, seed: int) -> Table:
+    market = AMES_SHAPE.generate(houses, seed=seed)
+    columns = dict(id=market.ids, price=market.prices, area=market.areas, bedrooms=market.bedrooms,
+                   year_built=market.year_built, quality_score=market.quality)
+    table = Table({name: Column(values=values, mask=np.zeros(houses, dtype=bool)) for name, values in columns.items()})
+    table.columns['neighborhood'] = Column(values=generate_neighborhoods(houses, seed=seed).astype(object),
+                                           mask=np.zeros(houses, dtype=bool))
+    return table
+
+def neighborhood_simulation(workers: int) -> Simulation:
+    simulation = Simulation(
+        housing_market_data=market_table(800, 3), consumers_number=2000, years=3, annual_income=INCOME,
+        children_range=CHILDREN, cleaning_market_mechanism=CleaningMarketMechanism.RANDOM, seed=3,
+        neighborhood_column='neighborhood', clearing_workers=workers,
+    )
+    simulation.create_housing_market()
+    simulation.create_consumers()
+    simulation.compute_consumers_savings()
+    simulation.clean_the_market()
+    return simulation
+
+def test_simulation_clears_by_neighborhood_preference():
+    simulation = neighborhood_simulation(workers=1)
+    assert all(consumer.neighborhood is not None for consumer in simulation.consumers)
+    shard_of_id = dict(zip(simulation.housing_market.ids.tolist(),
+                           np.unique(simulation.neighborhoods, return_inverse=True)[1].tolist()))
+    owners = [consumer for consumer in simulation.consumers if consumer.house is not None]
+    in_preferred = sum(shard_of_id[consumer.house.id] == consumer.neighborhood for consumer in owners)
+    assert len(owners) / 2 < in_preferred < len(owners)
+
+    parallel = neighborhood_simulation(workers=2)
+    np.testing.assert_array_equal(parallel.population.house_id, simulation.population.house_id)
+    np.testing.assert_array_equal(parallel.population.savings, simulation.population.savings)
@@ -0,0 +1,108 @@
+import random
+import numpy as np
+import pytest
+from real_estate_toolkit.agent_based_model.consumers import Consumer, Segment
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism, Simulation
+)
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE, generate_neighborhoods
+
+PARAMETERS = dict(
+    consumers_number=2000, years=3, cleaning_market_mechanism=CleaningMarketMechanism.RANDOM,
+    annual_income=AnnualIncomeStatistics(minimum=20000.0, average=60000.0, standard_deviation=30000.0,
+                                         maximum=150000.0),
+    children_range=ChildrenRange(minimum=0, maximum=4),
+)
+STEPS = ('create_consumers', 'compute_consumers_savings', 'clean_the_market')
+
+def simulation(**changes) -> Simulation:
+    simulation = Simulation(housing_market_data=[], seed=7, **{**PARAMETERS, **changes})
+    simulation.housing_market = AMES_SHAPE.generate(600, seed=7)
+    return simulation
+
+def run(simulation: Simulation, steps=STEPS) -> Simulation:
+    for step in steps:
+        getattr(simulation, step)()
+    return simulation
+
+def assert_same_state(result: Simulation, expected: Simulation) -> None:
+    for name in ('available', 'prices'):
+        np.testing.assert_array_equal(getattr(result.housing_market, name), getattr(expected.housing_market, name))
+    for name in ('savings', 'house_id', 'saving_rate', 'interest_rate'):
+        np.testing.assert_array_equal(getattr(result.population, name), getattr(expected.population, name))
+    assert result.compute_owners_population_rate() == expected.compute_owners_population_rate()
+    assert result.compute_houses_availability_rate() == expected.compute_houses_availability_rate()
+
+@pytest.mark.parametrize("done, changes", [
+    (1, dict(years=6)),
+    (1, dict(saving_rate=0.5)),
+    (1, dict(interest_rate=0.0)),
+    (2, dict(down_payment_percentage=0.1)),
+    (2, dict(cleaning_market_mechanism=CleaningMarketMechanism.INCOME_ORDER_ASCENDANT)),
+])
+def test_fork_matches_a_fresh_run_with_the_changed_parameter(done, changes):
+    parent = run(simulation(), STEPS[:done])
+    forked = run(parent.fork(**changes), STEPS[done:])
+    assert_same_state(forked, run(simulation(**changes)))
+    assert_same_state(run(parent, STEPS[done:]), run(simulation()))
+
+def test_fork_leaves_the_parents_arrays_writable():
+    parent = run(simulation(), STEPS[:2])
+    parent.fork()
+    assert parent.population.savings.flags.writeable
+    assert parent.housing_market.prices.flags.writeable
+
+def test_fork_rejects_the_seed():
+    with pytest.raises(TypeError):
+        simulation().fork(seed=1)
+
+@pytest.mark.parametrize("sharded", [False, True])
+@pytest.mark.parametrize("done", range(len(STEPS) + 1))
+def test_snapshot_round_trip_finishes_as_the_original_run(done, sharded):
+    def sharded_simulation():
+        result = simulation()
+        if sharded:
+            result.neighborhood_column = 'neighborhood'
+            result.neighborhoods = generate_neighborhoods(len(result.housing_market), seed=7)
+        return result
+
+    original = run(sharded_simulation(), STEPS[:done])
+    restored = Simulation.from_snapshot(original.snapshot())
+    assert hasattr(restored, 'population') == (done > 0)
+    if done:
+        np.testing.assert_array_equal(np.asarray(restored.consumers.rows), np.asarray(original.consumers.rows))
+    run(restored, STEPS[done:])
+    expected = run(sharded_simulation())
+    assert_same_state(restored, expected)
+    np.testing.assert_array_equal(restored.population.neighborhood, expected.population.neighborhood)
+    np.testing.assert_array_equal(np.asarray(restored.consumers.rows), np.asarray(expected.consumers.rows))
+    assert not isinstance(expected.consumers.rows, range)  # The clearing order was saved and restored
+
+def test_consumers_support_the_list_operations():
+    result = run(simulation(), STEPS[:1])
+    consumers = result.consumers
+    income = result.population.annual_income
+    consumers.sort(key=lambda consumer: consumer.annual_income, reverse=True)
+    assert consumers.rows == np.argsort(-income, kind='stable').tolist()
+    random.Random(0).shuffle(consumers)
+    assert sorted(consumers.rows) == list(range(len(income)))
+    consumers.reverse()
+    first = consumers[0]
+    consumers.append(first)
+    consumers.insert(1, consumers[-1])
+    consumers[2] = first
+    del consumers[-1]
+    consumers.extend(consumers[:2])
+    assert [consumer.ID for consumer in consumers[:3]] == [first.ID] * 3 and len(consumers) == len(income) + 3
+    consumers.remove(first)
+    assert consumers.index(first) == 0 and first in consumers
+    result.population.savings[first.ID] = 1.0
+    assert consumers[0].savings == 1.0  # Still views onto the population
+
+    with pytest.raises(TypeError):
+        consumers.append(Consumer(ID=0, annual_income=1.0, children_number=0, segment=Segment.FANCY))
+    with pytest.raises(TypeError):
+        consumers.append(run(simulation(), STEPS[:1]).consumers[0])  # Another population's consumer
+    order = list(consumers.rows)
+    result.fork().consumers.reverse()
+    assert consumers.rows == order  # A fork copies the order before changing it
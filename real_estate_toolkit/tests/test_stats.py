@@ -0,0 +1,32 @@
+import statistics
+import numpy as np
+import pytest
+from real_estate_toolkit.data.stats import QuantileSketch
+
+def sketch(values, **options) -> QuantileSketch:
+    sketch = QuantileSketch(**options)
+    sketch.update(np.asarray(values, dtype=np.float64))
+    return sketch
+
+@pytest.mark.parametrize("options", [{}, dict(k=8, exact_limit=16)])
+def test_quantile_endpoints_are_the_minimum_and_maximum(options):
+    values = np.random.default_rng(0).permutation(np.arange(1.0, 101.0))
+    assert sketch(values, **options).quantile(0) == 1.0
+    assert sketch(values, **options).quantile(1) == 100.0
+    assert sketch([1, 2, 3, 4]).quantile(0) == 1.0
+    assert sketch([1, 2, 3, 4]).quantile(1) == 4.0
+
+def test_exact_quantiles_match_statistics_quantiles():
+    values = [1, 2, 3, 4, 7, 11]
+    expected = statistics.quantiles(values, n=4)
+    assert [sketch(values).quantile(q) for q in (0.25, 0.5, 0.75)] == expected
+
+def test_quantile_outside_the_unit_interval_is_rejected():
+    with pytest.raises(ValueError):
+        sketch([1, 2]).quantile(1.5)
+
+def test_merged_and_restored_sketches_keep_the_endpoints():
+    low, high = sketch(np.arange(0.0, 50.0), k=8, exact_limit=16), sketch(np.arange(50.0, 90.0), k=8, exact_limit=16)
+    low.merge(high)
+    restored = QuantileSketch.from_dict(low.to_dict())
+    assert (restored.quantile(0), restored.quantile(1)) == (0.0, 89.0)
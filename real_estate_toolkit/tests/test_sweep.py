@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from real_estate_toolkit.agent_based_model import sweep as sweep_module
+from real_estate_toolkit.agent_based_model.ensemble import Scenario
+from real_estate_toolkit.agent_based_model.simulation import (
+    AnnualIncomeStatistics, ChildrenRange, CleaningMarketMechanism
+)
+from real_estate_toolkit.agent_based_model.sweep import ENTROPY_HEADER, Sweep
+from real_estate_toolkit.agent_based_model.synthetic import AMES_SHAPE
+
+BASE = Scenario(
+    consumers_number=300, years=2,
+    annual_income=AnnualIncomeStatistics(minimum=20000.0, average=60000.0, standard_deviation=30000.0,
+                                         maximum=150000.0),
+    children_range=ChildrenRange(minimum=0, maximum=4),
+    cleaning_market_mechanism=CleaningMarketMechanism.RANDOM,
+)
+
+def sweep(seed, replicas, **axes):
+    axes = axes or dict(saving_rate=[0.2, 0.4])
+    return Sweep.grid(AMES_SHAPE.generate(200, seed=0), BASE, seed=seed, replicas=replicas, **axes)
+
+def rows(table):
+    return list(table.rows())
+
+def test_resume_requires_the_entropy_of_the_results_file(tmp_path):
+    path = tmp_path / "results.csv"
+    first = sweep(None, 1)
+    first.run(path, workers=1)
+    entropy = first.seed_sequence.entropy
+    assert path.read_text().splitlines()[0] == f"{ENTROPY_HEADER}{entropy}"
+
+    with pytest.raises(ValueError, match=f"seed={entropy}"):
+        sweep(None, 2).run(path, workers=1)
+    resumed = sweep(entropy, 2).run(path, workers=1)
+    expected = sweep(entropy, 2).run(workers=1)
+    assert list(resumed.rows()) == list(expected.rows())
+
+def test_parallel_sweep_matches_one_worker():
+    grid = dict(saving_rate=[0.2, 0.4], down_payment_percentage=[0.1, 0.3])
+    expected = sweep(3, 2, **grid).run(workers=1)
+    assert rows(sweep(3, 2, **grid).run(workers=2, batch_size=3)) == rows(expected)
+    assert len(expected) == 8
+
+def test_resume_after_a_partial_last_line_runs_only_the_missing_rows(tmp_path, monkeypatch):
+    path = tmp_path / "results.csv"
+    expected = sweep(4, 3).run(path, workers=1)
+    lines = path.read_bytes().splitlines(keepends=True)
+    path.write_bytes(b"".join(lines[:-3]) + lines[-3][:len(lines[-3]) // 2])  # Interrupted in a row
+    missing = {tuple(int(field) for field in line.split(b",")[:2]) for line in lines[-3:]}
+
+    ran = []
+    run_points = sweep_module._run_points
+
+    def recording(market, entropy, tasks):
+        ran.extend((point, replica) for point, replica, _ in tasks)
+        return run_points(market, entropy, tasks)
+
+    monkeypatch.setattr(sweep_module, "_run_points", recording)
+    resumed = sweep(4, 3).run(path, workers=1)
+    assert set(ran) == missing and len(ran) == len(missing)
+    assert rows(resumed) == rows(expected)
+    assert path.read_bytes().count(b"\n") == len(lines)
+
+def test_memoized_populations_match_a_plain_scenario_run():
+    grid = sweep(5, 2, saving_rate=[0.2, 0.4], interest_rate=[0.0, 0.05])
+    entropy = grid.seed_sequence.entropy
+    for row in grid.run(workers=1).rows():
+        scenario = grid.scenarios[row['point']]
+        seed = np.random.SeedSequence(entropy, spawn_key=(row['replica'],))
+        owners, availability = scenario.run(grid.market.with_availability(), seed)
+        assert (row['owners_population_rate'], row['houses_availability_rate']) == (owners, availability)